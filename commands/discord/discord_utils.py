@@ -12,6 +12,8 @@ import re
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
 
+import state_store
+
 class DiscordUtils:
     """Utility class for Discord integration operations"""
     
@@ -51,26 +53,31 @@ class DiscordUtils:
     @staticmethod
     def load_state(state_file: str = ".claude/discord-state.json") -> Dict[str, Any]:
         """Load Discord state from JSON file"""
-        try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+        return state_store.read_state(state_file)
     
     @staticmethod
     def save_state(state: Dict[str, Any], state_file: str = ".claude/discord-state.json") -> bool:
-        """Save Discord state to JSON file"""
+        """Save Discord state to JSON file (atomically, under the state lock)"""
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(state_file), exist_ok=True)
-            
-            with open(state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, indent=2)
+            state_store.write_state(state, state_file)
             return True
         except Exception as e:
             print(f"{DiscordUtils.COLORS['ERROR']} Failed to save state: {e}")
             return False
     
+    @staticmethod
+    def update_state(changes: Dict[str, Any], state_file: str = ".claude/discord-state.json") -> Optional[Dict[str, Any]]:
+        """Apply changes to the saved state under the state lock. Returns the new state, or None if there is none"""
+        try:
+            with state_store.locked_state(state_file) as state:
+                if not state:
+                    return None
+                state.update(changes)
+                return dict(state)
+        except Exception as e:
+            print(f"{DiscordUtils.COLORS['ERROR']} Failed to save state: {e}")
+            return None
+    
     @staticmethod
     def validate_webhook_url(url: str) -> bool:
         """Validate Discord webhook URL format"""
@@ -92,6 +99,72 @@ class DiscordUtils:
             return f"{match.group(1)}/..."
         return "Invalid URL"
     
+    @staticmethod
+    def load_circuit_state(webhook_url: str) -> Dict[str, Any]:
+        """Load the delivery circuit breaker state for a webhook (empty when closed)"""
+        match = re.search(r'/webhooks/(\d+)', webhook_url or '')
+        if not match:
+            return {}
+        
+        breaker_file = Path.home() / ".claude" / "discord-breaker.json"
+        return DiscordUtils.load_state(str(breaker_file)).get(match.group(1), {})
+    
+    @staticmethod
+    def load_delivery_health(webhook_urls: List[str]) -> Dict[str, Any]:
+        """
+        Delivery health for some webhooks: outbox depth plus the event store's
+        last success, failure counts and latency percentiles (see
+        discord_notify.eventstore). Empty if the hooks can't report it
+        """
+        _, _, hooks_base = DiscordUtils.get_installation_type()
+        if hooks_base not in sys.path:
+            sys.path.insert(0, hooks_base)
+        try:
+            from discord_notify import eventstore, outbox
+        except ImportError:
+            return {}  # Hooks from before the event store
+        
+        urls = {url.split('?')[0] for url in webhook_urls if url}
+        report = eventstore.health({eventstore.target_of(url) for url in urls})  # Webhook IDs
+        report['queued'], report['retrying'], report['oldest_queued'] = outbox.depth(urls)
+        return report
+    
+    @staticmethod
+    def register_project(project_root: Optional[str] = None) -> None:
+        """Add the project to the registry of opted-in projects (~/.claude/discord-projects.txt)"""
+        root = os.path.abspath(project_root or os.getcwd())
+        registry_file = Path.home() / ".claude" / "discord-projects.txt"
+        try:
+            if root in registry_file.read_text(encoding='utf-8').splitlines():
+                return
+        except (OSError, UnicodeDecodeError):
+            pass
+        try:
+            registry_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(registry_file, 'a', encoding='utf-8') as f:
+                f.write(root + "\n")
+        except OSError:
+            pass
+    
+    @staticmethod
+    def unregister_project(project_root: Optional[str] = None) -> None:
+        """Drop the project from the registry of opted-in projects"""
+        root = os.path.abspath(project_root or os.getcwd())
+        registry_file = Path.home() / ".claude" / "discord-projects.txt"
+        try:
+            roots = registry_file.read_text(encoding='utf-8').splitlines()
+        except (OSError, UnicodeDecodeError):
+            return
+        if root not in roots:
+            return
+        remaining = [line for line in roots if line and line != root]
+        tmp_file = registry_file.with_name(f"{registry_file.name}.{os.getpid()}.tmp")
+        try:
+            tmp_file.write_text("".join(line + "\n" for line in remaining), encoding='utf-8')
+            os.replace(tmp_file, registry_file)
+        except OSError:
+            pass
+    
     @staticmethod
     def get_project_name() -> str:
         """Get current project name (directory name)"""
@@ -172,7 +245,7 @@ class DiscordUtils:
                         "hooks": [
                             {
                                 "type": "command",
-                                "command": f"{hooks_base}/stop-discord.py"
+                                "command": f"{hooks_base}/discord-hook.py Stop"
                             }
                         ]
                     }
@@ -183,7 +256,7 @@ class DiscordUtils:
                         "hooks": [
                             {
                                 "type": "command",
-                                "command": f"{hooks_base}/notification-discord.py"
+                                "command": f"{hooks_base}/discord-hook.py Notification"
                             }
                         ]
                     }
@@ -194,7 +267,7 @@ class DiscordUtils:
                         "hooks": [
                             {
                                 "type": "command",
-                                "command": f"{hooks_base}/posttooluse-discord.py"
+                                "command": f"{hooks_base}/discord-hook.py PostToolUse"
                             }
                         ]
                     }
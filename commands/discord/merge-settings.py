@@ -28,7 +28,7 @@ def merge_discord_hooks(settings_file):
                 "hooks": [
                     {
                         "type": "command",
-                        "command": f"{hooks_base}/stop-discord.py"
+                        "command": f"{hooks_base}/discord-hook.py Stop"
                     }
                 ]
             }
@@ -39,7 +39,7 @@ def merge_discord_hooks(settings_file):
                 "hooks": [
                     {
                         "type": "command",
-                        "command": f"{hooks_base}/notification-discord.py"
+                        "command": f"{hooks_base}/discord-hook.py Notification"
                     }
                 ]
             }
@@ -50,7 +50,7 @@ def merge_discord_hooks(settings_file):
                 "hooks": [
                     {
                         "type": "command",
-                        "command": f"{hooks_base}/posttooluse-discord.py"
+                        "command": f"{hooks_base}/discord-hook.py PostToolUse"
                     }
                 ]
             }
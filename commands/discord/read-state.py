@@ -5,19 +5,15 @@ Read values from Discord state JSON file
 Replaces jq read operations with pure Python
 """
 
-import json
 import sys
-from pathlib import Path
+
+from state_store import read_state
 
 def read_discord_state(state_file, key, default=""):
     """Read a specific key from Discord state."""
     
-    try:
-        # Read existing state
-        with open(state_file, 'r', encoding='utf-8') as f:
-            state = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        state = {}
+    # Read existing state
+    state = read_state(state_file)
     
     # Get the value with default fallback
     value = state.get(key, default)
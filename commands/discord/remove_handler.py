@@ -101,9 +101,10 @@ def remove_discord_integration():
     DiscordUtils.print_warning("WARNING: This will remove Discord integration from this project:")
     print("  • Delete .claude/discord-state.json")
     print("  • Remove Discord hooks from .claude/settings.json")
+    print("  • Remove this project from ~/.claude/discord-projects.txt")
     print("  • Preserve other hooks and settings")
     print("")
-    print("Global Discord components (in ~/.claude/) will NOT be affected.")
+    print("Global Discord components (hooks and commands in ~/.claude/) will NOT be affected.")
     print("")
     
     # Simple confirmation
@@ -132,6 +133,9 @@ def remove_discord_integration():
         except Exception as e:
             DiscordUtils.print_error(f"Failed to remove discord-state.json: {e}")
             return False
+    if os.path.exists(".claude/discord-state.json.lock"):
+        os.remove(".claude/discord-state.json.lock")
+    DiscordUtils.unregister_project()
     
     # Remove Discord hooks from settings.json
     if os.path.exists(".claude/settings.json"):
@@ -159,6 +163,7 @@ def remove_discord_integration():
     print("📊 What was removed:")
     print("  • .claude/discord-state.json (Discord configuration)")
     print("  • Discord hooks from .claude/settings.json")
+    print("  • This project's entry in ~/.claude/discord-projects.txt")
     print("")
     
     print("📁 What was preserved:")
@@ -55,6 +55,7 @@ def setup_discord_integration(args):
     # Save state configuration
     if not DiscordUtils.save_state(state_config):
         return False
+    DiscordUtils.register_project()
     
     # Setup hooks configuration
     settings_file = ".claude/settings.json"
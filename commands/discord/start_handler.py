@@ -21,25 +21,20 @@ def start_discord_notifications(args):
         print("Run: /user:discord:setup YOUR_WEBHOOK_URL")
         return False
     
-    # Load current state
-    state = DiscordUtils.load_state()
-    if not state:
-        DiscordUtils.print_error("Failed to load Discord configuration")
-        return False
-    
     # Parse arguments for thread ID
     thread_id = None
     if args and len(args) > 0:
         thread_id = args[0]
     
-    # Update state
-    state['active'] = True
+    # Enable notifications in the saved state
+    changes = {'active': True}
     if thread_id:
-        state['thread_id'] = thread_id
-    
-    # Save updated state
-    if not DiscordUtils.save_state(state):
+        changes['thread_id'] = thread_id
+    state = DiscordUtils.update_state(changes)
+    if not state:
+        DiscordUtils.print_error("Failed to load Discord configuration")
         return False
+    DiscordUtils.register_project()
     
     # Display success message
     project_name = DiscordUtils.get_project_name()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Lock-protected store for .claude/discord-state.json
+Hooks in many parallel sessions read the state file while commands update
+it. Writers take an fcntl lock on a sidecar .lock file (the same one the
+hooks use for their state files), write a temp file and os.replace it, so a
+reader never sees a half-written file and two commands never lose each
+other's changes. Each replace gives the file a new inode, so a reader can
+tell whether it changed with a stat() alone (the daemon does).
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+STATE_FILE = ".claude/discord-state.json"
+
+# A reader racing a writer that does not use this store may see a torn file
+READ_ATTEMPTS = 3
+READ_RETRY_DELAY = 0.02
+
+def read_state(state_file: str = STATE_FILE) -> Dict[str, Any]:
+    """Load the state, retrying briefly if the file is caught mid-write. Missing or corrupt reads as {}"""
+    for attempt in range(READ_ATTEMPTS):
+        try:
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError):
+            if attempt + 1 < READ_ATTEMPTS:
+                time.sleep(READ_RETRY_DELAY)
+    return {}
+
+def _write(state_file: str, state: Dict[str, Any]) -> None:
+    """Atomically replace the state file, keeping its permissions"""
+    directory = os.path.dirname(state_file) or "."
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = os.stat(state_file).st_mode & 0o777
+    except OSError:
+        mode = 0o600  # The webhook URL is a credential
+    tmp_path = f"{state_file}.{os.getpid()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, state_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@contextmanager
+def _lock(state_file: str) -> Iterator[None]:
+    os.makedirs(os.path.dirname(state_file) or ".", exist_ok=True)
+    fd = os.open(f"{state_file}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+@contextmanager
+def locked_state(state_file: str = STATE_FILE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the state under an exclusive lock for a read-modify-write
+    It is saved afterwards, only if it was changed
+    """
+    with _lock(state_file):
+        state = read_state(state_file)
+        original = json.dumps(state, sort_keys=True)
+        yield state
+        if json.dumps(state, sort_keys=True) != original:
+            _write(state_file, state)
+
+def write_state(state: Dict[str, Any], state_file: str = STATE_FILE) -> None:
+    """Replace the whole state under the lock"""
+    with _lock(state_file):
+        _write(state_file, state)
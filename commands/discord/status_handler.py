@@ -7,8 +7,52 @@ Unified Python handler for checking Discord integration status
 
 import sys
 import os
+import time
 from discord_utils import DiscordUtils
 
+def format_age(seconds):
+    """Short human age, e.g. 45s, 12m, 3h, 2d"""
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{int(seconds // size)}{unit}"
+    return f"{int(seconds)}s"
+
+def show_delivery_health(webhook_urls):
+    """Show outbox depth, last success, failure rate and latency percentiles"""
+    try:
+        health = DiscordUtils.load_delivery_health(webhook_urls)
+    except Exception as e:
+        DiscordUtils.print_status_line("Health", f"Unavailable ({e})", DiscordUtils.COLORS['WARNING'])
+        return
+    if not health:
+        return
+    now = time.time()
+    
+    # Outbox queue
+    if health['queued']:
+        oldest = format_age(now - health['oldest_queued']) if health['oldest_queued'] else "unknown"
+        DiscordUtils.print_status_line("Queue", f"{health['queued']} waiting ({health['retrying']} retrying, oldest {oldest})", DiscordUtils.COLORS['WARNING'])
+    else:
+        DiscordUtils.print_status_line("Queue", "Empty", DiscordUtils.COLORS['SUCCESS'])
+    
+    # Last successful send
+    if health['last_success']:
+        DiscordUtils.print_status_line("Last sent", f"{format_age(now - health['last_success'])} ago", DiscordUtils.COLORS['INFO'])
+    else:
+        DiscordUtils.print_status_line("Last sent", "Never", DiscordUtils.COLORS['INFO'])
+    
+    # Failure rate, 429s and latency per window
+    for window in ("hour", "day"):
+        stats = health[window]
+        if not stats['attempts']:
+            DiscordUtils.print_status_line(f"Last {window}", "No sends", DiscordUtils.COLORS['INFO'])
+            continue
+        failure_rate = 100.0 * stats['failures'] / stats['attempts']
+        summary = (f"{stats['attempts']} sends, {failure_rate:.1f}% failed, {stats['rate_limited']} rate limited (429), "
+                   f"latency p50 {stats['p50']:.0f}ms / p95 {stats['p95']:.0f}ms / p99 {stats['p99']:.0f}ms")
+        emoji = DiscordUtils.COLORS['WARNING'] if stats['failures'] else DiscordUtils.COLORS['SUCCESS']
+        DiscordUtils.print_status_line(f"Last {window}", summary, emoji)
+
 def show_discord_status():
     """Show Discord integration status with detailed information"""
     
@@ -38,11 +82,49 @@ def show_discord_status():
             DiscordUtils.print_status_line("Status", "Disabled", DiscordUtils.COLORS['INACTIVE'])
         
         # Target (thread or channel)
-        if thread_id:
+        if state.get('thread_per_session', False):
+            DiscordUtils.print_status_line("Target", "Thread per session (forum posts)", DiscordUtils.COLORS['THREAD'])
+        elif thread_id:
             DiscordUtils.print_status_line("Target", f"Thread ({thread_id})", DiscordUtils.COLORS['THREAD'])
         else:
             DiscordUtils.print_status_line("Target", "Channel", DiscordUtils.COLORS['CHANNEL'])
         
+        # Per-event routes
+        for target in state.get('targets', []):
+            events = ", ".join(target.get('events', [])) or "All events"
+            name = target.get('name') or DiscordUtils.mask_webhook_url(target.get('webhook_url', ''))
+            where = f"thread {target['thread_id']}" if target.get('thread_id') else "channel"
+            DiscordUtils.print_status_line("Route", f"{events} → {name} ({where})", DiscordUtils.COLORS['CHANNEL'])
+        
+        # Delivery mode
+        if state.get('outbox', False):
+            DiscordUtils.print_status_line("Delivery", "Outbox (background worker)", DiscordUtils.COLORS['INFO'])
+        else:
+            DiscordUtils.print_status_line("Delivery", "Direct", DiscordUtils.COLORS['INFO'])
+        
+        # Progress updates
+        if state.get('live_progress', False):
+            interval = state.get('progress_interval', 5)
+            DiscordUtils.print_status_line("Progress", f"Live message (edited every {interval}s)", DiscordUtils.COLORS['INFO'])
+        elif state.get('batch_window', 0):
+            DiscordUtils.print_status_line("Progress", f"Batched ({state['batch_window']}s window)", DiscordUtils.COLORS['INFO'])
+        
+        # Circuit breaker
+        circuit = DiscordUtils.load_circuit_state(webhook_url)
+        opened_until = circuit.get('opened_until', 0)
+        if opened_until > time.time():
+            remaining = int(opened_until - time.time()) + 1
+            DiscordUtils.print_status_line("Circuit", f"Open - sends paused for {remaining}s after {circuit.get('failures', 0)} failures ({circuit.get('last_error', 'unknown error')})", DiscordUtils.COLORS['WARNING'])
+        elif opened_until:
+            DiscordUtils.print_status_line("Circuit", "Half-open - next send is a trial", DiscordUtils.COLORS['WARNING'])
+        elif circuit.get('failures'):
+            DiscordUtils.print_status_line("Circuit", f"Closed ({circuit['failures']} recent failures)", DiscordUtils.COLORS['INFO'])
+        else:
+            DiscordUtils.print_status_line("Circuit", "Closed", DiscordUtils.COLORS['SUCCESS'])
+        
+        # Delivery health from the event store
+        show_delivery_health([webhook_url] + [target.get('webhook_url', '') for target in state.get('targets', [])])
+        
         # Authentication
         if has_auth:
             DiscordUtils.print_status_line("Auth", "Configured", DiscordUtils.COLORS['AUTH'])
@@ -18,19 +18,12 @@ def stop_discord_notifications():
         print("Run: /user:discord:setup YOUR_WEBHOOK_URL")
         return False
     
-    # Load current state
-    state = DiscordUtils.load_state()
+    # Disable notifications in the saved state
+    state = DiscordUtils.update_state({'active': False})
     if not state:
         DiscordUtils.print_error("Failed to load Discord configuration")
         return False
     
-    # Update state to disable notifications
-    state['active'] = False
-    
-    # Save updated state
-    if not DiscordUtils.save_state(state):
-        return False
-    
     # Display success message
     project_name = DiscordUtils.get_project_name()
     DiscordUtils.print_success(f"Discord notifications disabled for project: {project_name}")
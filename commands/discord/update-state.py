@@ -5,34 +5,26 @@ Update Discord state JSON file
 Replaces jq operations with pure Python
 """
 
-import json
 import sys
-from pathlib import Path
+
+from state_store import locked_state, read_state
 
 def update_discord_state(state_file, action, thread_id=None):
     """Update Discord state based on action."""
     
-    try:
-        # Read existing state
-        with open(state_file, 'r', encoding='utf-8') as f:
-            state = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        state = {}
-    
-    if action == 'start':
-        state['active'] = True
-        if thread_id:
-            state['thread_id'] = thread_id
-    elif action == 'stop':
-        state['active'] = False
-    elif action == 'get_thread_id':
+    if action == 'get_thread_id':
         # Just return the thread_id, don't modify file
-        print(state.get('thread_id', ''))
+        print(read_state(state_file).get('thread_id', ''))
         return
     
-    # Write back to file
-    with open(state_file, 'w', encoding='utf-8') as f:
-        json.dump(state, f, indent=2)
+    # Read, change and atomically write back under the state lock
+    with locked_state(state_file) as state:
+        if action == 'start':
+            state['active'] = True
+            if thread_id:
+                state['thread_id'] = thread_id
+        elif action == 'stop':
+            state['active'] = False
 
 if __name__ == "__main__":
     if len(sys.argv) < 3:
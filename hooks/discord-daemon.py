@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+"""
+Discord Notification Daemon launcher
+Keeps Discord delivery warm for all hook invocations on this machine
+
+Usage: discord-daemon.py start|stop|status|run
+"""
+
+import sys
+
+from discord_notify.daemon import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+
+"""
+Discord Hook Dispatcher for Claude Code
+Events: Stop, Notification, PostToolUse - routed to the matching handler
+Project-level Discord integration - only runs if project has opted in
+
+Usage: discord-hook.py [EVENT]   (hook JSON on stdin)
+"""
+
+import sys
+
+from discord_notify.gate import exit_if_disabled
+
+if __name__ == "__main__":
+    # Projects that have not opted in exit before the hook runtime is imported
+    exit_if_disabled()
+
+    from discord_notify.dispatch import main
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
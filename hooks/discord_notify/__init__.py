@@ -0,0 +1,4 @@
+"""
+Shared runtime for the Claude Code Discord hooks
+Lives next to the hook scripts so they can import it without installation
+"""
@@ -0,0 +1,210 @@
+"""
+Batching of progress messages
+Packs the embeds of several spooled PostToolUse messages into as few
+webhook payloads as Discord allows, or folds them into one summary embed.
+In digest mode every event spooled for a webhook - from any session or
+project - is folded into one activity digest embed instead.
+"""
+
+# Discord's per-message limits
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+# Activity lines listed in a summary embed before it says "and N more"
+SUMMARY_LINES = 15
+
+# Lines listed per digest field before it says "and N more"
+DIGEST_LINES = 8
+
+def embed_size(embed):
+    """Characters Discord counts towards the per-message embed limit."""
+    size = len(embed.get('title', '')) + len(embed.get('description', ''))
+    size += len(embed.get('footer', {}).get('text', ''))
+    for field in embed.get('fields', []):
+        size += len(field.get('name', '')) + len(field.get('value', ''))
+    return size
+
+def _field(embed, name):
+    for field in embed.get('fields', []):
+        if field.get('name') == name:
+            return field.get('value', '')
+    return ''
+
+def _session(embed):
+    return _field(embed, 'Session ID').strip('`.') or 'unknown'
+
+def _bullets(value):
+    """Items of a "• item" list field, without the "…and N more" line."""
+    return [line[2:] for line in value.splitlines() if line.startswith('• ')]
+
+def _listing(lines):
+    shown = "\n".join(lines[:DIGEST_LINES])
+    if len(lines) > DIGEST_LINES:
+        shown += f"\n…and {len(lines) - DIGEST_LINES} more"
+    return shown[:1024] or "None"
+
+def _duration(seconds):
+    minutes = max(1, round(seconds / 60))
+    return f"{minutes} min" if minutes < 60 else f"{minutes // 60} h {minutes % 60} min"
+
+def digest_embed(entries, now):
+    """
+    Fold spooled entries of any event, session and project into one digest embed
+    Input requests count as pending unless the session did something after them
+    """
+    completed = []
+    tools = {}
+    stop_tools = {}
+    files = []
+    pending = {}
+    sessions = set()
+    projects = {}
+
+    for entry in entries:
+        project = entry.get('project') or 'Unknown Project'
+        for embed in entry['payload'].get('embeds', []):
+            title = embed.get('title', '')
+            session = _session(embed)
+            sessions.add((project, session))
+            projects[project] = projects.get(project, 0) + 1
+            if 'Input Needed' not in title:
+                pending.pop((project, session), None)
+
+            if 'Session Complete' in title:
+                completed.append(f"`{session}` {project}: {embed.get('description', '')[:80]}")
+                for item in _bullets(_field(embed, 'Tools Used')):
+                    count, _, tool = item.partition('x ')
+                    if count.isdigit() and tool:
+                        stop_tools.setdefault((project, session), {})[tool] = int(count)
+                changed = _bullets(_field(embed, 'Files Modified'))
+            elif 'Input Needed' in title:
+                pending[(project, session)] = f"`{session}` {project}: {embed.get('description', '')[:80]}"
+                changed = []
+            else:
+                tool = _field(embed, 'Tool') or 'Other'
+                counts = tools.setdefault((project, session), {})
+                counts[tool] = counts.get(tool, 0) + 1
+                description = embed.get('description', '')
+                changed = [description.split('Modified ', 1)[1]] if 'Modified ' in description else []
+
+            for name in changed:
+                if name not in files:
+                    files.append(name)
+
+    # A session's progress messages give its exact tool counts; its Stop
+    # summary only stands in when none were spooled
+    tool_counts = {}
+    for key in set(tools) | set(stop_tools):
+        for tool, count in tools.get(key, stop_tools.get(key, {})).items():
+            tool_counts[tool] = tool_counts.get(tool, 0) + count
+
+    started = min((entry.get('created_at') or now) for entry in entries)
+    events = sum(projects.values())
+    scope = f"{len(sessions)} session{'s' if len(sessions) != 1 else ''}"
+    if len(projects) > 1:
+        scope += f" in {len(projects)} projects"
+
+    fields = [
+        {
+            "name": f"Sessions Completed ({len(completed)})",
+            "value": _listing(completed),
+            "inline": False
+        },
+        {
+            "name": "Tools",
+            "value": _listing([f"{count}x {tool}" for tool, count in
+                               sorted(tool_counts.items(), key=lambda x: x[1], reverse=True)]),
+            "inline": True
+        },
+        {
+            "name": f"Files Touched ({len(files)})",
+            "value": _listing(files),
+            "inline": True
+        },
+        {
+            "name": f"Waiting for Input ({len(pending)})",
+            "value": _listing(list(pending.values())),
+            "inline": False
+        }
+    ]
+    if len(projects) > 1:
+        fields.append({
+            "name": "Projects",
+            "value": _listing([f"{name}: {count} event{'s' if count != 1 else ''}" for name, count in
+                               sorted(projects.items(), key=lambda x: x[1], reverse=True)]),
+            "inline": False
+        })
+
+    return {
+        "title": "📊 Activity Digest",
+        "description": f"{events} events from {scope} over the last {_duration(now - started)}",
+        "color": 10181046,  # Purple
+        "fields": fields,
+        "footer": {
+            "text": "Claude Code - Digest"
+        }
+    }
+
+def summarize_embeds(embeds):
+    """Fold several progress embeds into a single summary embed."""
+    tool_counts = {}
+    sessions = []
+    for embed in embeds:
+        tool = _field(embed, 'Tool') or 'Other'
+        tool_counts[tool] = tool_counts.get(tool, 0) + 1
+        session = _field(embed, 'Session ID')
+        if session and session not in sessions:
+            sessions.append(session)
+
+    lines = [f"• {embed.get('description', '')}" for embed in embeds[:SUMMARY_LINES]]
+    if len(embeds) > SUMMARY_LINES:
+        lines.append(f"…and {len(embeds) - SUMMARY_LINES} more")
+
+    tool_summary = "\n".join(f"{count}x {tool}" for tool, count in
+                             sorted(tool_counts.items(), key=lambda x: x[1], reverse=True))
+
+    return {
+        "title": f"⚡ Work in Progress ({len(embeds)} actions)",
+        "description": "\n".join(lines)[:4096],
+        "color": embeds[0].get('color', 15844367),
+        "fields": [
+            {
+                "name": "Tools",
+                "value": tool_summary[:1024],
+                "inline": True
+            },
+            {
+                "name": "Sessions",
+                "value": "\n".join(sessions)[:1024] or "unknown",
+                "inline": True
+            }
+        ],
+        "footer": {
+            "text": "Claude Code - Working..."
+        }
+    }
+
+def merge_payloads(payloads, mode='embeds'):
+    """
+    Combine spooled payloads into as few messages as possible
+    mode 'embeds' keeps every embed (up to 10 per message);
+    mode 'summary' sends one summary embed
+    """
+    embeds = [embed for payload in payloads for embed in payload.get('embeds', [])]
+    if not embeds:
+        return []
+
+    if mode == 'summary' and len(embeds) > 1:
+        return [{"embeds": [summarize_embeds(embeds)]}]
+
+    messages = []
+    current, current_size = [], 0
+    for embed in embeds:
+        size = embed_size(embed)
+        if current and (len(current) >= MAX_EMBEDS or current_size + size > MAX_EMBED_CHARS):
+            messages.append({"embeds": current})
+            current, current_size = [], 0
+        current.append(embed)
+        current_size += size
+    messages.append({"embeds": current})
+    return messages
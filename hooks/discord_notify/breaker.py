@@ -0,0 +1,92 @@
+"""
+Circuit breaker around webhook delivery
+After FAILURE_THRESHOLD consecutive failures (network errors, timeouts or
+5xx responses) a webhook's circuit opens: sends are short-circuited for a
+cool-down period and go to the outbox instead of piling up hook processes
+that each wait on an unreachable Discord. Once the cool-down is over one
+trial send is let through; success closes the circuit, failure opens it
+again for twice as long. State is shared by all hooks through
+~/.claude/discord-breaker.json.
+"""
+
+import os
+import time
+
+from discord_notify.jsonstate import locked_state, read_state
+from discord_notify.log import WARNING, log_message
+from discord_notify.ratelimit import WEBHOOK_ID
+
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-breaker.json")
+
+# Consecutive failures that open the circuit
+FAILURE_THRESHOLD = 5
+
+# First cool-down and its ceiling as repeated trials fail (seconds)
+COOL_DOWN = 30.0
+MAX_COOL_DOWN = 600.0
+
+# A trial send that has not reported back by then is presumed lost
+TRIAL_TIMEOUT = 30.0
+
+def circuit_key(url):
+    """Identify a webhook by its ID so the token never lands in the state file."""
+    match = WEBHOOK_ID.search(url)
+    return match.group(1) if match else url.split('?')[0]
+
+def open_for(url):
+    """
+    Seconds until a webhook may be tried again (0 = send now)
+    The first caller after the cool-down gets the trial send
+    """
+    key = circuit_key(url)
+    circuit = read_state(STATE_FILE).get(key)
+    if not circuit or not circuit.get('opened_until'):
+        return 0.0
+
+    now = time.time()
+    if now < circuit['opened_until']:
+        return circuit['opened_until'] - now
+
+    # Half-open: let exactly one sender through
+    with locked_state(STATE_FILE) as state:
+        circuit = state.get(key)
+        if not circuit or not circuit.get('opened_until'):
+            return 0.0
+        if circuit.get('trial_until', 0) > now:
+            return circuit['trial_until'] - now
+        circuit['trial_until'] = now + TRIAL_TIMEOUT
+        return 0.0
+
+def record_success(url):
+    """Close a webhook's circuit after Discord answered."""
+    key = circuit_key(url)
+    if key not in read_state(STATE_FILE):
+        return
+    with locked_state(STATE_FILE) as state:
+        circuit = state.pop(key, None)
+    if circuit and circuit.get('opened_until'):
+        log_message(f"🔌 Discord reachable again - circuit closed for webhook {key}", webhook=key)
+
+def record_failure(url, reason):
+    """Count a failed send, opening the circuit once the threshold is reached."""
+    key = circuit_key(url)
+    now = time.time()
+    with locked_state(STATE_FILE) as state:
+        circuit = state.setdefault(key, {'failures': 0, 'opened_until': 0, 'cool_down': 0})
+        circuit['failures'] += 1
+        circuit['last_error'] = reason
+        circuit['updated'] = now
+
+        # A failed trial re-opens at once; a closed circuit waits for the threshold
+        if circuit['opened_until']:
+            cool_down = min(MAX_COOL_DOWN, circuit['cool_down'] * 2)
+        elif circuit['failures'] >= FAILURE_THRESHOLD:
+            cool_down = COOL_DOWN
+        else:
+            return
+        circuit['cool_down'] = cool_down
+        circuit['opened_until'] = now + cool_down
+        circuit['trial_until'] = 0
+        failures = circuit['failures']
+    log_message(f"🔌 Circuit opened for webhook {key} after {failures} failures ({reason}) - pausing sends for {cool_down:.0f}s",
+                WARNING, webhook=key)
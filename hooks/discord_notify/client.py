@@ -0,0 +1,33 @@
+"""
+Thin client for the Discord notification daemon
+Forwards hook input over a Unix domain socket - imports only os and socket
+so that hooks pay almost nothing when the daemon is running
+"""
+
+import os
+import socket
+
+SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".claude", "discord-daemon.sock")
+
+# Keep these short - a missing or wedged daemon must never stall a hook
+CONNECT_TIMEOUT = 0.1
+SEND_TIMEOUT = 1.0
+
+def forward_to_daemon(event_type, input_data, cwd=None):
+    """Forward hook input (JSON text) to the daemon. Returns False if it is not running."""
+    if not hasattr(socket, 'AF_UNIX'):
+        return False
+    
+    header = f"{event_type}\t{cwd or os.getcwd()}\n".encode('utf-8')
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(SOCKET_PATH)
+        sock.settimeout(SEND_TIMEOUT)
+        sock.sendall(header + input_data.encode('utf-8'))
+        return True
+    except OSError:
+        # No socket, stale socket or daemon not accepting - use direct send
+        return False
+    finally:
+        sock.close()
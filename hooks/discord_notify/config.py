@@ -0,0 +1,94 @@
+"""
+Project configuration
+A project opts in to notifications with .claude/discord-state.json; this
+turns that state into the settings used by the hooks, the daemon and the
+outbox worker.
+"""
+
+import json
+import os
+
+from discord_notify.log import ERROR, log_message
+from discord_notify.rules import compile_rules
+
+CONFIG_FILE = os.path.join(".claude", "discord-state.json")
+
+# The commands replace the file atomically, but a hand edit or an older
+# writer can leave it briefly half-written
+READ_ATTEMPTS = 3
+READ_RETRY_DELAY = 0.02
+
+def read_project_state(config_path):
+    """
+    Read a project's discord-state.json, retrying if it is caught mid-write
+    Raises FileNotFoundError if it is missing, ValueError if it stays unreadable
+    """
+    for attempt in range(READ_ATTEMPTS):
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if not isinstance(state, dict):
+                raise ValueError("discord-state.json is not a JSON object")
+            return state
+        except FileNotFoundError:
+            raise
+        except (ValueError, UnicodeDecodeError, IOError):
+            if attempt + 1 == READ_ATTEMPTS:
+                raise ValueError("discord-state.json is unreadable")
+            import time
+            time.sleep(READ_RETRY_DELAY)
+
+def config_from_state(state):
+    """Return the delivery config for a project's state, or None if notifications are off."""
+    if not state.get('active', False) or not state.get('webhook_url'):
+        return None
+    return {
+        'webhook_url': state['webhook_url'],
+        'thread_id': state.get('thread_id', ''),
+        'targets': state.get('targets', []),
+        'rules': compile_rules(state.get('rules')),
+        'auth_token': state.get('auth_token', ''),
+        'project_name': state.get('project_name', 'Unknown Project'),
+        'outbox': state.get('outbox', False),
+        'retry': state.get('retry'),
+        'dedup_window': state.get('dedup_window', 60),
+        'dedup_events': state.get('dedup_events'),
+        'batch_window': state.get('batch_window', 0),
+        'digest_interval': state.get('digest_interval', 0),
+        'batch_mode': state.get('batch_mode', 'embeds'),
+        'live_progress': state.get('live_progress', False),
+        'progress_interval': state.get('progress_interval', 5),
+        'thread_per_session': state.get('thread_per_session', False),
+        'session_thread_ttl': state.get('session_thread_ttl'),
+        'connect_timeout': state.get('connect_timeout'),
+        'read_timeout': state.get('read_timeout')
+    }
+
+def resolve_targets(config, event_type):
+    """
+    Return the config of every target an event is routed to
+    Each entry in targets lists the events it takes (all events if it names
+    none) and may override any other setting, e.g. thread_id; events that no
+    target takes go to the project's own webhook_url
+    """
+    routed = []
+    for target in config.get('targets') or []:
+        if target.get('webhook_url') and event_type in target.get('events', [event_type]):
+            routed.append(dict(config, thread_id='', targets=[]))
+            routed[-1].update((key, value) for key, value in target.items() if key != 'events')
+    return routed or [config]
+
+def load_discord_config(cwd="."):
+    """Load and validate a project's Discord configuration. Returns None if the project has not opted in."""
+    try:
+        state = read_project_state(os.path.join(cwd, CONFIG_FILE))
+    except FileNotFoundError:
+        # No Discord config for this project
+        return None
+    except ValueError:
+        log_message("❌ Failed to read discord-state.json", ERROR)
+        return None
+    
+    if state.get('active', False) and not state.get('webhook_url'):
+        log_message("❌ No webhook URL configured in discord-state.json", ERROR)
+    return config_from_state(state)
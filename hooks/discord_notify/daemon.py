@@ -0,0 +1,314 @@
+"""
+Discord Notification Daemon for Claude Code
+Long-lived process that keeps hook handlers, project configuration and
+HTTP connections to Discord warm. Hook scripts forward their raw input
+over a Unix domain socket and exit immediately. One daemon serves every
+project on the machine: the configs of all registered projects are held in
+memory, and all of them share its connections and the rate limiter.
+
+Usage: discord-daemon.py start|stop|status|run
+"""
+
+import os
+import queue
+import signal
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from discord_notify import eventstore, metrics
+from discord_notify.client import SOCKET_PATH
+from discord_notify.config import CONFIG_FILE, config_from_state, read_project_state
+from discord_notify.delivery import send_discord_message
+from discord_notify.dispatch import HANDLERS, get_handler, is_filtered, parse_input, record_event
+from discord_notify.gate import REGISTRY_FILE, find_project_root, register_project, registered_roots, remember_disabled
+from discord_notify.log import ERROR, flush as flush_log, log_message
+from discord_notify.transport import WebhookSender
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+PID_FILE = Path.home() / ".claude" / "discord-daemon.pid"
+
+# Rate-limit waits longer than this are handed to the outbox worker so one
+# busy webhook does not hold up events for the others
+MAX_INLINE_WAIT = 2.0
+
+# Seconds between loads of the event store spool
+INGEST_INTERVAL = 5.0
+
+class ProjectRegistry:
+    """
+    In-memory configs of every opted-in project, keyed by project root
+    Every project in the registry file is loaded up front; a project's
+    discord-state.json is re-read only when its inode, mtime or size changes
+    (every atomic replace gives it a new inode), and the registry file only
+    when a project has been added to it
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._roots = []
+        self._registry_mtime = None
+
+    def refresh(self):
+        """Load projects added to the registry since the last look."""
+        try:
+            mtime = os.stat(REGISTRY_FILE).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._registry_mtime:
+            return
+        self._registry_mtime = mtime
+        self._roots = registered_roots()
+        # Forget projects removed from the registry
+        for root in [r for r in self._entries if r not in self._roots]:
+            del self._entries[root]
+        for root in self._roots:
+            self.load(root)
+
+    def root_for(self, cwd):
+        """cwd if it has a config of its own (like the gate), else the registered project containing it."""
+        if os.path.exists(os.path.join(cwd, CONFIG_FILE)):
+            return cwd
+        self.refresh()
+        return find_project_root(cwd, self._roots) or cwd
+
+    def load(self, root):
+        """Return the validated config for a project root, or None if disabled."""
+        config_path = os.path.join(root, CONFIG_FILE)
+        try:
+            stat = os.stat(config_path)
+        except OSError:
+            self._entries.pop(root, None)
+            return None
+
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._entries.get(root)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        try:
+            state = read_project_state(config_path)
+        except (FileNotFoundError, ValueError):
+            log_message(f"❌ Failed to read discord-state.json in {root}", ERROR)
+            return None
+
+        config = config_from_state(state)
+        self._entries[root] = (signature, config)
+        return config
+
+    def get(self, cwd):
+        """Return (project root, config or None) for a session's directory."""
+        root = self.root_for(cwd)
+        config = self.load(root)
+        if config and root not in self._roots:
+            # A project set up before the registry existed
+            register_project(root)
+        return root, config
+
+    def projects(self):
+        """Number of projects with a config in memory."""
+        return sum(1 for _, config in self._entries.values() if config)
+
+class NotificationDaemon:
+    """Receives forwarded hook events and delivers them from a single worker"""
+
+    def __init__(self):
+        self.events = queue.Queue()
+        self.projects = ProjectRegistry()
+        self.sender = WebhookSender()
+
+    def process_event(self, event_type, cwd, input_data):
+        """Build and deliver the Discord message for one forwarded event."""
+        if event_type not in HANDLERS:
+            return
+
+        with metrics.phase('config'):
+            root, config = self.projects.get(cwd)
+        if not config:
+            # Hooks in this project can stop forwarding until its config changes
+            remember_disabled(root)
+            return
+
+        with metrics.phase('parse'):
+            hook_input = parse_input(input_data)
+        with metrics.phase('filter'):
+            if is_filtered(config, event_type, hook_input):
+                record_event(event_type, hook_input, config, 'filtered', 'daemon', len(input_data))
+                return
+        with metrics.phase('build'):
+            embed_data = get_handler(event_type).build_message(hook_input, config)
+        record_event(event_type, hook_input, config, 'dispatched' if embed_data else 'skipped', 'daemon', len(input_data))
+        if not embed_data:
+            return
+
+        session_id = hook_input.get('session_id', 'unknown')
+        with metrics.phase('deliver'):
+            send_discord_message(embed_data, config, session_id, event_type,
+                                 sender=self.sender, max_wait=MAX_INLINE_WAIT)
+
+    def worker(self):
+        """Deliver queued events one at a time until a None sentinel arrives."""
+        ingested_at = time.monotonic()
+        while True:
+            try:
+                item = self.events.get(timeout=INGEST_INTERVAL)
+            except queue.Empty:
+                item = False
+            if item:
+                metrics.start(item[0], source='daemon')
+                try:
+                    self.process_event(*item)
+                except Exception as e:
+                    log_message(f"❌ Daemon failed to process {item[0]} event: {e}", ERROR)
+                finally:
+                    metrics.finish()
+                    flush_log()
+                    eventstore.flush()
+            # Load the event store in batches, not per event
+            if item is None or time.monotonic() - ingested_at >= INGEST_INTERVAL:
+                ingested_at = time.monotonic()
+                try:
+                    eventstore.ingest()
+                except Exception as e:
+                    log_message(f"❌ Event store load failed: {e}", ERROR)
+                    flush_log()
+            if item is None:
+                return
+
+class HookEventHandler(socketserver.StreamRequestHandler):
+    """Reads one forwarded event: a 'EVENT\\tCWD' header line followed by raw hook JSON"""
+
+    def handle(self):
+        header = self.rfile.readline().decode('utf-8').rstrip('\n')
+        input_data = self.rfile.read().decode('utf-8', errors='replace')
+        event_type, _, cwd = header.partition('\t')
+        if event_type and cwd:
+            self.server.daemon.events.put((event_type, cwd, input_data))
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def read_pid():
+    """Return the PID of the running daemon, or None."""
+    try:
+        pid = int(PID_FILE.read_text().strip())
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError):
+        return None
+
+def run():
+    """Run the daemon in the foreground."""
+    if read_pid():
+        print("❌ Discord daemon is already running")
+        return 1
+
+    if os.path.exists(SOCKET_PATH):
+        os.unlink(SOCKET_PATH)
+
+    daemon = NotificationDaemon()
+    daemon.projects.refresh()
+    old_umask = os.umask(0o177)
+    try:
+        server = DaemonServer(SOCKET_PATH, HookEventHandler)
+    finally:
+        os.umask(old_umask)
+    server.daemon = daemon
+
+    worker = threading.Thread(target=daemon.worker, name="discord-delivery")
+    worker.start()
+
+    def request_shutdown(signum, frame):
+        # shutdown() blocks until serve_forever() returns, so call it off the main thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    signal.signal(signal.SIGINT, request_shutdown)
+
+    PID_FILE.write_text(str(os.getpid()))
+    log_message(f"🟢 Discord daemon started (PID {os.getpid()}, {daemon.projects.projects()} projects loaded)")
+    flush_log()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        daemon.events.put(None)
+        worker.join()
+        for path in (SOCKET_PATH, PID_FILE):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        log_message("🔴 Discord daemon stopped")
+    return 0
+
+def start():
+    """Start the daemon as a detached background process."""
+    if read_pid():
+        print("ℹ️ Discord daemon is already running")
+        return 0
+
+    subprocess.Popen(
+        [sys.executable, str(HOOKS_DIR / "discord-daemon.py"), "run"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+    # Wait briefly for the socket so hooks can use it right away
+    for _ in range(50):
+        if os.path.exists(SOCKET_PATH) and read_pid():
+            print(f"✅ Discord daemon started (PID {read_pid()})")
+            return 0
+        time.sleep(0.1)
+    print("❌ Discord daemon failed to start - check ~/.claude/discord-notifications.log")
+    return 1
+
+def stop():
+    """Stop the running daemon."""
+    pid = read_pid()
+    if not pid:
+        print("ℹ️ Discord daemon is not running")
+        return 0
+
+    os.kill(pid, signal.SIGTERM)
+    for _ in range(50):
+        if not read_pid():
+            print("✅ Discord daemon stopped")
+            return 0
+        time.sleep(0.1)
+    print(f"❌ Discord daemon (PID {pid}) did not stop")
+    return 1
+
+def status():
+    """Print whether the daemon is running and which projects are registered."""
+    pid = read_pid()
+    if pid:
+        print(f"🟢 Discord daemon running (PID {pid})")
+    else:
+        print("🔴 Discord daemon not running")
+
+    roots = registered_roots()
+    print(f"📁 {len(roots)} registered project(s)")
+    registry = ProjectRegistry()
+    for root in roots:
+        if not os.path.exists(os.path.join(root, CONFIG_FILE)):
+            state = "not set up"
+        else:
+            state = "active" if registry.load(root) else "disabled"
+        print(f"  {root} - {state}")
+    return 0
+
+def main(argv=None):
+    """Main entry point"""
+    argv = sys.argv[1:] if argv is None else argv
+    commands = {'start': start, 'stop': stop, 'status': status, 'run': run}
+
+    if len(argv) != 1 or argv[0] not in commands:
+        print("Usage: discord-daemon.py start|stop|status|run")
+        return 1
+    return commands[argv[0]]()
@@ -0,0 +1,94 @@
+"""
+Suppression of repeated notifications
+Claude Code often raises the same notification several times in a row
+("Claude needs your permission to use Bash"). Each message is fingerprinted
+by session, event and content - with timestamps left out - and a repeat of
+a message sent less than dedup_window seconds ago is dropped. The next
+copy sent after the window says how many were held back. Only Input
+Needed messages are checked unless dedup_events adds PostToolUse, where
+a repeat is often real work (the same tests run again, the same file
+edited). Fingerprints live in a small LRU in ~/.claude/discord-dedup.json
+shared by all hooks; entries expire once no repeat has been seen for a
+window.
+"""
+
+import json
+import os
+import re
+import time
+
+from discord_notify.jsonstate import locked_state
+
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-dedup.json")
+
+# Events checked by default (dedup_events), and those that may be.
+# Session Complete always goes out: it marks the end of a turn
+DEFAULT_DEDUP_EVENTS = ('Notification',)
+DEDUP_EVENTS = ('Notification', 'PostToolUse')
+
+# Fingerprints remembered at once
+MAX_ENTRIES = 256
+
+_SPACE = re.compile(r'\s+')
+
+def _normalize(value):
+    """Drop volatile parts of a payload so that repeats hash alike."""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if key != 'timestamp'}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value
+                if not (isinstance(item, dict) and item.get('name') == 'Timestamp')]
+    if isinstance(value, str):
+        return _SPACE.sub(' ', value).strip()
+    return value
+
+def fingerprint(embed_data, session_id, event_type, webhook_url):
+    """Hash of a message's normalized content, scoped to its session, event and target."""
+    import hashlib
+
+    content = json.dumps([session_id, event_type, webhook_url.split('/webhooks/')[-1].split('/')[0],
+                          _normalize(embed_data)], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+def annotate_repeats(embed_data, count):
+    """Note on the message how many copies were held back."""
+    embeds = embed_data.get('embeds')
+    if not embeds:
+        return embed_data
+    first = dict(embeds[0])
+    note = f"repeated {count} more time{'s' if count != 1 else ''}"
+    footer = (first.get('footer') or {}).get('text')
+    first['footer'] = dict(first.get('footer') or {}, text=f"{footer} • {note}" if footer else note)
+    return dict(embed_data, embeds=[first] + embeds[1:])
+
+def filter_repeat(embed_data, config, session_id, event_type, webhook_url):
+    """
+    Return the message to send, or None if it repeats one sent within the window
+    A message sent after repeats were dropped is annotated with their count
+    """
+    window = config.get('dedup_window')
+    events = config.get('dedup_events') or DEFAULT_DEDUP_EVENTS
+    if not window or event_type not in DEDUP_EVENTS or event_type not in events:
+        return embed_data
+
+    key = fingerprint(embed_data, session_id, event_type, webhook_url)
+    now = time.time()
+    with locked_state(STATE_FILE) as state:
+        entries = state.setdefault('entries', {})
+        for stale in [k for k, entry in entries.items() if now - entry['seen'] > entry['window']]:
+            del entries[stale]
+
+        # Re-insert to mark the entry most recently used
+        entry = entries.pop(key, None)
+        if entry and now - entry['sent'] < window:
+            entry['seen'] = now
+            entry['suppressed'] += 1
+            entries[key] = entry
+            return None
+
+        suppressed = entry['suppressed'] if entry else 0
+        entries[key] = {'sent': now, 'seen': now, 'window': window, 'suppressed': 0}
+        while len(entries) > MAX_ENTRIES:
+            del entries[next(iter(entries))]
+
+    return annotate_repeats(embed_data, suppressed) if suppressed else embed_data
@@ -0,0 +1,246 @@
+"""
+Discord webhook delivery shared by the hooks, the daemon and the outbox worker
+Routes each event to its targets, resolves their URLs, paces sends through
+the shared rate limiter, spools to the outbox when asked to, and hands
+failures to the retry engine. An event routed to several targets is sent to
+all of them at once on a small thread pool.
+"""
+
+import time
+
+from discord_notify import breaker, dedup, eventstore, metrics, ratelimit
+from discord_notify.config import resolve_targets
+from discord_notify.log import ERROR, log_message
+from discord_notify.retry import is_success, parse_retry_after, response_from_error, retry_later
+
+# Log emoji and wording per hook event
+EVENT_LABELS = {
+    'Stop': ('✅', 'Session complete'),
+    'Notification': ('🔔', 'Input needed'),
+    'PostToolUse': ('⚡', 'Work progress')
+}
+
+# A hook will wait this long for a rate-limit slot; longer waits go to the outbox
+MAX_INLINE_WAIT = 0.25
+
+# Targets sent to at once when an event is routed to several
+MAX_FANOUT = 4
+
+class Deferred(Exception):
+    """The rate limiter asked for a longer wait than the caller accepts"""
+
+    def __init__(self, wait, reason="rate limited"):
+        super().__init__(f"{reason} for {wait:.1f}s")
+        self.wait = wait
+
+class CircuitOpen(Deferred):
+    """Discord has been failing and the circuit breaker is holding sends back"""
+
+    def __init__(self, wait):
+        super().__init__(wait, "circuit open")
+
+def build_webhook_url(config):
+    """Return the webhook URL, with thread_id added when posting to a thread."""
+    webhook_url = config['webhook_url']
+    if config.get('thread_id'):
+        separator = '&' if '?' in webhook_url else '?'
+        webhook_url = f"{webhook_url}{separator}thread_id={config['thread_id']}"
+    return webhook_url
+
+def describe_target(config):
+    """Short description of where messages go, for the log."""
+    where = f"thread {config['thread_id']}" if config.get('thread_id') else "channel"
+    return f"{config['name']} {where}" if config.get('name') else where
+
+def post(url, payload, sender, max_wait=None, method='POST', context=None):
+    """
+    Send a payload once (POST unless told otherwise), paced by the shared rate limiter
+    Raises Deferred if the required wait exceeds max_wait, CircuitOpen while
+    Discord is considered down. The request is recorded in the event store
+    with context (session_id, project, event, attempt)
+    """
+    open_for = breaker.open_for(url)
+    if open_for > 0:
+        raise CircuitOpen(open_for)
+
+    wait = ratelimit.acquire(url)
+    if max_wait is not None and wait > max_wait:
+        ratelimit.release(url)
+        raise Deferred(wait)
+    if wait > 0:
+        time.sleep(wait)
+
+        # Discord may have closed the window while we slept
+        blocked = ratelimit.blocked_for(url)
+        if blocked > 0:
+            if max_wait is not None and blocked > max_wait:
+                ratelimit.release(url)
+                raise Deferred(blocked)
+            time.sleep(blocked)
+
+    started = time.perf_counter()
+    try:
+        response = sender.request(method, url, payload)
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        eventstore.record_attempt(url, method, None, (time.perf_counter() - started) * 1000,
+                                  sender.last_payload_bytes, error, context)
+        breaker.record_failure(url, error)
+        raise
+    eventstore.record_attempt(url, method, response.status, (time.perf_counter() - started) * 1000,
+                              sender.last_payload_bytes, context=context)
+    if response.status >= 500:
+        breaker.record_failure(url, f"HTTP {response.status}")
+    elif response.status != 429:
+        breaker.record_success(url)
+
+    retry_after = parse_retry_after(response.headers, response.body) if response.status == 429 else None
+    ratelimit.record(url, response.status, response.headers, retry_after)
+    return response
+
+def send_discord_message(embed_data, config, session_id, event_type, sender=None, max_wait=MAX_INLINE_WAIT):
+    """
+    Send a hook's Discord message to every target the event is routed to
+    Several targets are sent to concurrently, so the hook waits for the
+    slowest one rather than for all of them in turn
+    """
+    targets = resolve_targets(config, event_type)
+    if len(targets) == 1:
+        send_to_target(embed_data, targets[0], session_id, event_type, sender, max_wait)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    metrics.note(targets=len(targets))
+    # Senders keep one connection per host and can't be shared between
+    # threads: only the first target reuses the caller's
+    with ThreadPoolExecutor(max_workers=min(len(targets), MAX_FANOUT)) as pool:
+        futures = [(target, pool.submit(send_to_target, embed_data, target, session_id, event_type,
+                                        sender if i == 0 else None, max_wait))
+                   for i, target in enumerate(targets)]
+    for target, future in futures:
+        error = future.exception()
+        if error is not None:
+            _, label = EVENT_LABELS[event_type]
+            log_message(f"❌ {label} notification failed ({error}) to {describe_target(target)}",
+                        ERROR, event=label)
+
+def send_to_target(embed_data, config, session_id, event_type, sender=None, max_wait=MAX_INLINE_WAIT):
+    """Send a message to one target, deferring to the outbox whenever it cannot go out now."""
+    from discord_notify.outbox import enqueue
+
+    # Digest mode folds every event into the next digest instead
+    digest_interval = config.get('digest_interval') or 0
+
+    # The target's deadlines, for a sender shared with other projects (the
+    # daemon's) and for the outbox worker
+    timeouts = (config.get('connect_timeout'), config.get('read_timeout'))
+    if sender is not None:
+        sender.set_timeouts(*timeouts)
+
+    # Thread per session: send to the session's own thread, creating it with
+    # this message if the session has none yet
+    if config.get('thread_per_session') and session_id and not digest_interval:
+        from discord_notify import sessionthreads
+        try:
+            routed = sessionthreads.route(embed_data, config, session_id, event_type, sender, max_wait)
+        except Deferred as e:
+            # The outbox worker creates the thread when the slot opens - sent
+            # to the channel instead, a forum channel would refuse it
+            label = EVENT_LABELS[event_type][1]
+            enqueue(config['webhook_url'], embed_data, label, describe_target(config), session_id,
+                    next_attempt_at=time.time() + e.wait, retry=config.get('retry'), project=config.get('project_name'),
+                    timeouts=timeouts, session_thread=sessionthreads.pending(config, session_id))
+            log_message(f"⏳ {label} notification held back ({e}), queued - Session: {session_id[:8]}",
+                        event=label, session=session_id[:8])
+            return
+        if routed is None:
+            return
+        config = routed
+
+    webhook_url = build_webhook_url(config)
+    target = describe_target(config)
+    emoji, label = EVENT_LABELS[event_type]
+    session_short = session_id[:8] if session_id else 'unknown'
+
+    # Live progress: one message per session, edited in place
+    if config.get('live_progress') and not digest_interval:
+        from discord_notify import progress
+        if event_type == 'PostToolUse':
+            progress.update(embed_data, config, session_id, sender, max_wait)
+            return
+        # Bring the progress message up to date before the session's next notification
+        progress.flush(config, session_id, sender, max_wait, finished=event_type == 'Stop')
+
+    # Drop a repeat of what this session sent moments ago
+    embed_data = dedup.filter_repeat(embed_data, config, session_id, event_type, webhook_url)
+    if embed_data is None:
+        metrics.note(status='duplicate')
+        log_message(f"🔁 {label} notification repeated within {config.get('dedup_window')}s, skipped - Session: {session_short}",
+                    event=label, session=session_short, status='duplicate')
+        return
+
+    # Digest mode: spool every event for the digest interval; the worker
+    # folds all events spooled for the webhook - from every session and
+    # project sharing it - into one digest message
+    if digest_interval > 0:
+        enqueue(webhook_url, embed_data, label, target, session_id, retry=config.get('retry'),
+                next_attempt_at=time.time() + digest_interval,
+                batch_key='digest', batch_mode='digest', project=config.get('project_name'), timeouts=timeouts)
+        return
+
+    # Progress batching: hold PostToolUse messages for the batch window so the
+    # worker can pack them together
+    batch_window = config.get('batch_window') or 0
+    if batch_window > 0 and event_type == 'PostToolUse':
+        enqueue(webhook_url, embed_data, label, target, session_id, retry=config.get('retry'),
+                next_attempt_at=time.time() + batch_window,
+                batch_key='progress', batch_mode=config.get('batch_mode'), project=config.get('project_name'),
+                timeouts=timeouts)
+        return
+
+    # Outbox mode: spool the payload and return without waiting on Discord.
+    # With batching on, other events are spooled too so they keep their place
+    # behind the progress batch
+    if config.get('outbox') or batch_window > 0:
+        enqueue(webhook_url, embed_data, label, target, session_id, retry=config.get('retry'),
+                project=config.get('project_name'), timeouts=timeouts)
+        return
+
+    owns_sender = sender is None
+    if owns_sender:
+        from discord_notify.transport import WebhookSender
+        sender = WebhookSender(config.get('connect_timeout'), config.get('read_timeout'))
+
+    status = headers = body = None
+    try:
+        status, headers, body = post(webhook_url, embed_data, sender, max_wait,
+                                     context={'session_id': session_id, 'project': config.get('project_name'),
+                                              'event': event_type})
+        if is_success(status):
+            log_message(f"{emoji} {label} notification sent to {target} - Session: {session_short}", event=label, session=session_short)
+            return
+        log_message(f"❌ {label} notification failed (HTTP {status}) to {target} - Session: {session_short}",
+                    ERROR, event=label, session=session_short, status=status)
+    except Deferred as e:
+        # Pace rather than fail: the outbox worker sends it when the slot opens
+        enqueue(webhook_url, embed_data, label, target, session_id,
+                next_attempt_at=time.time() + e.wait, retry=config.get('retry'), project=config.get('project_name'),
+                timeouts=timeouts)
+        log_message(f"⏳ {label} notification held back ({e}), queued - Session: {session_short}", event=label, session=session_short)
+        return
+    except Exception as e:
+        metrics.note(status='error')
+        log_message(f"❌ {label} notification failed ({str(e)}) to {target} - Session: {session_short}",
+                    ERROR, event=label, session=session_short)
+        response = response_from_error(e)
+        if response is None:
+            return
+        status, headers, body = response
+    finally:
+        if owns_sender:
+            sender.close()
+
+    # Transient failures are retried by the outbox worker, off the caller's path
+    retry_later(webhook_url, embed_data, label, target, session_id, config.get('retry'),
+                status, headers, body, project=config.get('project_name'), timeouts=timeouts)
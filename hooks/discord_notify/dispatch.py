@@ -0,0 +1,115 @@
+"""
+Single entry point for the Discord hooks
+Routes a hook event to its handler module. Imports are kept to what each
+step needs: forwarding to the daemon only loads the socket client, and the
+HTTP stack is only loaded once a message is actually sent.
+
+Usage: discord-hook.py [Stop|Notification|PostToolUse]   (hook JSON on stdin)
+Without an argument the event is taken from the input's hook_event_name.
+Every run's phase timings are recorded by discord_notify.metrics.
+"""
+
+import json
+import sys
+
+from discord_notify import metrics
+from discord_notify.hookinput import read_hook_input
+
+# Handler module per hook event; each provides build_message(hook_input, config)
+HANDLERS = {
+    'Stop': 'discord_notify.stop',
+    'Notification': 'discord_notify.notification',
+    'PostToolUse': 'discord_notify.posttooluse'
+}
+
+def parse_input(input_data):
+    """Parse JSON hook input forwarded as text."""
+    try:
+        if not input_data.strip():
+            return {}
+        hook_input = json.loads(input_data)
+        return hook_input if isinstance(hook_input, dict) else {}
+    except json.JSONDecodeError:
+        return {}
+
+def is_filtered(config, event_type, hook_input):
+    """Return True if the project's rules drop this event (see rules.py)."""
+    if config['rules'].allows(event_type, hook_input):
+        return False
+    from discord_notify.log import DEBUG, log_message
+    session_short = (hook_input.get('session_id') or 'unknown')[:8]
+    tool_name = hook_input.get('tool_name')
+    log_message(f"🔧 {event_type}{f' ({tool_name})' if tool_name else ''} filtered by rules - Session: {session_short}",
+                DEBUG, tool=tool_name, session=session_short)
+    metrics.note(filtered=True)
+    return True
+
+def record_event(event_type, hook_input, config, outcome, source='hook', input_bytes=None):
+    """Add the event and what became of it to the event store (see eventstore.py)."""
+    from discord_notify import eventstore
+    eventstore.record_event(event_type, hook_input.get('session_id'), config.get('project_name'), outcome,
+                            hook_input.get('tool_name'), source, input_bytes)
+
+def get_handler(event_type):
+    """Import the handler module for an event type."""
+    from importlib import import_module
+    return import_module(HANDLERS[event_type])
+
+def main(event_type=None):
+    """Handle one hook event, recording how long each phase takes."""
+    metrics.start(event_type)
+    try:
+        run(event_type)
+    finally:
+        metrics.finish()
+
+def run(event_type):
+    # Read and parse stdin in one streaming pass, leaving out the bulky
+    # fields no handler uses (see hookinput.py)
+    with metrics.phase('read'):
+        hook_input, input_bytes = read_hook_input(sys.stdin.buffer) if sys.stdin else ({}, 0)
+    metrics.note(input_bytes=input_bytes)
+
+    if event_type is None:
+        event_type = hook_input.get('hook_event_name')
+        metrics.note(event=event_type)
+    if event_type not in HANDLERS:
+        return
+
+    # Hand the event to the notification daemon when it is running
+    with metrics.phase('forward'):
+        from discord_notify.client import forward_to_daemon
+        forwarded = forward_to_daemon(event_type, json.dumps(hook_input))
+    if forwarded:
+        metrics.note(forwarded=True)
+        return
+
+    # Projects that have not opted in stop here
+    with metrics.phase('config'):
+        from discord_notify.config import load_discord_config
+        config = load_discord_config()
+    if not config:
+        # Let the gate turn the next hook in this project away early
+        from discord_notify.gate import remember_disabled
+        remember_disabled()
+        return
+
+    # Let hooks started in a subdirectory find this project
+    from discord_notify.gate import register_project
+    register_project()
+
+    # Filtered events stop before a message is built
+    with metrics.phase('filter'):
+        if is_filtered(config, event_type, hook_input):
+            record_event(event_type, hook_input, config, 'filtered', input_bytes=input_bytes)
+            return
+
+    session_id = hook_input.get('session_id', 'unknown')
+
+    with metrics.phase('build'):
+        embed_data = get_handler(event_type).build_message(hook_input, config)
+    record_event(event_type, hook_input, config, 'dispatched' if embed_data else 'skipped', input_bytes=input_bytes)
+    if embed_data:
+        with metrics.phase('deliver'):
+            from discord_notify.delivery import send_discord_message
+            send_discord_message(embed_data, config, session_id, event_type)
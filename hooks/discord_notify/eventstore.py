@@ -0,0 +1,406 @@
+"""
+Queryable store of hook events and delivery attempts
+Every hook event and every webhook request is kept in a SQLite database,
+~/.claude/discord-events.db, in WAL mode with indexes on session and time.
+Importing sqlite3 alone costs more than the rest of a hook run, so hooks
+only buffer their rows and append them to a spool file with one write when
+they exit (like the log). The spool is loaded into the database in one
+transaction per batch - by the daemon every few seconds, by the outbox
+worker when it finishes, by this module's CLI, and by a hook once the spool
+passes INGEST_BYTES. Rows older than RETENTION_DAYS are pruned at most once
+an hour during a load, and the freed pages are returned to the file
+system. DISCORD_NOTIFY_EVENTS=0 turns recording off.
+
+Each load also folds its attempts into per-minute, per-webhook summaries -
+counts, failures, 429s and a log-scale latency histogram - so health() can
+report failure rates and latency percentiles for the last hour or day from
+a few thousand summary rows however much history the store holds.
+
+Usage: python3 -m discord_notify.eventstore sessions|session ID|attempts [N]|health|prune [DAYS]|vacuum
+"""
+
+import atexit
+import fcntl
+import json
+import math
+import os
+import sys
+import time
+
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".claude")
+DB_FILE = os.path.join(STATE_DIR, "discord-events.db")
+SPOOL_FILE = os.path.join(STATE_DIR, "discord-events.spool")
+INGESTING_FILE = f"{SPOOL_FILE}.ingesting"
+INGEST_LOCK = f"{SPOOL_FILE}.lock"
+
+ENABLED = os.environ.get('DISCORD_NOTIFY_EVENTS', '1') != '0'
+RETENTION_DAYS = float(os.environ.get('DISCORD_NOTIFY_EVENTS_RETENTION_DAYS', '30'))
+
+# A hook loads the spool itself once it grows past this
+INGEST_BYTES = 256 * 1024
+
+PRUNE_INTERVAL = 3600
+
+# Latency histogram buckets are 10% wide, so percentiles are within about 5%
+LATENCY_BUCKET_RATIO = 1.1
+
+HEALTH_WINDOWS = (('hour', 3600), ('day', 86400))
+
+# Bumped when the summaries change shape, so existing databases rebuild them
+SUMMARY_VERSION = 2
+
+COLUMNS = {
+    'events': ('ts', 'session_id', 'project', 'event', 'tool', 'source', 'outcome', 'input_bytes'),
+    'attempts': ('ts', 'session_id', 'project', 'event', 'target', 'method', 'attempt',
+                 'payload_bytes', 'status', 'latency_ms', 'error')
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session_id TEXT,
+    project TEXT,
+    event TEXT,
+    tool TEXT,
+    source TEXT,
+    outcome TEXT,
+    input_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_session ON events (session_id, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session_id TEXT,
+    project TEXT,
+    event TEXT,
+    target TEXT,
+    method TEXT,
+    attempt INTEGER,
+    payload_bytes INTEGER,
+    status INTEGER,
+    latency_ms REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_session ON attempts (session_id, ts);
+CREATE INDEX IF NOT EXISTS attempts_ts ON attempts (ts);
+CREATE TABLE IF NOT EXISTS attempt_minutes (
+    webhook TEXT NOT NULL,
+    minute INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    rate_limited INTEGER NOT NULL,
+    last_success REAL,
+    PRIMARY KEY (webhook, minute)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS latency_minutes (
+    webhook TEXT NOT NULL,
+    minute INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (webhook, minute, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+"""
+
+_buffer = []
+
+def _add(table, row):
+    if not ENABLED:
+        return
+    if not _buffer:
+        atexit.register(flush)
+    _buffer.append([table, row])
+
+def record_event(event, session_id, project, outcome, tool=None, source='hook', input_bytes=None):
+    """Buffer a row for a hook event and what became of it (dispatched, filtered, skipped)."""
+    _add('events', {'ts': round(time.time(), 3), 'session_id': session_id, 'project': project,
+                    'event': event, 'tool': tool, 'source': source, 'outcome': outcome,
+                    'input_bytes': input_bytes})
+
+def target_of(url):
+    """Webhook ID (and thread) of a webhook URL - never the token."""
+    base, _, query = url.partition('?')
+    webhook_id = base.split('/webhooks/')[-1].split('/')[0]
+    for param in query.split('&'):
+        if param.startswith('thread_id='):
+            return f"{webhook_id}/{param[len('thread_id='):]}"
+    return webhook_id
+
+def record_attempt(url, method, status, latency_ms, payload_bytes=None, error=None, context=None):
+    """Buffer a row for one webhook request; context carries session_id, project, event and attempt."""
+    context = context or {}
+    _add('attempts', {'ts': round(time.time(), 3), 'session_id': context.get('session_id'),
+                      'project': context.get('project'), 'event': context.get('event'),
+                      'target': target_of(url), 'method': method, 'attempt': context.get('attempt', 1),
+                      'payload_bytes': payload_bytes, 'status': status,
+                      'latency_ms': round(latency_ms, 2), 'error': error})
+
+def _append(data):
+    """Append to the spool, never to a spool a loader has already taken. Returns its size."""
+    while True:
+        fd = os.open(SPOOL_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            try:
+                current = os.stat(SPOOL_FILE).st_ino
+            except FileNotFoundError:
+                continue
+            if os.fstat(fd).st_ino != current:
+                continue  # Renamed away for loading while we waited
+            os.write(fd, data)
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+def flush():
+    """Append buffered rows to the spool, loading it into the database if it has grown large."""
+    if not _buffer:
+        return
+    data = "".join(json.dumps(item, separators=(',', ':')) + "\n" for item in _buffer).encode('utf-8')
+    _buffer.clear()
+    try:
+        os.makedirs(STATE_DIR, exist_ok=True)
+        if _append(data) > INGEST_BYTES:
+            ingest()
+    except Exception:
+        pass  # The event store must never break a hook
+
+def _is_failure(status):
+    return status is None or not 200 <= status < 300
+
+def _bucket(latency_ms):
+    return int(math.log(max(latency_ms, 1.0)) / math.log(LATENCY_BUCKET_RATIO))
+
+def _summarize(db, attempts):
+    """Add (target, ts, status, latency_ms) rows to the per-minute summaries of their webhooks."""
+    minutes = {}
+    latencies = {}
+    for target, ts, status, latency_ms in attempts:
+        # Summaries are per webhook, whichever thread it posted to
+        key = (target.split('/')[0], int(ts // 60))
+        counts = minutes.setdefault(key, [0, 0, 0, None])
+        counts[0] += 1
+        if _is_failure(status):
+            counts[1] += 1
+        else:
+            counts[3] = max(counts[3] or 0, ts)
+        if status == 429:
+            counts[2] += 1
+        if latency_ms is not None:
+            bucket = key + (_bucket(latency_ms),)
+            latencies[bucket] = latencies.get(bucket, 0) + 1
+    db.executemany("""
+        INSERT INTO attempt_minutes VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (webhook, minute) DO UPDATE SET
+            attempts = attempts + excluded.attempts, failures = failures + excluded.failures,
+            rate_limited = rate_limited + excluded.rate_limited,
+            last_success = MAX(COALESCE(last_success, 0), COALESCE(excluded.last_success, 0))""",
+                   [key + tuple(counts) for key, counts in minutes.items()])
+    db.executemany("""
+        INSERT INTO latency_minutes VALUES (?, ?, ?, ?)
+        ON CONFLICT (webhook, minute, bucket) DO UPDATE SET count = count + excluded.count""",
+                   [key + (count,) for key, count in latencies.items()])
+
+def connect():
+    """Open the database, creating it in WAL mode on first use."""
+    import sqlite3
+
+    db = sqlite3.connect(DB_FILE, timeout=10)
+    if not db.execute("PRAGMA auto_vacuum").fetchone()[0]:
+        # Only takes effect on an empty database - lets pruning give space back
+        db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    db.execute("PRAGMA journal_mode = WAL")
+    db.execute("PRAGMA synchronous = NORMAL")
+    db.executescript(SCHEMA)
+    summarized = db.execute("SELECT value FROM meta WHERE key = 'summarized'").fetchone()
+    if not summarized or summarized[0] != SUMMARY_VERSION:
+        # Summaries are new to this database, or kept differently - rebuild them from its history once
+        with db:
+            db.execute("DROP TABLE IF EXISTS attempt_minutes")
+            db.execute("DROP TABLE IF EXISTS latency_minutes")
+            db.executescript(SCHEMA)
+            _summarize(db, db.execute("SELECT target, ts, status, latency_ms FROM attempts"))
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('summarized', ?)", (SUMMARY_VERSION,))
+    return db
+
+def prune(db, days=RETENTION_DAYS):
+    """Delete rows older than the retention period and release the freed pages. Returns rows deleted."""
+    cutoff = time.time() - days * 86400
+    with db:
+        deleted = sum(db.execute(f"DELETE FROM {table} WHERE ts < ?", (cutoff,)).rowcount for table in COLUMNS)
+        for table in ('attempt_minutes', 'latency_minutes'):
+            db.execute(f"DELETE FROM {table} WHERE minute < ?", (int(cutoff // 60),))
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('pruned_at', ?)", (time.time(),))
+    db.execute("PRAGMA incremental_vacuum")
+    return deleted
+
+def ingest():
+    """Load the spool into the database in one transaction. Returns the rows loaded."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    lock_fd = os.open(INGEST_LOCK, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0  # Another process is loading it
+
+        # Take the spool once no writer is mid-append; a batch left by a
+        # loader that died is picked up first
+        if not os.path.exists(INGESTING_FILE):
+            try:
+                fd = os.open(SPOOL_FILE, os.O_RDONLY)
+            except FileNotFoundError:
+                return 0
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                os.replace(SPOOL_FILE, INGESTING_FILE)
+            finally:
+                os.close(fd)
+
+        rows = {table: [] for table in COLUMNS}
+        with open(INGESTING_FILE, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    table, row = json.loads(line)
+                    rows[table].append(tuple(row.get(column) for column in COLUMNS[table]))
+                except (ValueError, TypeError, KeyError, AttributeError):
+                    continue  # A torn line from a killed process
+
+        db = connect()
+        try:
+            with db:
+                for table, values in rows.items():
+                    if values:
+                        columns = COLUMNS[table]
+                        db.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                                       values)
+                _summarize(db, [(row[4], row[0], row[8], row[9]) for row in rows['attempts']])
+            os.unlink(INGESTING_FILE)
+            pruned_at = db.execute("SELECT value FROM meta WHERE key = 'pruned_at'").fetchone()
+            if not pruned_at or time.time() - pruned_at[0] > PRUNE_INTERVAL:
+                prune(db)
+        finally:
+            db.close()
+        return sum(len(values) for values in rows.values())
+    finally:
+        os.close(lock_fd)
+
+def _percentiles(histogram, quantiles=(0.5, 0.95, 0.99)):
+    """Estimate latency percentiles (ms) from {bucket: count}, using each bucket's midpoint."""
+    total = sum(histogram.values())
+    if not total:
+        return [None] * len(quantiles)
+    results = []
+    for quantile in quantiles:
+        rank = max(1, math.ceil(quantile * total))
+        seen = 0
+        for bucket in sorted(histogram):
+            seen += histogram[bucket]
+            if seen >= rank:
+                results.append(round(LATENCY_BUCKET_RATIO ** (bucket + 0.5), 1))
+                break
+    return results
+
+def health(webhooks=None, now=None):
+    """
+    Delivery health from the summaries: last success and, per window (last hour
+    and day), attempts, failures, 429s and p50/p95/p99 latency in ms
+    webhooks limits it to some webhook IDs, each covering all of its threads
+    """
+    now = now or time.time()
+    ingest()
+    db = connect()
+    try:
+        if webhooks is None:
+            webhooks = [row[0] for row in db.execute("SELECT DISTINCT webhook FROM attempt_minutes")]
+        params = sorted(set(webhooks))
+        where = f"webhook IN ({', '.join('?' * len(params))}) AND "
+
+        # Newest minute with a success, walking each webhook's rows backwards
+        last_success = max([row[0] for webhook in params for row in db.execute(
+            "SELECT last_success FROM attempt_minutes WHERE webhook = ? AND last_success > 0 "
+            "ORDER BY minute DESC LIMIT 1", (webhook,))], default=None)
+        result = {'last_success': last_success}
+        for name, seconds in HEALTH_WINDOWS:
+            since = [int((now - seconds) // 60)]
+            attempts, failures, rate_limited = db.execute(
+                f"SELECT COALESCE(SUM(attempts), 0), COALESCE(SUM(failures), 0), COALESCE(SUM(rate_limited), 0) "
+                f"FROM attempt_minutes WHERE {where}minute >= ?", params + since).fetchone()
+            histogram = dict(db.execute(
+                f"SELECT bucket, SUM(count) FROM latency_minutes WHERE {where}minute >= ? GROUP BY bucket",
+                params + since))
+            p50, p95, p99 = _percentiles(histogram)
+            result[name] = {'attempts': attempts, 'failures': failures, 'rate_limited': rate_limited,
+                            'p50': p50, 'p95': p95, 'p99': p99}
+        return result
+    finally:
+        db.close()
+
+def _print_rows(cursor):
+    names = [column[0] for column in cursor.description]
+    rows = [["" if value is None else str(value) for value in row] for row in cursor]
+    widths = [max([len(name)] + [len(row[i]) for row in rows]) for i, name in enumerate(names)]
+    for row in [names] + rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+def main(argv=None):
+    """Query, prune or compact the event store."""
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else 'sessions'
+
+    ingest()
+    db = connect()
+    try:
+        if command == 'sessions':
+            _print_rows(db.execute("""
+                SELECT e.session_id AS session, e.project, COUNT(*) AS events,
+                       SUM(e.outcome = 'dispatched') AS dispatched,
+                       (SELECT COUNT(*) FROM attempts a WHERE a.session_id = e.session_id
+                          AND (a.status IS NULL OR a.status >= 300)) AS failed_attempts,
+                       datetime(MAX(e.ts), 'unixepoch', 'localtime') AS last_event
+                FROM events e GROUP BY e.session_id ORDER BY MAX(e.ts) DESC LIMIT 20"""))
+        elif command == 'session' and len(argv) > 1:
+            _print_rows(db.execute("""
+                SELECT datetime(ts, 'unixepoch', 'localtime') AS time, 'event' AS kind, event,
+                       COALESCE(tool, '') AS detail, outcome AS result, NULL AS ms
+                FROM events WHERE session_id LIKE ? || '%'
+                UNION ALL
+                SELECT datetime(ts, 'unixepoch', 'localtime'), 'attempt', event,
+                       method || ' ' || target || ' #' || attempt, COALESCE(status, error), latency_ms
+                FROM attempts WHERE session_id LIKE ? || '%'
+                ORDER BY time""", (argv[1], argv[1])))
+        elif command == 'attempts':
+            limit = int(argv[1]) if len(argv) > 1 else 20
+            _print_rows(db.execute("""
+                SELECT datetime(ts, 'unixepoch', 'localtime') AS time, substr(session_id, 1, 8) AS session,
+                       project, event, method, target, attempt, payload_bytes AS bytes,
+                       COALESCE(status, error) AS result, latency_ms AS ms
+                FROM attempts ORDER BY ts DESC LIMIT ?""", (limit,)))
+        elif command == 'health':
+            report = health()
+            last = report['last_success']
+            print(f"Last success: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last)) if last else 'never'}")
+            for name, _ in HEALTH_WINDOWS:
+                window = report[name]
+                print(f"Last {name}: {window['attempts']} attempts, {window['failures']} failed, "
+                      f"{window['rate_limited']} rate limited, p50/p95/p99 "
+                      f"{window['p50']}/{window['p95']}/{window['p99']} ms")
+        elif command == 'prune':
+            days = float(argv[1]) if len(argv) > 1 else RETENTION_DAYS
+            print(f"🗑️ Deleted {prune(db, days)} rows older than {days:g} days")
+        elif command == 'vacuum':
+            before = os.path.getsize(DB_FILE)
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            db.execute("VACUUM")
+            print(f"🧹 {DB_FILE}: {before // 1024} KB -> {os.path.getsize(DB_FILE) // 1024} KB")
+        else:
+            print(__doc__.strip().splitlines()[-1])
+            return 1
+    finally:
+        db.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Fast exit for projects that have not opted in
+In a global install the hooks run in every project on the machine. The gate
+decides "disabled" before anything beyond os and sys is imported: a single
+stat() for projects without .claude/discord-state.json, and a negative cache
+keyed by project directory and state-file mtime for projects that have
+notifications turned off. The cache is plain text so reading it needs no
+JSON parser.
+
+A session running in a subdirectory of a project is matched to the project
+through the registry, ~/.claude/discord-projects.txt - one project root per
+line, written by the setup and start commands and by the hooks - and the
+hook then runs from the project root. A directory outside every registered
+project goes into the negative cache keyed by the registry's mtime: later
+hooks there stat() the registry and check the cache, and only read the
+registry again after it changes.
+The daemon keeps the config of every registered project in memory.
+"""
+
+import os
+import sys
+
+CONFIG_FILE = os.path.join(".claude", "discord-state.json")
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-disabled.cache")
+REGISTRY_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-projects.txt")
+
+# Directories remembered at once
+MAX_ENTRIES = 256
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+def _config_stat(cwd):
+    return _stat(os.path.join(cwd, CONFIG_FILE))
+
+def _cache_line(cwd, stat, kind=''):
+    # Size guards against an edit landing within the same mtime tick
+    return f"{kind}{stat.st_mtime_ns}:{stat.st_size}\t{cwd}"
+
+def _read_lines(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+def _read_cache():
+    return _read_lines(CACHE_FILE)
+
+def registered_roots():
+    """Roots of the projects in the registry."""
+    return [line for line in dict.fromkeys(_read_lines(REGISTRY_FILE)) if line]
+
+def find_project_root(cwd, roots):
+    """The innermost of roots that is cwd or contains it, or None."""
+    best = None
+    for root in roots:
+        if (cwd == root or cwd.startswith(root.rstrip('/') + '/')) and len(root) > len(best or ''):
+            best = root
+    return best
+
+def register_project(root=None):
+    """Add a project root to the registry unless it is already there."""
+    root = os.path.abspath(root or os.getcwd())
+    if root in registered_roots():
+        return
+    try:
+        os.makedirs(os.path.dirname(REGISTRY_FILE), exist_ok=True)
+        # A single short append is atomic; duplicates from a race are ignored on read
+        with open(REGISTRY_FILE, 'a', encoding='utf-8') as f:
+            f.write(root + "\n")
+    except OSError:
+        pass
+
+def project_enabled(cwd=None):
+    """Whether a project may have notifications on. False means the hook can exit at once."""
+    cwd = cwd or os.getcwd()
+    stat = _config_stat(cwd)
+    if stat is None:
+        return False
+    return _cache_line(cwd, stat) not in _read_cache()
+
+def _remember(cwd, line):
+    """Replace a directory's negative-cache entry."""
+    lines = [cached for cached in _read_cache() if cached.partition('\t')[2] != cwd]
+    lines.append(line)
+    tmp_path = f"{CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines[-MAX_ENTRIES:]) + "\n")
+        os.replace(tmp_path, CACHE_FILE)
+    except OSError:
+        pass  # Only a cache - the next hook takes the slow path
+
+def remember_disabled(cwd=None):
+    """Record that a project's current discord-state.json turns notifications off."""
+    cwd = cwd or os.getcwd()
+    stat = _config_stat(cwd)
+    if stat is not None:
+        _remember(cwd, _cache_line(cwd, stat))
+
+def _registered_root(cwd):
+    """The registered project containing cwd, or None (remembered until the registry changes)."""
+    registry = _stat(REGISTRY_FILE)
+    if registry is None:
+        return None
+    outside = _cache_line(cwd, registry, kind='r')
+    if outside in _read_cache():
+        return None
+    root = find_project_root(cwd, registered_roots())
+    if root and root != cwd and _config_stat(root) is not None:
+        return root
+    _remember(cwd, outside)
+    return None
+
+def exit_if_disabled():
+    """
+    Exit straight away when the current project has notifications off
+    From a subdirectory of a registered project, move to the project root
+    """
+    cwd = os.getcwd()
+    enabled = False
+    if _config_stat(cwd) is not None:
+        enabled = project_enabled(cwd)
+    else:
+        root = _registered_root(cwd)
+        if root:
+            # Every later phase (config, registry, relative paths) runs from the root
+            os.chdir(root)
+            enabled = project_enabled(root)
+    if enabled:
+        return
+    # Drain the hook input so Claude Code never writes into a closed pipe
+    if sys.stdin is not None:
+        sys.stdin.buffer.read()
+    sys.exit(0)
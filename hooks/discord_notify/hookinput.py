@@ -0,0 +1,208 @@
+"""
+Streaming reader for hook input
+For Write and MultiEdit the hook payload carries whole files in tool_input
+and again in tool_response, yet the hooks only look at a few short fields.
+The reader walks the JSON on stdin in fixed-size chunks and never holds
+more than a chunk plus the values it keeps: tool_response is skipped
+outright and left out of the result, and strings longer than
+MAX_STRING_BYTES are cut to that length without the rest ever being
+decoded. Everything else comes back as json.loads would return it.
+"""
+
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+
+# Longest string value kept in full (raw bytes, as escaped in the JSON)
+MAX_STRING_BYTES = 4096
+
+# Top-level fields no hook reads
+SKIPPED_KEYS = frozenset({'tool_response'})
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_LITERAL = re.compile(rb'[^ \t\n\r,\]}]+')
+
+# A string's closing quote is always followed by one of ,:}] - searching for
+# that pair skips most escaped quotes in code without looking at them
+_QUOTE_CANDIDATE = re.compile(rb'"[ \t\n\r]*[,:\]}]')
+
+BACKSLASH = 0x5c
+
+def _closing_quote(buf, pos):
+    """Index of the quote closing the string that continues at pos, or -1 if not in buf."""
+    search = _QUOTE_CANDIDATE.search
+    while True:
+        match = search(buf, pos)
+        if not match:
+            return -1
+        end = match.start()
+        if end == 0 or buf[end - 1] != BACKSLASH:
+            return end
+        # An even run of backslashes escapes itself, not the quote
+        start = end - 1
+        while start > 0 and buf[start - 1] == BACKSLASH:
+            start -= 1
+        if (end - start) % 2 == 0:
+            return end
+        pos = end + 1
+
+def _decode(raw, truncated):
+    """Turn a string's raw JSON bytes into str."""
+    if truncated:
+        # Don't leave half an escape sequence or a split character at the cut
+        escape = raw.rfind(b'\\', len(raw) - 6)
+        if escape >= 0:
+            while escape > 0 and raw[escape - 1] == BACKSLASH:
+                escape -= 1
+            raw = raw[:escape]
+        raw = raw.decode('utf-8', errors='ignore').encode('utf-8')
+    if BACKSLASH not in raw:
+        return raw.decode('utf-8')
+    text = json.loads(b'"' + raw + b'"')
+    # ...or the first half of an escaped surrogate pair
+    if truncated and text and '\ud800' <= text[-1] <= '\udbff':
+        text = text[:-1]
+    return text
+
+class HookInputReader:
+    """Parses one JSON document from a binary stream, chunk by chunk"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buf = b''
+        self.pos = 0
+        self.total = 0
+
+    def _more(self):
+        data = self.stream.read(CHUNK_SIZE)
+        if not data:
+            return False
+        self.total += len(data)
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        """Next non-whitespace byte, left unconsumed."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                raise ValueError("unexpected end of hook input")
+
+    def _expect(self, char):
+        if self._peek() != ord(char):
+            raise ValueError(f"expected {char!r} in hook input")
+        self.pos += 1
+
+    def _string(self, limit):
+        """Read a string, keeping at most `limit` raw bytes (0 = skip it)."""
+        self.pos += 1
+        kept = []
+        size = 0
+        while True:
+            end = _closing_quote(self.buf, self.pos)
+            if end >= 0:
+                stop = end
+            else:
+                # Keep a quote at the very end (what follows it is still
+                # unread) and the backslashes before it, which decide whether
+                # it is escaped
+                stop = quote = len(self.buf)
+                while quote > self.pos and self.buf[quote - 1] in b' \t\n\r':
+                    quote -= 1
+                if quote > self.pos and self.buf[quote - 1] == ord('"'):
+                    stop = quote - 1
+                while stop > self.pos and self.buf[stop - 1] == BACKSLASH:
+                    stop -= 1
+            if size < limit:
+                kept.append(self.buf[self.pos:min(stop, self.pos + limit - size)])
+            size += stop - self.pos
+            self.pos = stop
+            if end >= 0:
+                self.pos += 1
+                break
+            if not self._more():
+                raise ValueError("unterminated string in hook input")
+        if not limit:
+            return None
+        return _decode(b''.join(kept), size > limit)
+
+    def _literal(self):
+        while True:
+            match = _LITERAL.match(self.buf, self.pos)
+            if match and match.end() < len(self.buf):
+                break
+            # The token may continue in the next chunk
+            if not self._more():
+                match = _LITERAL.match(self.buf, self.pos)
+                if not match:
+                    raise ValueError("unexpected end of hook input")
+                break
+        self.pos = match.end()
+        return json.loads(match.group())
+
+    def value(self, skip=False, depth=0):
+        """Parse the next value; with skip=True walk past it and return None."""
+        char = self._peek()
+        if char == ord('"'):
+            return self._string(0 if skip else MAX_STRING_BYTES)
+
+        if char == ord('{'):
+            self.pos += 1
+            result = {}
+            if self._peek() == ord('}'):
+                self.pos += 1
+                return None if skip else result
+            while True:
+                if self._peek() != ord('"'):
+                    raise ValueError("expected a key in hook input")
+                key = self._string(MAX_STRING_BYTES)
+                self._expect(':')
+                if depth == 0 and key in SKIPPED_KEYS:
+                    self.value(True, depth + 1)
+                else:
+                    item = self.value(skip, depth + 1)
+                    if not skip:
+                        result[key] = item
+                if self._peek() == ord(','):
+                    self.pos += 1
+                    continue
+                self._expect('}')
+                return None if skip else result
+
+        if char == ord('['):
+            self.pos += 1
+            result = []
+            if self._peek() == ord(']'):
+                self.pos += 1
+                return None if skip else result
+            while True:
+                item = self.value(skip, depth + 1)
+                if not skip:
+                    result.append(item)
+                if self._peek() == ord(','):
+                    self.pos += 1
+                    continue
+                self._expect(']')
+                return None if skip else result
+
+        literal = self._literal()
+        return None if skip else literal
+
+def read_hook_input(stream):
+    """
+    Read the hook's JSON input from a binary stream
+    Returns (hook input dict, bytes read); malformed input reads as {}
+    """
+    reader = HookInputReader(stream)
+    try:
+        hook_input = reader.value()
+    except (ValueError, UnicodeDecodeError, RecursionError):
+        hook_input = {}
+    # Drain whatever is left so Claude Code never writes into a closed pipe
+    while reader._more():
+        pass
+    return (hook_input if isinstance(hook_input, dict) else {}), reader.total
@@ -0,0 +1,40 @@
+"""
+Small JSON state files shared between hook processes
+Updates hold an flock on a sidecar .lock file and are written via a temp
+file plus os.replace, so concurrent hooks never see a half-written file.
+"""
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+
+def read_state(path):
+    """Read a state file without locking. Missing or corrupt files read as {}."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (FileNotFoundError, json.JSONDecodeError, IOError):
+        return {}
+
+def write_state(path, state):
+    """Atomically replace a state file."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+@contextmanager
+def locked_state(path):
+    """Yield a state file's contents under an exclusive lock and save them afterwards."""
+    path = str(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        state = read_state(path)
+        yield state
+        write_state(path, state)
+    finally:
+        os.close(fd)
@@ -0,0 +1,94 @@
+"""
+Notification log shared by the hooks, the daemon and background workers
+Records are JSON lines in ~/.claude/discord-notifications.log. They are
+buffered in memory and written with a single append when the process exits
+(long-running processes call flush() themselves). Once the file passes
+MAX_BYTES it is rotated and the old segment gzip-compressed, keeping
+BACKUP_COUNT segments. DEBUG records are dropped unless
+DISCORD_NOTIFY_LOG_LEVEL=DEBUG is set.
+"""
+
+import atexit
+import json
+import os
+import time
+
+LOG_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-notifications.log")
+
+DEBUG = 'DEBUG'
+INFO = 'INFO'
+WARNING = 'WARNING'
+ERROR = 'ERROR'
+LEVELS = {DEBUG: 10, INFO: 20, WARNING: 30, ERROR: 40}
+
+THRESHOLD = LEVELS.get(os.environ.get('DISCORD_NOTIFY_LOG_LEVEL', '').upper(), LEVELS[INFO])
+
+# Rotate past this size, keeping this many compressed segments
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+
+# Write early if a long-running process buffers this many records
+MAX_BUFFERED = 100
+
+_buffer = []
+
+def log_message(message, level=INFO, **fields):
+    """Buffer a log record; extra keyword arguments become fields of the record."""
+    if LEVELS[level] < THRESHOLD:
+        return
+    if not _buffer:
+        atexit.register(flush)
+    record = {'ts': time.strftime('%Y-%m-%dT%H:%M:%S'), 'level': level, 'pid': os.getpid(), 'msg': message}
+    record.update(fields)
+    _buffer.append(json.dumps(record, ensure_ascii=False, default=str))
+    if len(_buffer) >= MAX_BUFFERED:
+        flush()
+
+def flush():
+    """Write buffered records with one append, rotating the log when it grows too large."""
+    if not _buffer:
+        return
+    data = ("\n".join(_buffer) + "\n").encode('utf-8')
+    _buffer.clear()
+    atexit.unregister(flush)
+    try:
+        fd = os.open(LOG_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > MAX_BYTES:
+            _rotate()
+    except Exception:
+        pass  # Fail silently if logging fails
+
+def _rotate():
+    """Move the log aside as a compressed segment. Only one process rotates at a time."""
+    import fcntl
+    import gzip
+    import shutil
+
+    fd = os.open(f"{LOG_FILE}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return  # Another process is rotating
+
+        # It may already have been rotated while we waited
+        if os.path.getsize(LOG_FILE) <= MAX_BYTES:
+            return
+
+        for index in range(BACKUP_COUNT - 1, 0, -1):
+            segment = f"{LOG_FILE}.{index}.gz"
+            if os.path.exists(segment):
+                os.replace(segment, f"{LOG_FILE}.{index + 1}.gz")
+
+        rotated = f"{LOG_FILE}.{os.getpid()}.rotating"
+        os.replace(LOG_FILE, rotated)
+        with open(rotated, 'rb') as src, gzip.open(f"{LOG_FILE}.1.gz", 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.unlink(rotated)
+    finally:
+        os.close(fd)
@@ -0,0 +1,169 @@
+"""
+Per-invocation timing metrics for the hooks
+Each hook run records monotonic timings for its phases (reading and
+parsing stdin, forwarding, config load, building the message, delivery
+and the HTTP round-trip) plus the CPU time of interpreter startup,
+payload size and HTTP status, and appends them as one compact JSON line
+to ~/.claude/discord-metrics.jsonl.
+Setting DISCORD_NOTIFY_METRICS=0 turns recording off.
+
+With DISCORD_NOTIFY_PROMETHEUS=/path/to/discord_hooks.prom each run also
+folds its timings into running totals and rewrites that file for the
+node_exporter textfile collector.
+"""
+
+import json
+import os
+import time
+
+METRICS_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-metrics.jsonl")
+TOTALS_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-metrics-totals.json")
+
+ENABLED = os.environ.get('DISCORD_NOTIFY_METRICS', '1') != '0'
+PROMETHEUS_FILE = os.environ.get('DISCORD_NOTIFY_PROMETHEUS')
+
+# Rotate the metrics file past this size, keeping one previous file
+MAX_BYTES = 1024 * 1024
+
+# Histogram buckets for whole-run duration (seconds)
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_record = None
+
+def start(event=None, source='hook'):
+    """Begin recording a hook run (or, with source='daemon', one forwarded event)."""
+    global _record
+    if not ENABLED:
+        return
+    _record = {'ts': round(time.time(), 3), 'event': event, 'source': source, 'ms': {}}
+    if source == 'hook':
+        # CPU time spent before main() ran (interpreter start and imports).
+        # Kept apart from the wall-clock phases in 'ms', which it can't be added to
+        _record['startup_cpu_ms'] = round(time.process_time() * 1000, 2)
+    _record['_start'] = time.perf_counter()
+
+class phase:
+    """Times a phase of the current run in a with block. Repeated phases add up."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if _record is not None:
+            elapsed = (time.perf_counter() - self.started) * 1000
+            _record['ms'][self.name] = round(_record['ms'].get(self.name, 0) + elapsed, 2)
+
+def note(**fields):
+    """Attach fields such as event, status or payload size to the current run."""
+    if _record is not None:
+        _record.update(fields)
+
+def finish():
+    """Write the current run's record."""
+    global _record
+    record, _record = _record, None
+    if record is None:
+        return
+    record['total_ms'] = round((time.perf_counter() - record.pop('_start')) * 1000, 2)
+    try:
+        fd = os.open(METRICS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, (json.dumps(record, separators=(',', ':')) + "\n").encode('utf-8'))
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > MAX_BYTES:
+            os.replace(METRICS_FILE, f"{METRICS_FILE}.1")
+        if PROMETHEUS_FILE:
+            export_prometheus(record)
+    except Exception:
+        pass  # Metrics must never break a hook
+
+def _accumulate(totals, record):
+    # Totals are keyed by tab-joined label values
+    event = f"{record.get('source', 'hook')}\t{record.get('event') or 'unknown'}"
+    status = str(record.get('status', 'none'))
+    runs = totals.setdefault('runs', {})
+    runs[f"{event}\t{status}"] = runs.get(f"{event}\t{status}", 0) + 1
+
+    phases = totals.setdefault('phases', {})
+    for name, ms in record['ms'].items():
+        entry = phases.setdefault(f"{event}\t{name}", [0, 0.0])
+        entry[0] += 1
+        entry[1] += ms / 1000
+
+    if 'startup_cpu_ms' in record:
+        startup = totals.setdefault('startup_cpu', {}).setdefault(event, [0, 0.0])
+        startup[0] += 1
+        startup[1] += record['startup_cpu_ms'] / 1000
+
+    duration = totals.setdefault('duration', {}).setdefault(event, {'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0})
+    seconds = record['total_ms'] / 1000
+    for i, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            duration['buckets'][i] += 1
+    duration['count'] += 1
+    duration['sum'] += seconds
+
+    if 'payload_bytes' in record:
+        payload = totals.setdefault('payload', {}).setdefault(event, [0, 0])
+        payload[0] += 1
+        payload[1] += record['payload_bytes']
+
+def _labels(key, *names):
+    return ','.join(f'{name}="{value}"' for name, value in zip(('source', 'event') + names, key.split('\t')))
+
+def render_prometheus(totals):
+    """Render running totals in the Prometheus text exposition format."""
+    lines = ['# HELP discord_hook_runs_total Hook invocations by event and HTTP status.',
+             '# TYPE discord_hook_runs_total counter']
+    for key, count in sorted(totals.get('runs', {}).items()):
+        lines.append(f'discord_hook_runs_total{{{_labels(key, "status")}}} {count}')
+
+    lines += ['# HELP discord_hook_phase_seconds Time spent per hook phase.',
+              '# TYPE discord_hook_phase_seconds summary']
+    for key, (count, total) in sorted(totals.get('phases', {}).items()):
+        labels = _labels(key, 'phase')
+        lines.append(f'discord_hook_phase_seconds_sum{{{labels}}} {total:.6f}')
+        lines.append(f'discord_hook_phase_seconds_count{{{labels}}} {count}')
+
+    lines += ['# HELP discord_hook_startup_cpu_seconds CPU time of interpreter startup and imports before a hook ran.',
+              '# TYPE discord_hook_startup_cpu_seconds summary']
+    for key, (count, total) in sorted(totals.get('startup_cpu', {}).items()):
+        labels = _labels(key)
+        lines.append(f'discord_hook_startup_cpu_seconds_sum{{{labels}}} {total:.6f}')
+        lines.append(f'discord_hook_startup_cpu_seconds_count{{{labels}}} {count}')
+
+    lines += ['# HELP discord_hook_duration_seconds Wall-clock time of a hook run after startup.',
+              '# TYPE discord_hook_duration_seconds histogram']
+    for key, duration in sorted(totals.get('duration', {}).items()):
+        labels = _labels(key)
+        for bound, count in zip(BUCKETS, duration['buckets']):
+            lines.append(f'discord_hook_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'discord_hook_duration_seconds_bucket{{{labels},le="+Inf"}} {duration["count"]}')
+        lines.append(f'discord_hook_duration_seconds_sum{{{labels}}} {duration["sum"]:.6f}')
+        lines.append(f'discord_hook_duration_seconds_count{{{labels}}} {duration["count"]}')
+
+    lines += ['# HELP discord_hook_payload_bytes Size of webhook payloads sent.',
+              '# TYPE discord_hook_payload_bytes summary']
+    for key, (count, total) in sorted(totals.get('payload', {}).items()):
+        labels = _labels(key)
+        lines.append(f'discord_hook_payload_bytes_sum{{{labels}}} {total}')
+        lines.append(f'discord_hook_payload_bytes_count{{{labels}}} {count}')
+    return "\n".join(lines) + "\n"
+
+def export_prometheus(record):
+    """Add a run to the running totals and rewrite the textfile-collector file."""
+    from discord_notify.jsonstate import locked_state
+
+    with locked_state(TOTALS_FILE) as totals:
+        _accumulate(totals, record)
+        # Write under the lock so exports land in order; the collector
+        # only ever sees a complete file
+        tmp_path = f"{PROMETHEUS_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(render_prometheus(totals))
+        os.replace(tmp_path, PROMETHEUS_FILE)
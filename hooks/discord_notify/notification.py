@@ -0,0 +1,48 @@
+"""
+Notification event handler
+Builds the "Input Needed" message when Claude is waiting on the user.
+"""
+
+import time
+
+from discord_notify.text import truncate_text
+
+def create_notification_embed(session_id, message, title):
+    """Create embed for input needed notification."""
+    return {
+        "embeds": [{
+            "title": "🔔 Input Needed",
+            "description": truncate_text(message, 200),
+            "color": 3447003,  # Blue
+            "fields": [
+                {
+                    "name": "Session ID",
+                    "value": f"`{session_id[:8]}...`",
+                    "inline": True
+                },
+                {
+                    "name": "Timestamp",
+                    "value": time.strftime('%Y-%m-%d %H:%M:%S'),
+                    "inline": True
+                },
+                {
+                    "name": "Source",
+                    "value": title,
+                    "inline": True
+                }
+            ],
+            "footer": {
+                "text": "Claude Code - Input Required"
+            }
+        }]
+    }
+
+def build_message(hook_input, config):
+    """Build the Discord message for this event."""
+    # Extract information from the hook input
+    session_id = hook_input.get('session_id', 'unknown')
+    message = hook_input.get('message', 'Claude needs your attention')
+    title = hook_input.get('title', 'Claude Code')
+    
+    # Build the notification embed
+    return create_notification_embed(session_id, message, title)
@@ -0,0 +1,332 @@
+"""
+On-disk outbox for fire-and-forget Discord delivery
+Hooks atomically spool each payload into ~/.claude/discord-outbox/ and
+return at once; a detached worker drains the spool in the background.
+An entry is only removed after Discord has answered, so a worker killed
+mid-send re-sends it on the next run instead of losing it. Failed entries
+stay spooled with their next attempt time (see retry.py); the worker keeps
+per-webhook order by holding back later entries for a webhook that is
+waiting on a retry. Entries spooled with a batch_key are held for the
+batch window and then coalesced with every other entry in the same batch
+into as few webhook messages as possible (see batching.py); in digest
+mode the whole batch becomes one digest message. Entries spooled with a
+session_thread go to their session's thread, creating it if the session
+has none yet (see sessionthreads.py).
+
+Usage: python3 -m discord_notify.outbox   (drain the spool)
+"""
+
+import fcntl
+import json
+import os
+import sys
+import time
+
+from discord_notify import metrics
+
+OUTBOX_DIR = os.path.join(os.path.expanduser("~"), ".claude", "discord-outbox")
+WORKER_LOCK = os.path.join(OUTBOX_DIR, ".worker.lock")
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Longest the worker sleeps between spool scans while retries are pending
+MAX_IDLE_SLEEP = 1.0
+
+def _make_dir():
+    # Entries hold the full webhook URL, which is a credential
+    os.makedirs(OUTBOX_DIR, mode=0o700, exist_ok=True)
+
+def _write_entry(path, entry):
+    """Write an entry via a temp file and rename so readers never see it half-written."""
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def enqueue(webhook_url, payload, label, target, session_id,
+            attempts=0, next_attempt_at=None, retry=None, batch_key=None, batch_mode=None, project=None,
+            timeouts=None, session_thread=None):
+    """Atomically spool a payload for delivery and make sure a worker is running."""
+    _make_dir()
+    entry = {
+        'url': webhook_url,
+        'payload': payload,
+        'label': label,
+        'target': target,
+        'session_id': session_id,
+        'created_at': time.time(),
+        'attempts': attempts,
+        'next_attempt_at': next_attempt_at or 0,
+        'retry': retry,
+        'batch_key': batch_key,
+        'batch_mode': batch_mode,
+        'project': project,
+        'timeouts': timeouts,
+        'session_thread': session_thread
+    }
+
+    # Names sort by enqueue time so the worker delivers in order
+    name = f"{time.time_ns():020d}-{os.getpid()}.json"
+    _write_entry(os.path.join(OUTBOX_DIR, name), entry)
+    metrics.note(queued=True)
+
+    spawn_worker()
+
+def pending_entries():
+    """Return spooled entry paths in delivery order."""
+    try:
+        names = sorted(n for n in os.listdir(OUTBOX_DIR) if n.endswith('.json') and not n.startswith('.'))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(OUTBOX_DIR, n) for n in names]
+
+def depth(urls=None):
+    """
+    Spooled entries, optionally only those for some webhook URLs (any thread)
+    Returns (entries, entries waiting to retry, creation time of the oldest or None)
+    """
+    entries = retrying = 0
+    oldest = None
+    for path in pending_entries():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if urls is not None and entry.get('url', '').split('?')[0] not in urls:
+            continue
+        entries += 1
+        retrying += entry.get('attempts', 0) > 0
+        created_at = entry.get('created_at')
+        if created_at and (oldest is None or created_at < oldest):
+            oldest = created_at
+    return entries, retrying, oldest
+
+def _try_lock():
+    """Take the single-worker lock without blocking. Returns the lock fd or None."""
+    _make_dir()
+    fd = os.open(WORKER_LOCK, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+    except OSError:
+        os.close(fd)
+        return None
+
+def spawn_worker():
+    """Start a detached drain worker unless one is already running."""
+    fd = _try_lock()
+    if fd is None:
+        return  # A running worker will pick up the new entry
+    os.close(fd)
+
+    import subprocess
+    subprocess.Popen(
+        [sys.executable, "-m", "discord_notify.outbox"],
+        cwd=PACKAGE_PARENT,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+
+def read_entry(path):
+    """Load a spooled entry, dropping it if it is unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, IOError):
+        from discord_notify.log import ERROR, log_message
+        log_message(f"❌ Dropping unreadable outbox entry {os.path.basename(path)}", ERROR)
+        _remove(path)
+        return None
+
+def deliver(path, entry, sender):
+    """
+    Attempt one spooled entry
+    Returns the time of the next attempt if it was rescheduled, otherwise None
+    """
+    from discord_notify import retry, sessionthreads
+    from discord_notify.delivery import EVENT_LABELS, Deferred, post
+    from discord_notify.log import ERROR, WARNING, log_message
+
+    session_short = (entry.get('session_id') or 'unknown')[:8]
+    label = entry.get('label', 'Discord')
+    target = entry.get('target', 'channel')
+
+    events = {event_label: event for event, (_, event_label) in EVENT_LABELS.items()}
+    context = {'session_id': entry.get('session_id'), 'project': entry.get('project'),
+               'event': events.get(label, label), 'attempt': entry.get('attempts', 0) + 1}
+
+    # The worker's sender serves every project - use the one this entry came from's deadlines
+    sender.set_timeouts(*(entry.get('timeouts') or ()))
+
+    url, payload = entry['url'], entry['payload']
+    thread = entry.get('session_thread')
+    creating = refused = False
+    status = headers = body = None
+    try:
+        if thread:
+            url, payload, creating = sessionthreads.outbox_request(url, payload, thread)
+        try:
+            status, headers, body = post(url, payload, sender, max_wait=MAX_IDLE_SLEEP, context=context)
+        finally:
+            if creating:
+                refused = sessionthreads.outbox_result(entry['url'], thread, status, body)
+        if retry.is_success(status):
+            log_message(f"✅ {label} notification sent from outbox to {target} - Session: {session_short}", event=label, session=session_short)
+            _remove(path)
+            return None
+        reason = f"HTTP {status}"
+    except Deferred as e:
+        # Waiting on the rate limiter is not a failed attempt
+        entry['next_attempt_at'] = time.time() + e.wait
+        _write_entry(path, entry)
+        return entry['next_attempt_at']
+    except Exception as e:
+        reason = str(e)
+
+    if refused:
+        # The webhook can't hold threads - send to its channel instead, straight away
+        entry['session_thread'] = None
+        entry['next_attempt_at'] = time.time()
+        _write_entry(path, entry)
+        return entry['next_attempt_at']
+
+    attempts = entry.get('attempts', 0) + 1
+    policy = retry.get_policy(entry.get('retry'))
+    delay = retry.next_attempt_delay(attempts, entry.get('created_at', time.time()), policy,
+                                     status, headers, body)
+    if delay is None:
+        log_message(f"❌ {label} notification dropped after {attempts} attempt(s) ({reason}) to {target} - Session: {session_short}",
+                    ERROR, event=label, session=session_short, attempts=attempts)
+        _remove(path)
+        return None
+
+    entry['attempts'] = attempts
+    entry['next_attempt_at'] = time.time() + delay
+    _write_entry(path, entry)
+    log_message(f"⏳ {label} notification failed ({reason}) to {target}, retry {attempts + 1}/{policy['max_attempts']} in {delay:.1f}s - Session: {session_short}",
+                WARNING, event=label, session=session_short, attempts=attempts)
+    return entry['next_attempt_at']
+
+def coalesce(batch):
+    """
+    Merge a batch of spooled entries into as few messages as possible
+    The merged messages reuse the oldest entries' files so order is kept
+    """
+    from discord_notify.batching import digest_embed, merge_payloads
+
+    first = batch[0][1]
+    overrides = {'batch_key': None}
+    if first.get('batch_mode') == 'digest':
+        messages = [{"embeds": [digest_embed([entry for _, entry in batch], time.time())]}]
+        overrides.update(label='Activity digest', session_id=None)
+    else:
+        messages = merge_payloads([entry['payload'] for _, entry in batch], first.get('batch_mode') or 'embeds')
+        if not messages:
+            # Nothing to merge (no embeds) - send the entries as they are
+            messages = [entry['payload'] for _, entry in batch]
+    merged = []
+    for (path, entry), message in zip(batch, messages):
+        entry = dict(entry, payload=message, **overrides)
+        _write_entry(path, entry)
+        merged.append((path, entry))
+    for path, _ in batch[len(messages):]:
+        _remove(path)
+    return merged
+
+def drain_pass(sender):
+    """
+    Attempt every due entry once, oldest first
+    Returns (entries attempted, earliest pending retry time or None)
+    """
+    now = time.time()
+    blocked = {}
+    attempted = 0
+
+    entries = []
+    for path in pending_entries():
+        entry = read_entry(path)
+        if entry is not None:
+            entries.append((path, entry))
+
+    # A due non-batched message flushes the batches queued ahead of it early,
+    # so e.g. "Session Complete" never overtakes the last progress batch
+    urgent = {entry.get('url') for _, entry in entries
+              if not entry.get('batch_key') and entry.get('next_attempt_at', 0) <= now}
+
+    for path, entry in entries:
+        # Keep per-webhook order: nothing overtakes an entry waiting to retry
+        url = entry.get('url')
+        if url in blocked:
+            continue
+
+        due = entry.get('next_attempt_at', 0)
+        if entry.get('batch_key') and url in urgent:
+            due = now
+        if due > now:
+            blocked[url] = due
+            continue
+
+        if entry.get('batch_key'):
+            batch = [(p, e) for p, e in entries
+                     if e.get('url') == url and e.get('batch_key') == entry['batch_key']]
+            path, entry = coalesce(batch)[0]
+            deliver(path, entry, sender)
+            # The spool changed under us - start a fresh pass
+            return attempted + 1, None
+
+        attempted += 1
+        retry_at = deliver(path, entry, sender)
+        if retry_at:
+            blocked[url] = retry_at
+
+    return attempted, min(blocked.values()) if blocked else None
+
+def drain():
+    """Deliver spooled entries until the spool is empty. Only one worker runs at a time."""
+    from discord_notify.log import flush as flush_log
+    from discord_notify.transport import WebhookSender
+
+    sender = WebhookSender()
+    try:
+        while True:
+            fd = _try_lock()
+            if fd is None:
+                return
+            try:
+                while True:
+                    attempted, retry_at = drain_pass(sender)
+                    flush_log()
+                    if attempted:
+                        continue
+                    if retry_at is None:
+                        break
+                    # Only retries remain - sleep until one is due, waking
+                    # regularly to pick up newly spooled entries
+                    time.sleep(min(MAX_IDLE_SLEEP, max(0.05, retry_at - time.time())))
+            finally:
+                os.close(fd)
+
+            # An entry spooled while we held the lock may not have spawned a
+            # worker - look once more after releasing it
+            if not pending_entries():
+                return
+    finally:
+        sender.close()
+        from discord_notify import eventstore
+        eventstore.flush()
+        eventstore.ingest()
+
+if __name__ == "__main__":
+    drain()
@@ -0,0 +1,83 @@
+"""
+PostToolUse event handler
+Builds the "Work in Progress" message for tools the project's rules let through.
+"""
+
+import os
+import time
+
+from discord_notify.text import truncate_text
+
+def get_tool_description(tool_name, tool_input):
+    """Generate contextual description based on tool type."""
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+    
+    if tool_name in ['Write', 'Edit', 'MultiEdit']:
+        file_path = tool_input.get('file_path', '')
+        filename = os.path.basename(file_path) if file_path else 'file'
+        return f"📝 Modified {filename}"
+    
+    elif tool_name == 'Bash':
+        command = tool_input.get('command', '')
+        return f"⚡ Executed: {truncate_text(command, 50)}"
+    
+    elif tool_name == 'Read':
+        file_path = tool_input.get('file_path', '')
+        filename = os.path.basename(file_path) if file_path else 'file'
+        return f"📖 Read {filename}"
+    
+    elif tool_name in ['TodoWrite', 'TodoRead']:
+        return "📋 Updated task list"
+    
+    elif tool_name in ['WebFetch', 'WebSearch']:
+        return "🌐 Web research"
+    
+    elif tool_name in ['Glob', 'Grep']:
+        return "🔍 Code search"
+    
+    else:
+        return f"🔧 Used {tool_name}"
+
+def create_progress_embed(tool_name, tool_input, session_id, tool_description):
+    """Create embed for PostToolUse notification."""
+    return {
+        "embeds": [{
+            "title": "⚡ Work in Progress",
+            "description": tool_description,
+            "color": 15844367,  # Orange/Gold
+            "fields": [
+                {
+                    "name": "Session ID",
+                    "value": f"`{session_id[:8]}...`",
+                    "inline": True
+                },
+                {
+                    "name": "Tool",
+                    "value": tool_name,
+                    "inline": True
+                },
+                {
+                    "name": "Timestamp",
+                    "value": time.strftime('%Y-%m-%d %H:%M:%S'),
+                    "inline": True
+                }
+            ],
+            "footer": {
+                "text": "Claude Code - Working..."
+            }
+        }]
+    }
+
+def build_message(hook_input, config):
+    """Build the Discord message for this event."""
+    # Extract information from the hook input
+    session_id = hook_input.get('session_id', 'unknown')
+    tool_name = hook_input.get('tool_name', 'unknown')
+    tool_input = hook_input.get('tool_input', {})
+    
+    # Minor tools were already filtered out by the project's rules (see rules.py)
+    tool_description = get_tool_description(tool_name, tool_input)
+    
+    # Build the progress notification embed
+    return create_progress_embed(tool_name, tool_input, session_id, tool_description)
@@ -0,0 +1,186 @@
+"""
+Live-updating progress message
+Instead of posting a new "Work in Progress" message for every tool, each
+session gets one message: it is created with ?wait=true and then edited in
+place with PATCH .../messages/{message_id}. Message IDs and each session's
+recent activity live in ~/.claude/discord-progress.json. Edits are throttled
+to one per progress_interval seconds; an update held back by the throttle is
+sent with the session's next notification.
+"""
+
+import json
+import os
+import time
+
+from discord_notify.jsonstate import locked_state
+from discord_notify.log import ERROR, log_message
+
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-progress.json")
+
+# Minimum seconds between edits of a session's progress message
+DEFAULT_INTERVAL = 5.0
+
+# Activity lines shown in the progress message
+RECENT_ACTIONS = 10
+
+# A send that has not finished after this long is presumed dead
+CLAIM_TIMEOUT = 30
+
+# Forget sessions that have been idle this long
+STALE_AFTER = 24 * 3600
+
+def _target(config):
+    """Identify where a session's message lives, without the webhook token."""
+    from discord_notify.ratelimit import webhook_key
+    return f"{webhook_key(config['webhook_url'])}:{config.get('thread_id', '')}"
+
+def create_url(config):
+    """Webhook URL that returns the created message."""
+    from discord_notify.delivery import build_webhook_url
+    webhook_url = build_webhook_url(config)
+    separator = '&' if '?' in webhook_url else '?'
+    return f"{webhook_url}{separator}wait=true"
+
+def edit_url(config, message_id):
+    """Webhook URL for editing a message it created."""
+    from discord_notify.delivery import build_webhook_url
+    base, _, query = build_webhook_url(config).partition('?')
+    url = f"{base.rstrip('/')}/messages/{message_id}"
+    return f"{url}?{query}" if query else url
+
+def render(session, finished=False):
+    """Build the progress message from a session's latest embed and recent activity."""
+    embed = dict(session['embed'])
+    count = session['count']
+    embed['title'] = f"⚡ Work in Progress ({count} action{'s' if count != 1 else ''})"
+
+    lines = [f"• {line}" for line in session['actions']]
+    if count > len(lines):
+        lines.insert(0, f"…{count - len(lines)} earlier")
+    embed['description'] = "\n".join(lines)[:4096]
+
+    if finished:
+        embed['footer'] = {"text": "Claude Code - Finished"}
+    return {"embeds": [embed]}
+
+def _prune(state, now):
+    sessions = state.get('sessions', {})
+    for session_id in [s for s, v in sessions.items() if now - v.get('updated', 0) > STALE_AFTER]:
+        del sessions[session_id]
+
+def _claim(session, now, interval):
+    """Decide under the state lock whether this process sends the next update."""
+    if now - session.get('sending_since', 0) < CLAIM_TIMEOUT:
+        return False  # Another hook is sending; it will leave the update pending
+    if session.get('message_id') and now - session.get('edited_at', 0) < interval:
+        return False
+    session['sending_since'] = now
+    session['dirty'] = False
+    return True
+
+def _send(session_id, session, config, sender, max_wait, finished=False):
+    """Create or edit a session's progress message. Returns True on success."""
+    from discord_notify.delivery import Deferred, describe_target, post
+    from discord_notify.retry import is_success
+
+    target = describe_target(config)
+    session_short = session_id[:8] if session_id else 'unknown'
+    payload = render(session, finished)
+    message_id = session.get('message_id')
+    context = {'session_id': session_id, 'project': config.get('project_name'), 'event': 'PostToolUse'}
+
+    ok = False
+    try:
+        if message_id:
+            status, _, body = post(edit_url(config, message_id), payload, sender, max_wait, method='PATCH', context=context)
+            if status == 404:
+                # The message was deleted - start a new one
+                message_id = None
+        if not message_id:
+            status, _, body = post(create_url(config), payload, sender, max_wait, context=context)
+            if is_success(status):
+                message_id = json.loads(body).get('id')
+                log_message(f"⚡ Progress message created in {target} - Session: {session_short}", session=session_short)
+        ok = is_success(status) and message_id is not None
+        if not ok:
+            log_message(f"❌ Progress message update failed (HTTP {status}) to {target} - Session: {session_short}",
+                        ERROR, session=session_short, status=status)
+    except Deferred:
+        pass  # Rate limited - the update stays pending for the next event
+    except Exception as e:
+        log_message(f"❌ Progress message update failed ({str(e)}) to {target} - Session: {session_short}",
+                    ERROR, session=session_short)
+
+    if finished:
+        return ok
+
+    with locked_state(STATE_FILE) as state:
+        current = state.get('sessions', {}).get(session_id)
+        if current is not None:
+            current['sending_since'] = 0
+            if ok:
+                current['message_id'] = message_id
+                current['edited_at'] = time.time()
+            else:
+                current['dirty'] = True
+    return ok
+
+def _with_sender(sender, config, send):
+    """Call send(sender), opening a sender for the call if none was given."""
+    owns_sender = sender is None
+    if owns_sender:
+        from discord_notify.transport import WebhookSender
+        sender = WebhookSender(config.get('connect_timeout'), config.get('read_timeout'))
+    try:
+        return send(sender)
+    finally:
+        if owns_sender:
+            sender.close()
+
+def update(embed_data, config, session_id, sender=None, max_wait=None):
+    """Record a tool's progress embed and refresh the session's message if the throttle allows."""
+    embed = embed_data['embeds'][0]
+    interval = config.get('progress_interval') or DEFAULT_INTERVAL
+    target = _target(config)
+    now = time.time()
+
+    with locked_state(STATE_FILE) as state:
+        _prune(state, now)
+        sessions = state.setdefault('sessions', {})
+        session = sessions.get(session_id)
+        if session is None or session.get('target') != target:
+            session = sessions[session_id] = {'target': target, 'message_id': None, 'actions': [], 'count': 0}
+        session['actions'] = (session['actions'] + [embed.get('description', '')])[-RECENT_ACTIONS:]
+        session['count'] += 1
+        session['embed'] = embed
+        session['dirty'] = True
+        session['updated'] = now
+        if not _claim(session, now, interval):
+            return
+        snapshot = dict(session)
+
+    _with_sender(sender, config, lambda s: _send(session_id, snapshot, config, s, max_wait))
+
+def flush(config, session_id, sender=None, max_wait=None, finished=False):
+    """
+    Send a session's held-back progress update
+    When the session has finished, mark its message as done and forget it
+    """
+    now = time.time()
+    with locked_state(STATE_FILE) as state:
+        sessions = state.get('sessions', {})
+        session = sessions.get(session_id)
+        if session is None or session.get('target') != _target(config):
+            return
+        if now - session.get('sending_since', 0) < CLAIM_TIMEOUT:
+            return  # A send is in flight; the update stays pending
+        if finished:
+            del sessions[session_id]
+        elif not session.get('dirty'):
+            return
+        else:
+            session['sending_since'] = now
+            session['dirty'] = False
+        snapshot = dict(session)
+
+    _with_sender(sender, config, lambda s: _send(session_id, snapshot, config, s, max_wait, finished))
@@ -0,0 +1,156 @@
+"""
+Discord rate-limit scheduler shared by every hook process
+Discord allows roughly 5 requests per 2 seconds per webhook. Each webhook
+gets a token bucket in ~/.claude/discord-ratelimit.json so that concurrent
+sessions and projects pace themselves together. Until Discord has answered
+the bucket refills smoothly; after that it follows Discord's fixed windows
+from the X-RateLimit-* headers, and a 429 blocks the bucket for as long as
+Discord asks.
+"""
+
+import os
+import re
+import time
+
+from discord_notify.jsonstate import locked_state, read_state
+
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-ratelimit.json")
+
+# Used until Discord tells us the real limit
+DEFAULT_LIMIT = 5
+DEFAULT_PERIOD = 2.0
+
+# Forget buckets that have been idle this long
+STALE_AFTER = 24 * 3600
+
+WEBHOOK_ID = re.compile(r'/webhooks/(\d+)')
+
+def webhook_key(url):
+    """Identify a webhook by its ID so the token never lands in the state file."""
+    match = WEBHOOK_ID.search(url)
+    key = match.group(1) if match else url.split('?')[0].rsplit('/', 1)[0]
+    # Discord paces message edits separately from new messages
+    if '/messages/' in url:
+        key += '/messages'
+    return key
+
+def _bucket(state, key, now):
+    """Return the bucket a webhook is paced by, creating and refilling it as needed."""
+    webhooks = state.setdefault('webhooks', {})
+    buckets = state.setdefault('buckets', {})
+
+    # Webhooks that Discord reports in the same bucket share one budget
+    name = webhooks.get(key, key)
+    bucket = buckets.get(name)
+    if bucket is None:
+        bucket = buckets[name] = {
+            'limit': DEFAULT_LIMIT,
+            'period': DEFAULT_PERIOD,
+            'tokens': float(DEFAULT_LIMIT),
+            'blocked_until': 0,
+            'reset_at': None,
+            'updated': now
+        }
+
+    reset_at = bucket.get('reset_at')
+    if reset_at:
+        # Discord uses fixed windows: the budget comes back in full at reset
+        if now >= reset_at:
+            bucket['tokens'] = min(float(bucket['limit']), bucket['tokens'] + bucket['limit'])
+            bucket['reset_at'] = reset_at + bucket['period'] if now < reset_at + bucket['period'] else None
+    else:
+        # No window seen yet - refill smoothly at the default rate
+        rate = bucket['limit'] / bucket['period']
+        bucket['tokens'] = min(float(bucket['limit']), bucket['tokens'] + (now - bucket['updated']) * rate)
+    bucket['updated'] = now
+    return bucket
+
+def _prune(state, now):
+    buckets = state.get('buckets', {})
+    for name in [n for n, b in buckets.items() if now - b.get('updated', 0) > STALE_AFTER]:
+        del buckets[name]
+    webhooks = state.get('webhooks', {})
+    for key in [k for k, n in webhooks.items() if n not in buckets]:
+        del webhooks[key]
+
+def acquire(url):
+    """
+    Reserve a send slot for a webhook
+    Returns how many seconds the caller must wait before sending (0 = now)
+    """
+    key = webhook_key(url)
+    now = time.time()
+    with locked_state(STATE_FILE) as state:
+        bucket = _bucket(state, key, now)
+
+        # Tokens may go negative: each waiting sender holds a later slot
+        bucket['tokens'] -= 1
+        wait = 0.0
+        if bucket['tokens'] < 0:
+            windows_ahead = -bucket['tokens'] / bucket['limit']
+            if bucket.get('reset_at'):
+                wait = bucket['reset_at'] - now + int(windows_ahead) * bucket['period']
+            else:
+                wait = windows_ahead * bucket['period']
+        return max(wait, bucket['blocked_until'] - now)
+
+def blocked_for(url):
+    """Seconds until Discord lets a webhook send again, read without locking."""
+    state = read_state(STATE_FILE)
+    key = webhook_key(url)
+    bucket = state.get('buckets', {}).get(state.get('webhooks', {}).get(key, key))
+    if not bucket:
+        return 0.0
+    return max(0.0, bucket.get('blocked_until', 0) - time.time())
+
+def release(url):
+    """Give back a reserved slot the caller decided not to use."""
+    key = webhook_key(url)
+    with locked_state(STATE_FILE) as state:
+        bucket = _bucket(state, key, time.time())
+        bucket['tokens'] = min(float(bucket['limit']), bucket['tokens'] + 1)
+
+def _header_float(headers, name):
+    try:
+        value = headers.get(name)
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def record(url, status, headers, retry_after=None):
+    """Update a webhook's bucket from Discord's response."""
+    if headers is None and status != 429:
+        return
+
+    key = webhook_key(url)
+    now = time.time()
+    with locked_state(STATE_FILE) as state:
+        bucket_name = headers.get('X-RateLimit-Bucket') if headers is not None else None
+        webhooks = state.setdefault('webhooks', {})
+        if bucket_name and webhooks.get(key) != bucket_name:
+            # Carry the budget spent so far over to Discord's named bucket
+            buckets = state.setdefault('buckets', {})
+            spent = buckets.pop(webhooks.get(key, key), None)
+            if spent and bucket_name not in buckets:
+                buckets[bucket_name] = spent
+            webhooks[key] = bucket_name
+
+        bucket = _bucket(state, key, now)
+        if headers is not None:
+            limit = _header_float(headers, 'X-RateLimit-Limit')
+            remaining = _header_float(headers, 'X-RateLimit-Remaining')
+            reset_after = _header_float(headers, 'X-RateLimit-Reset-After')
+
+            if limit:
+                bucket['limit'] = int(limit)
+            if remaining is not None:
+                bucket['tokens'] = min(bucket['tokens'], remaining)
+                if reset_after is not None:
+                    bucket['reset_at'] = now + reset_after
+                    if remaining <= 0:
+                        bucket['blocked_until'] = max(bucket['blocked_until'], now + reset_after)
+
+        if status == 429 and retry_after is not None:
+            bucket['blocked_until'] = max(bucket['blocked_until'], now + retry_after)
+
+        _prune(state, now)
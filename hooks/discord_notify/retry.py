@@ -0,0 +1,115 @@
+"""
+Retry policy for Discord webhook delivery
+Jittered exponential backoff bounded by attempt count and message age,
+with Discord's Retry-After header and JSON body taking precedence.
+Retries are never performed inline - failed payloads are handed to the
+outbox worker so a flaky network cannot stall a hook.
+"""
+
+import json
+import random
+import time
+
+DEFAULT_POLICY = {
+    'max_attempts': 8,      # Total delivery attempts, including the first
+    'max_age': 6 * 3600,    # Give up on messages older than this (seconds)
+    'base_delay': 1.0,      # First backoff step (seconds)
+    'max_delay': 300.0      # Backoff ceiling (seconds)
+}
+
+def get_policy(overrides=None):
+    """Merge a project's "retry" settings over the defaults."""
+    policy = dict(DEFAULT_POLICY)
+    if isinstance(overrides, dict):
+        for key in DEFAULT_POLICY:
+            if isinstance(overrides.get(key), (int, float)):
+                policy[key] = overrides[key]
+    return policy
+
+def is_success(status):
+    """Whether an HTTP status means Discord accepted the message."""
+    return status is not None and 200 <= status < 300
+
+def is_retryable(status):
+    """Whether a failed request may succeed later. None means a network error."""
+    return status is None or status == 429 or status >= 500
+
+def parse_retry_after(headers, body):
+    """Return Discord's requested wait in seconds, or None if it did not ask for one."""
+    # The JSON body carries millisecond precision, so prefer it
+    if body:
+        try:
+            data = json.loads(body)
+            if isinstance(data, dict) and data.get('retry_after') is not None:
+                return max(0.0, float(data['retry_after']))
+        except (ValueError, TypeError):
+            pass
+
+    if headers is not None:
+        for header in ('Retry-After', 'X-RateLimit-Reset-After'):
+            value = headers.get(header)
+            if value:
+                try:
+                    return max(0.0, float(value))
+                except ValueError:
+                    pass
+    return None
+
+def backoff_delay(attempts, policy):
+    """Exponential backoff with equal jitter after a number of failed attempts."""
+    ceiling = min(policy['max_delay'], policy['base_delay'] * (2 ** max(0, attempts - 1)))
+    return random.uniform(ceiling / 2, ceiling)
+
+def next_attempt_delay(attempts, created_at, policy, status=None, headers=None, body=None):
+    """
+    Decide when to try again after a failure
+    Returns the delay in seconds, or None if the message should be dropped
+    """
+    if not is_retryable(status):
+        return None
+    if attempts >= policy['max_attempts']:
+        return None
+
+    delay = parse_retry_after(headers, body) if status == 429 else None
+    if delay is None:
+        delay = backoff_delay(attempts, policy)
+
+    if time.time() + delay - created_at > policy['max_age']:
+        return None
+    return delay
+
+def response_from_error(error):
+    """
+    Extract (status, headers, body) from a failed request
+    Status is None for network errors; returns None for errors a retry cannot fix
+    """
+    from http.client import HTTPException
+
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        try:
+            body = error.read()
+        except Exception:
+            body = b''
+        return code, error.headers, body
+    if isinstance(error, (OSError, HTTPException)):
+        return None, None, b''
+    return None
+
+def retry_later(webhook_url, payload, label, target, session_id, policy_overrides=None,
+                status=None, headers=None, body=None, project=None, timeouts=None, session_thread=None):
+    """
+    Hand a failed delivery to the outbox worker if it is worth retrying
+    Returns True if a retry was scheduled
+    """
+    from discord_notify.outbox import enqueue
+
+    policy = get_policy(policy_overrides)
+    delay = next_attempt_delay(1, time.time(), policy, status, headers, body)
+    if delay is None:
+        return False
+
+    enqueue(webhook_url, payload, label, target, session_id,
+            attempts=1, next_attempt_at=time.time() + delay, retry=policy, project=project,
+            timeouts=timeouts, session_thread=session_thread)
+    return True
@@ -0,0 +1,145 @@
+"""
+Event filtering rules
+A project can list rules in discord-state.json that decide which events are
+sent, e.g. only Bash commands matching "pytest|make", or no edits under
+docs/. Rules are tried in order and the first one that matches decides;
+after the project's rules come the defaults (Stop and Notification always,
+PostToolUse only for significant tools). Rule sets are compiled once per
+config - regexes precompiled, tool names in sets, and candidate rules
+looked up by event and tool - so checking an event costs microseconds and
+a filtered event never reaches message building or the network.
+
+Rule fields (all optional; every field given must match):
+  events     event names the rule applies to
+  tools      tool names (PostToolUse)
+  command    regex searched in a Bash command
+  path       regex searched in the file path, relative to the project
+  message    regex searched in a Notification message
+  min_lines  least number of lines in the file after the tool ran
+  action     "notify" (default) or "ignore"
+"""
+
+import re
+
+from discord_notify.log import ERROR, log_message
+
+# Tools worth a progress message unless a project's rules say otherwise
+SIGNIFICANT_TOOLS = ['Write', 'Edit', 'MultiEdit', 'Bash', 'TodoWrite']
+
+DEFAULT_RULES = [
+    {"events": ["Stop", "Notification"]},
+    {"events": ["PostToolUse"], "tools": SIGNIFICANT_TOOLS},
+    {"action": "ignore"}
+]
+
+ACTIONS = ('notify', 'ignore')
+
+PATTERN_FIELDS = ('command', 'path', 'message')
+
+def _file_path(tool_input):
+    return tool_input.get('file_path') or tool_input.get('notebook_path') or tool_input.get('path') or ''
+
+def _count_lines(path):
+    """Lines in a file, or 0 if it can't be read."""
+    lines = 0
+    last = b'\n'
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(1024 * 1024)
+                if not chunk:
+                    break
+                lines += chunk.count(b'\n')
+                last = chunk[-1:]
+    except OSError:
+        return 0
+    return lines + (last != b'\n')
+
+def _names(spec, field):
+    """A rule's events or tools as a set; a bare string would silently become a set of letters."""
+    if field not in spec:
+        return None
+    names = spec[field]
+    if isinstance(names, str):
+        raise ValueError(f"{field} must be a list, e.g. [\"{names}\"]")
+    if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+        raise ValueError(f"{field} must be a list of names")
+    return frozenset(names)
+
+class Rule:
+    """One compiled rule"""
+    __slots__ = ('events', 'tools', 'command', 'path', 'message', 'min_lines', 'notify')
+
+    def __init__(self, spec):
+        self.events = _names(spec, 'events')
+        self.tools = _names(spec, 'tools')
+        for field in PATTERN_FIELDS:
+            setattr(self, field, re.compile(spec[field]) if spec.get(field) else None)
+        self.min_lines = int(spec.get('min_lines') or 0)
+        action = spec.get('action', 'notify')
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action {action!r}")
+        self.notify = action == 'notify'
+
+    def matches(self, hook_input):
+        """Check the rule's conditions other than event and tool, cheapest first."""
+        tool_input = hook_input.get('tool_input')
+        if not isinstance(tool_input, dict):
+            tool_input = {}
+        if self.command and not self.command.search(tool_input.get('command') or ''):
+            return False
+        if self.message and not self.message.search(hook_input.get('message') or ''):
+            return False
+        if self.path or self.min_lines:
+            path = _file_path(tool_input)
+            if self.path:
+                cwd = hook_input.get('cwd')
+                relative = path[len(cwd) + 1:] if cwd and path.startswith(cwd.rstrip('/') + '/') else path
+                if not self.path.search(relative):
+                    return False
+            if self.min_lines and (not path or _count_lines(path) < self.min_lines):
+                return False
+        return True
+
+class RuleSet:
+    """A project's rules followed by the defaults, indexed by event and tool"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._candidates = {}
+
+    def candidates(self, event_type, tool_name):
+        """Rules that could match an event with this tool, in order (cached)."""
+        key = (event_type, tool_name)
+        rules = self._candidates.get(key)
+        if rules is None:
+            rules = self._candidates[key] = tuple(
+                rule for rule in self.rules
+                if (rule.events is None or event_type in rule.events)
+                and (rule.tools is None or tool_name in rule.tools))
+        return rules
+
+    def allows(self, event_type, hook_input):
+        """Return True if the event should be sent."""
+        for rule in self.candidates(event_type, hook_input.get('tool_name')):
+            if rule.matches(hook_input):
+                return rule.notify
+        return False
+
+def _compile(specs, source):
+    rules = []
+    for index, spec in enumerate(specs):
+        try:
+            rules.append(Rule(spec))
+        except (re.error, ValueError, TypeError, AttributeError) as e:
+            # A broken rule is skipped rather than silencing the project
+            log_message(f"❌ Ignoring {source} rule {index + 1}: {e}", ERROR)
+    return rules
+
+_DEFAULTS = _compile(DEFAULT_RULES, 'default')
+
+def compile_rules(specs=None):
+    """Compile a project's rules (a list of rule dicts) into a RuleSet."""
+    if not isinstance(specs, list):
+        specs = []
+    return RuleSet(_compile(specs, 'discord-state.json') + _DEFAULTS)
@@ -0,0 +1,261 @@
+"""
+Thread per session
+With "thread_per_session": true, the first message of each session creates
+its own thread - a post in a forum channel, via the webhook's thread_name -
+and everything else the session sends goes into it, so concurrent sessions
+no longer interleave in one channel. The thread ID that Discord returns
+(the created message's channel_id, with ?wait=true) is kept per webhook and
+session in ~/.claude/discord-session-threads.json; later events read it
+from there and make no extra API calls. Entries unused for
+session_thread_ttl seconds are evicted. A webhook that Discord refuses to
+create threads for (a text channel's) is remembered for as long, and its
+messages go to its channel without another attempt. A creation that is
+rate limited or fails is spooled to the outbox, which creates the thread
+when it sends the message.
+"""
+
+import json
+import os
+import time
+
+from discord_notify.jsonstate import locked_state, read_state
+from discord_notify.log import ERROR, log_message
+
+STATE_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-session-threads.json")
+
+# Forget a session's thread after this long without events
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Refresh an entry's last use at most this often, so lookups rarely write
+TOUCH_INTERVAL = 3600
+
+# A thread creation that has not finished after this long is presumed dead
+CLAIM_TIMEOUT = 30
+
+# How long an event waits for another hook to finish creating the session's thread
+CLAIM_WAIT = 3.0
+
+# Discord's limit on thread names
+MAX_NAME_LENGTH = 100
+
+# Discord error codes meaning the webhook's channel can't hold threads,
+# as opposed to a problem with the message itself
+REFUSED_CODES = frozenset({
+    220003  # Webhooks can only create threads in forum channels
+})
+
+def _webhook(config):
+    """Identify a webhook without its token."""
+    from discord_notify.ratelimit import webhook_key
+    return webhook_key(config['webhook_url'])
+
+def _key(config, session_id):
+    """Identify a session's thread."""
+    return f"{_webhook(config)}:{session_id}"
+
+def thread_name(config, session_id):
+    """Name for a new session thread, e.g. "my-app · Oct 17 14:02 · 3f2a9c1e"."""
+    name = f"{config.get('project_name', 'Claude Code')} · {time.strftime('%b %d %H:%M')} · {session_id[:8]}"
+    return name[:MAX_NAME_LENGTH]
+
+def _prune(state, now, ttl):
+    threads = state.setdefault('threads', {})
+    for key in [k for k, v in threads.items() if now - v.get('used_at', 0) > ttl]:
+        del threads[key]
+    refused = state.setdefault('refused', {})
+    for webhook in [w for w, since in refused.items() if now - since > ttl]:
+        del refused[webhook]
+
+def _lookup(key, now, ttl):
+    """
+    Find a session's thread, claiming its creation if it has none
+    Returns (thread_id, claimed); both are empty while another hook is creating it
+    """
+    with locked_state(STATE_FILE) as state:
+        _prune(state, now, ttl)
+        threads = state['threads']
+        entry = threads.get(key)
+        if entry and entry.get('thread_id'):
+            entry['used_at'] = now
+            return entry['thread_id'], False
+        if entry and now - entry.get('creating_since', 0) < CLAIM_TIMEOUT:
+            return None, False
+        threads[key] = {'thread_id': None, 'creating_since': now, 'used_at': now}
+        return None, True
+
+def _store(key, thread_id, refused_webhook=None):
+    """Record a created thread, or release the claim if creation failed (and remember a refusal)."""
+    with locked_state(STATE_FILE) as state:
+        threads = state.setdefault('threads', {})
+        if thread_id:
+            threads[key] = {'thread_id': thread_id, 'used_at': time.time()}
+        else:
+            threads.pop(key, None)
+        if refused_webhook:
+            state.setdefault('refused', {})[refused_webhook] = time.time()
+
+def _refusal(status, body):
+    """Whether a failed creation means the webhook can't create threads at all."""
+    if status != 400:
+        return False
+    try:
+        return json.loads(body).get('code') in REFUSED_CODES
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+def refused(config):
+    """Whether Discord recently refused to create threads for this webhook (lock-free)."""
+    since = read_state(STATE_FILE).get('refused', {}).get(_webhook(config))
+    return since is not None and time.time() - since <= (config.get('session_thread_ttl') or DEFAULT_TTL)
+
+def thread_for(config, session_id):
+    """Return the session's cached thread ID, or None. Lock-free unless the entry needs refreshing."""
+    entry = read_state(STATE_FILE).get('threads', {}).get(_key(config, session_id))
+    if not entry or not entry.get('thread_id'):
+        return None
+    now = time.time()
+    ttl = config.get('session_thread_ttl') or DEFAULT_TTL
+    if now - entry.get('used_at', 0) > ttl:
+        return None
+    if now - entry.get('used_at', 0) > TOUCH_INTERVAL:
+        with locked_state(STATE_FILE) as state:
+            current = state.get('threads', {}).get(_key(config, session_id))
+            if current:
+                current['used_at'] = now
+    return entry['thread_id']
+
+def pending(config, session_id):
+    """What an outbox entry needs to send a message to the session's thread, creating it if need be."""
+    return {'key': _key(config, session_id), 'name': thread_name(config, session_id),
+            'ttl': config.get('session_thread_ttl') or DEFAULT_TTL}
+
+def create(embed_data, config, session_id, event_type, sender, max_wait):
+    """
+    Post a session's first message with thread_name, creating its thread
+    Returns (new thread ID or None, (status, headers, body) of the failed
+    request or None). Raises Deferred when the send has to wait
+    """
+    from discord_notify.delivery import EVENT_LABELS, Deferred, describe_target, post
+    from discord_notify.progress import create_url
+    from discord_notify.retry import is_success, response_from_error
+
+    emoji, label = EVENT_LABELS[event_type]
+    session_short = session_id[:8]
+    payload = dict(embed_data, thread_name=thread_name(config, session_id))
+    context = {'session_id': session_id, 'project': config.get('project_name'), 'event': event_type}
+    try:
+        status, headers, body = post(create_url(config), payload, sender, max_wait, context=context)
+        if is_success(status):
+            thread_id = json.loads(body).get('channel_id')
+            log_message(f"{emoji} {label} notification sent to new session thread {thread_id} in {describe_target(config)} - Session: {session_short}",
+                        event=label, session=session_short)
+            return thread_id, None
+        log_message(f"❌ Session thread creation failed (HTTP {status}) in {describe_target(config)} - Session: {session_short}",
+                    ERROR, event=label, session=session_short, status=status)
+        return None, (status, headers, body)
+    except Deferred:
+        raise
+    except Exception as e:
+        log_message(f"❌ Session thread creation failed ({str(e)}) in {describe_target(config)} - Session: {session_short}",
+                    ERROR, event=label, session=session_short)
+        return None, response_from_error(e)
+
+def route(embed_data, config, session_id, event_type, sender=None, max_wait=None):
+    """
+    Route a message to its session's thread
+    Returns the config to send it with (thread_id set to the session's
+    thread), or None if the message has been dealt with: it created the
+    thread, or creating it failed and is retried from the outbox. If the
+    webhook can't create threads the message goes to its own channel or
+    thread as before. Raises Deferred when the creation has to wait, so the
+    caller can spool the message (see pending)
+    """
+    thread_id = thread_for(config, session_id)
+    if thread_id:
+        return dict(config, thread_id=thread_id)
+    if refused(config):
+        return config
+
+    key = _key(config, session_id)
+    ttl = config.get('session_thread_ttl') or DEFAULT_TTL
+    deadline = time.time() + CLAIM_WAIT
+    while True:
+        thread_id, claimed = _lookup(key, time.time(), ttl)
+        if thread_id:
+            return dict(config, thread_id=thread_id)
+        if claimed:
+            break
+        if time.time() >= deadline:
+            return config  # The hook creating the thread is stuck - don't hold this event back
+        time.sleep(0.05)
+
+    thread_id = response = None
+    is_refused = False
+    owns_sender = sender is None
+    if owns_sender:
+        from discord_notify.transport import WebhookSender
+        sender = WebhookSender(config.get('connect_timeout'), config.get('read_timeout'))
+    try:
+        # The thread is created in the webhook's channel, never inside another thread
+        thread_id, response = create(embed_data, dict(config, thread_id=''), session_id, event_type, sender, max_wait)
+    finally:
+        if owns_sender:
+            sender.close()
+        # When the webhook's channel can't hold threads (not a forum), stop
+        # trying rather than double every send
+        is_refused = response is not None and _refusal(response[0], response[2])
+        _store(key, thread_id, _webhook(config) if is_refused else None)
+    if thread_id:
+        return None
+    if is_refused:
+        log_message(f"❌ Webhook {_webhook(config)} can't create threads (not a forum channel) - "
+                    f"sending to its channel for the next {int(ttl)}s", ERROR)
+        return config
+
+    # Any other failure is an ordinary failed send: retried if it is worth it
+    if response is not None:
+        from discord_notify.delivery import EVENT_LABELS, describe_target
+        from discord_notify.retry import retry_later
+        status, headers, body = response
+        retry_later(config['webhook_url'], embed_data, EVENT_LABELS[event_type][1], describe_target(config), session_id,
+                    config.get('retry'), status, headers, body, project=config.get('project_name'),
+                    timeouts=(config.get('connect_timeout'), config.get('read_timeout')),
+                    session_thread=pending(config, session_id))
+    return None
+
+def outbox_request(url, payload, thread):
+    """
+    Where a spooled message for a session thread goes (thread from pending)
+    Returns (url, payload, creating): into the session's thread if it has
+    one, otherwise creating it, claimed like route does. Raises Deferred
+    while another hook is creating it
+    """
+    from discord_notify.delivery import Deferred, build_webhook_url
+    from discord_notify.progress import create_url
+
+    config = {'webhook_url': url}
+    if refused(dict(config, session_thread_ttl=thread.get('ttl'))):
+        return url, payload, False
+    thread_id, claimed = _lookup(thread['key'], time.time(), thread.get('ttl') or DEFAULT_TTL)
+    if thread_id:
+        return build_webhook_url(dict(config, thread_id=thread_id)), payload, False
+    if not claimed:
+        raise Deferred(CLAIM_WAIT, "waiting for the session thread")
+    return create_url(config), dict(payload, thread_name=thread['name']), True
+
+def outbox_result(url, thread, status, body):
+    """
+    Record how a spooled thread creation went, releasing its claim
+    Returns True if Discord refused threads for the webhook
+    """
+    from discord_notify.retry import is_success
+
+    thread_id = None
+    if status is not None and is_success(status):
+        try:
+            thread_id = json.loads(body).get('channel_id')
+        except (ValueError, TypeError, AttributeError):
+            pass
+    is_refused = _refusal(status, body)
+    _store(thread['key'], thread_id, _webhook({'webhook_url': url}) if is_refused else None)
+    return is_refused
@@ -0,0 +1,125 @@
+"""
+Stop event handler
+Builds the "Session Complete" message from a whole-session summary of the
+transcript.
+"""
+
+import os
+import time
+
+from discord_notify.log import DEBUG, WARNING, log_message
+from discord_notify.text import truncate_text
+
+def parse_transcript(transcript_path):
+    """Summarize the whole session from its transcript (JSONL format)."""
+    if not transcript_path or not os.path.exists(transcript_path):
+        return "", "", ""
+    
+    try:
+        from discord_notify.transcript import index_transcript
+        
+        # Only the lines added since the previous Stop are parsed
+        summary = index_transcript(transcript_path)
+        
+        # Format tool uses, most used first
+        tool_summary = " ".join([f"{count}x {tool}" for tool, count in 
+                                sorted(summary['tools'].items(), key=lambda x: x[1], reverse=True)])
+        
+        files_summary = " ".join(sorted(summary['files']))
+        
+        return summary['user_message'], tool_summary, files_summary
+        
+    except Exception as e:
+        log_message(f"Transcript parsing error: {e}", WARNING)
+        return "", "", ""
+
+def create_stop_embed(hook_input, config):
+    """Create embed for Stop hook."""
+    session_id = hook_input.get('session_id', 'unknown')
+    transcript_path = hook_input.get('transcript_path', '')
+    tool_name = hook_input.get('tool_name', '')
+    tool_input = hook_input.get('tool_input', {})
+    message = hook_input.get('message', '')
+    
+    # Parse transcript for enhanced details
+    user_task, tool_summary, files_modified = parse_transcript(transcript_path)
+    
+    # Debug logging
+    log_message(f"Transcript path: {transcript_path}", DEBUG)
+    log_message(f"User task: '{user_task}'", DEBUG)
+    log_message(f"Tool summary: '{tool_summary}'", DEBUG)
+    log_message(f"Files modified: '{files_modified}'", DEBUG)
+    
+    # Fallback: Use hook input data if transcript parsing failed
+    if not user_task and tool_name:
+        user_task = f"Used {tool_name} tool"
+        log_message(f"Using fallback task description: {user_task}", DEBUG)
+    
+    # Format tool summary
+    tool_display = "None"
+    if tool_summary:
+        # Format as bullet points, limit to 3
+        tools = tool_summary.split()[:3]
+        tool_display = "\n".join([f"• {tool}" for tool in tools])
+    elif tool_name:
+        tool_display = f"• {tool_name}"
+        log_message(f"Using fallback tool display: {tool_display}", DEBUG)
+    
+    # Format files modified
+    files_display = "None"
+    if files_modified:
+        # Format as bullet points, limit to 3
+        files = files_modified.split()
+        files_display = "\n".join([f"• {file}" for file in files[:3]])
+        if len(files) > 3:
+            files_display += f"\n…and {len(files) - 3} more"
+    elif isinstance(tool_input, dict) and tool_input.get('file_path'):
+        fallback_file = os.path.basename(tool_input['file_path'])
+        files_display = f"• {fallback_file}"
+        log_message(f"Using fallback file display: {files_display}", DEBUG)
+    
+    # Build description
+    description = "Session completed successfully"
+    if user_task:
+        description = truncate_text(user_task, 150)
+    
+    return {
+        "embeds": [{
+            "title": "✅ Session Complete",
+            "description": description,
+            "color": 5763719,  # Green
+            "fields": [
+                {
+                    "name": "Session ID",
+                    "value": f"`{session_id[:8]}...`",
+                    "inline": True
+                },
+                {
+                    "name": "Timestamp",
+                    "value": time.strftime('%Y-%m-%d %H:%M:%S'),
+                    "inline": True
+                },
+                {
+                    "name": "Tools Used",
+                    "value": tool_display,
+                    "inline": False
+                },
+                {
+                    "name": "Files Modified",
+                    "value": files_display,
+                    "inline": False
+                }
+            ],
+            "footer": {
+                "text": "Claude Code - Session Complete"
+            }
+        }]
+    }
+
+def build_message(hook_input, config):
+    """Build the Discord message for this event, or None if nothing should be sent."""
+    # A Stop hook that is already continuing the session would loop
+    if hook_input.get('stop_hook_active', False):
+        return None
+    
+    return create_stop_embed(hook_input, config)
@@ -0,0 +1,11 @@
+"""
+Text helpers for building Discord embeds
+"""
+
+def truncate_text(text, max_length=100):
+    """Truncate text to specified length."""
+    if not text:
+        return ""
+    if len(text) > max_length:
+        return text[:max_length] + "..."
+    return text
@@ -0,0 +1,192 @@
+"""
+Claude Code transcript reading
+Transcripts are JSONL files that grow to hundreds of MB on long sessions.
+Session summaries are built incrementally from a checkpointed byte offset,
+so a Stop only parses what was written since the previous one. A large
+transcript without a checkpoint (a resumed session, an evicted or replaced
+one) is indexed from its last COLD_START_BYTES only, with the latest
+prompt found by reading backwards from the end, so a cold Stop costs the
+same however long the session has been.
+"""
+
+import json
+import os
+import time
+
+from discord_notify.jsonstate import locked_state, read_state
+
+BLOCK_SIZE = 64 * 1024
+
+def reverse_lines(f, block_size=BLOCK_SIZE):
+    """Yield the lines of a binary file from last to first, without line endings."""
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    partial = b''
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        f.seek(position)
+        block = f.read(read_size) + partial
+
+        # The first piece may continue in the block before this one
+        lines = block.split(b'\n')
+        partial = lines.pop(0)
+        for line in reversed(lines):
+            if line.strip():
+                yield line
+    if partial.strip():
+        yield partial
+
+# Incremental session summaries
+# Each transcript's byte offset and running aggregates are checkpointed in
+# ~/.claude/discord-transcripts.json, so a Stop only parses the lines written
+# since the previous one.
+
+INDEX_FILE = os.path.join(os.path.expanduser("~"), ".claude", "discord-transcripts.json")
+
+# Forget checkpoints for transcripts untouched this long
+INDEX_STALE_AFTER = 7 * 24 * 3600
+
+# Longest user prompt kept in a checkpoint
+MAX_PROMPT_CHARS = 500
+
+# Most of a transcript without a checkpoint that is indexed, and searched
+# backwards for its latest prompt
+COLD_START_BYTES = 4 * 1024 * 1024
+PROMPT_SEARCH_BYTES = 16 * 1024 * 1024
+
+FILE_TOOLS = ('Write', 'Edit', 'MultiEdit')
+
+def _prompt_text(message):
+    """Return the text of a user prompt, or None for tool results."""
+    content = message.get('content', '')
+    if isinstance(content, str):
+        return content
+    if not isinstance(content, list):
+        return None
+    texts = []
+    for item in content:
+        if not isinstance(item, dict):
+            continue
+        if item.get('type') == 'tool_result':
+            return None
+        if item.get('type') == 'text':
+            texts.append(item.get('text', ''))
+    return "\n".join(texts) if texts else None
+
+def latest_prompt(f, max_bytes=None):
+    """Return the last user prompt in a binary transcript file, reading backwards at most max_bytes."""
+    scanned = 0
+    for line in reverse_lines(f):
+        scanned += len(line) + 1
+        if max_bytes is not None and scanned > max_bytes:
+            break
+        # Tool results are 'user' entries too - skip them unparsed
+        if b'"user"' not in line or b'"tool_result"' in line:
+            continue
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        message = entry.get('message') if isinstance(entry, dict) else None
+        if entry.get('type') == 'user' and isinstance(message, dict):
+            prompt = _prompt_text(message)
+            if prompt:
+                return prompt[:MAX_PROMPT_CHARS]
+    return ''
+
+def apply_entry(summary, entry):
+    """Fold one transcript entry into a session summary."""
+    message = entry.get('message')
+    if not isinstance(message, dict):
+        return
+
+    # Latest user prompt (tool results are also 'user' entries)
+    if entry.get('type') == 'user':
+        prompt = _prompt_text(message)
+        if prompt:
+            summary['user_message'] = prompt[:MAX_PROMPT_CHARS]
+
+    # Tool usage from assistant messages
+    elif entry.get('type') == 'assistant':
+        content = message.get('content', [])
+        if not isinstance(content, list):
+            return
+        for item in content:
+            if not isinstance(item, dict) or item.get('type') != 'tool_use':
+                continue
+            tool_name = item.get('name')
+            if not tool_name:
+                continue
+            summary['tools'][tool_name] = summary['tools'].get(tool_name, 0) + 1
+
+            # File paths for file modification tools
+            if tool_name in FILE_TOOLS:
+                tool_input = item.get('input')
+                file_path = tool_input.get('file_path') if isinstance(tool_input, dict) else None
+                if file_path:
+                    name = os.path.basename(file_path)
+                    if name not in summary['files']:
+                        summary['files'].append(name)
+
+def _new_summary(stat):
+    return {
+        'offset': 0,
+        'inode': stat.st_ino,
+        'user_message': '',
+        'tools': {},
+        'files': []
+    }
+
+def index_transcript(path):
+    """
+    Return the whole-session summary of a transcript, parsing only the bytes
+    added since the last checkpoint
+    Summary keys: user_message, tools ({name: count}), files (names in first-modified order)
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    summary = read_state(INDEX_FILE).get('transcripts', {}).get(path)
+
+    # A replaced or truncated transcript is indexed from scratch; a large one
+    # only from near its end, with the prompt that started the work found by
+    # reading backwards
+    if not summary or summary.get('inode') != stat.st_ino or summary.get('offset', 0) > stat.st_size:
+        summary = _new_summary(stat)
+        if stat.st_size > COLD_START_BYTES:
+            with open(path, 'rb') as f:
+                summary['user_message'] = latest_prompt(f, PROMPT_SEARCH_BYTES)
+                f.seek(stat.st_size - COLD_START_BYTES)
+                f.readline()  # Skip to the start of a line
+                summary['offset'] = f.tell()
+
+    if summary['offset'] < stat.st_size:
+        offset = summary['offset']
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                # A line still being written is left for the next run
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+
+                # Only user prompts and tool calls matter - skip the rest unparsed
+                if b'"user"' not in line and b'tool_use' not in line:
+                    continue
+                try:
+                    apply_entry(summary, json.loads(line))
+                except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                    continue
+        summary['offset'] = offset
+
+    summary['updated'] = time.time()
+    with locked_state(INDEX_FILE) as state:
+        transcripts = state.setdefault('transcripts', {})
+        current = transcripts.get(path)
+        # Another Stop may have indexed further in the meantime
+        if not current or current.get('inode') != summary['inode'] or current.get('offset', 0) <= summary['offset']:
+            transcripts[path] = summary
+        for stale in [p for p, s in transcripts.items()
+                      if summary['updated'] - s.get('updated', 0) > INDEX_STALE_AFTER]:
+            del transcripts[stale]
+    return summary
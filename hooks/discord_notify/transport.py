@@ -0,0 +1,85 @@
+"""
+HTTP transport for Discord webhooks
+Keeps one keep-alive connection per host for long-lived senders. Connecting
+and waiting for a response have separate deadlines, so a hung connection
+never stalls a hook for the operating system's TCP timeout.
+"""
+
+import http.client
+import json
+import socket
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from discord_notify import metrics
+
+# Deadlines in seconds; projects can override them with connect_timeout/read_timeout
+CONNECT_TIMEOUT = 3.0
+READ_TIMEOUT = 10.0
+
+WebhookResponse = namedtuple('WebhookResponse', ['status', 'headers', 'body'])
+
+class WebhookSender:
+    """Sends webhook payloads over persistent keep-alive connections"""
+
+    def __init__(self, connect_timeout=None, read_timeout=None):
+        self.set_timeouts(connect_timeout, read_timeout)
+        self._connections = {}
+        self.last_payload_bytes = None
+
+    def set_timeouts(self, connect_timeout=None, read_timeout=None):
+        """Set the deadlines for the following requests (a sender shared by projects sets each one's)."""
+        self.connect_timeout = connect_timeout or CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or READ_TIMEOUT
+
+    def _connect(self, scheme, netloc):
+        if scheme == 'https':
+            conn = http.client.HTTPSConnection(netloc, timeout=self.connect_timeout)
+        else:
+            conn = http.client.HTTPConnection(netloc, timeout=self.connect_timeout)
+        # Connect (and TLS handshake) under the connect deadline, then switch to the read deadline
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        return conn
+
+    def post(self, url, payload):
+        """POST a JSON payload and return a WebhookResponse."""
+        return self.request('POST', url, payload)
+
+    def request(self, method, url, payload):
+        """Send a JSON payload with the given method and return a WebhookResponse."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        data = json.dumps(payload).encode('utf-8')
+        self.last_payload_bytes = len(data)
+
+        reused = key in self._connections
+        while True:
+            try:
+                conn = self._connections.get(key)
+                if conn is None:
+                    conn = self._connections[key] = self._connect(parts.scheme, parts.netloc)
+                else:
+                    conn.sock.settimeout(self.read_timeout)
+                with metrics.phase('http'):
+                    conn.request(method, path, body=data, headers={'Content-Type': 'application/json'})
+                    response = conn.getresponse()
+                    body = response.read()
+                metrics.note(payload_bytes=len(data), status=response.status)
+                return WebhookResponse(response.status, response.headers, body)
+            except (http.client.HTTPException, OSError) as e:
+                conn = self._connections.pop(key, None)
+                if conn is not None:
+                    conn.close()
+                # Discord closes idle keep-alive connections - retry once on a fresh
+                # one, but never wait out a deadline twice
+                if not reused or isinstance(e, socket.timeout):
+                    raise
+                reused = False
+
+    def close(self):
+        """Close all open connections."""
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
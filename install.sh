@@ -43,6 +43,9 @@ fi
 # GitHub repository base URL
 GITHUB_BASE="https://raw.githubusercontent.com/jubalm/claude-code-discord/main"
 
+# Modules of the shared hook runtime package (hooks/discord_notify)
+HOOK_MODULES="__init__.py batching.py breaker.py client.py config.py daemon.py dedup.py delivery.py dispatch.py eventstore.py gate.py hookinput.py jsonstate.py log.py metrics.py notification.py outbox.py posttooluse.py progress.py ratelimit.py retry.py rules.py sessionthreads.py stop.py text.py transcript.py transport.py"
+
 # Colors for output
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -145,7 +148,7 @@ backup_existing() {
     local needs_backup=false
     
     # Check if any Discord-related files exist
-    if [ -f "${HOOKS_DIR}/stop-discord.py" ] || [ -f "${HOOKS_DIR}/posttooluse-discord.py" ] || [ -f "${HOOKS_DIR}/notification-discord.py" ] || [ -d "${COMMANDS_DIR}/discord" ]; then
+    if [ -f "${HOOKS_DIR}/stop-discord.py" ] || [ -f "${HOOKS_DIR}/posttooluse-discord.py" ] || [ -f "${HOOKS_DIR}/notification-discord.py" ] || [ -d "${HOOKS_DIR}/discord_notify" ] || [ -d "${COMMANDS_DIR}/discord" ]; then
         needs_backup=true
     fi
     
@@ -162,6 +165,9 @@ backup_existing() {
         [ -f "${HOOKS_DIR}/stop-discord.py" ] && cp "${HOOKS_DIR}/stop-discord.py" "$backup_dir/"
         [ -f "${HOOKS_DIR}/posttooluse-discord.py" ] && cp "${HOOKS_DIR}/posttooluse-discord.py" "$backup_dir/"
         [ -f "${HOOKS_DIR}/notification-discord.py" ] && cp "${HOOKS_DIR}/notification-discord.py" "$backup_dir/"
+        [ -f "${HOOKS_DIR}/discord-hook.py" ] && cp "${HOOKS_DIR}/discord-hook.py" "$backup_dir/"
+        [ -f "${HOOKS_DIR}/discord-daemon.py" ] && cp "${HOOKS_DIR}/discord-daemon.py" "$backup_dir/"
+        [ -d "${HOOKS_DIR}/discord_notify" ] && cp -r "${HOOKS_DIR}/discord_notify" "$backup_dir/"
         
         # Backup legacy shell scripts
         [ -f "${HOOKS_DIR}/discord-notify.sh" ] && cp "${HOOKS_DIR}/discord-notify.sh" "$backup_dir/"
@@ -183,11 +189,21 @@ install_hooks() {
     download_file "${GITHUB_BASE}/hooks/stop-discord.py" "${HOOKS_DIR}/stop-discord.py" "Stop hook script"
     download_file "${GITHUB_BASE}/hooks/posttooluse-discord.py" "${HOOKS_DIR}/posttooluse-discord.py" "PostToolUse hook script"
     download_file "${GITHUB_BASE}/hooks/notification-discord.py" "${HOOKS_DIR}/notification-discord.py" "Notification hook script"
+    download_file "${GITHUB_BASE}/hooks/discord-hook.py" "${HOOKS_DIR}/discord-hook.py" "Hook dispatcher"
+    download_file "${GITHUB_BASE}/hooks/discord-daemon.py" "${HOOKS_DIR}/discord-daemon.py" "Notification daemon launcher"
+    
+    # Download shared hook runtime package
+    mkdir -p "${HOOKS_DIR}/discord_notify"
+    for module in $HOOK_MODULES; do
+        download_file "${GITHUB_BASE}/hooks/discord_notify/$module" "${HOOKS_DIR}/discord_notify/$module" "Hook runtime module $module"
+    done
     
     # Make Python scripts executable
     chmod +x "${HOOKS_DIR}/stop-discord.py"
     chmod +x "${HOOKS_DIR}/posttooluse-discord.py"
     chmod +x "${HOOKS_DIR}/notification-discord.py"
+    chmod +x "${HOOKS_DIR}/discord-hook.py"
+    chmod +x "${HOOKS_DIR}/discord-daemon.py"
     
     log_success "Hook scripts installed"
 }
@@ -210,6 +226,7 @@ install_commands() {
     download_file "${GITHUB_BASE}/commands/discord/merge-settings.py" "${COMMANDS_DIR}/discord/merge-settings.py" "Settings merge script"
     download_file "${GITHUB_BASE}/commands/discord/update-state.py" "${COMMANDS_DIR}/discord/update-state.py" "State update script"
     download_file "${GITHUB_BASE}/commands/discord/read-state.py" "${COMMANDS_DIR}/discord/read-state.py" "State read script"
+    download_file "${GITHUB_BASE}/commands/discord/state_store.py" "${COMMANDS_DIR}/discord/state_store.py" "State store module"
     
     # Make Python scripts executable
     chmod +x "${COMMANDS_DIR}/discord/merge-settings.py"
@@ -260,7 +277,7 @@ verify_installation() {
     local errors=0
     
     # Check Python hook scripts (primary)
-    for script in stop-discord.py posttooluse-discord.py notification-discord.py; do
+    for script in discord-hook.py stop-discord.py posttooluse-discord.py notification-discord.py discord-daemon.py; do
         if [ ! -f "${HOOKS_DIR}/$script" ]; then
             log_error "Python hook script not found: $script"
             ((errors++))
@@ -270,6 +287,14 @@ verify_installation() {
         fi
     done
     
+    # Check hook runtime package
+    for module in $HOOK_MODULES; do
+        if [ ! -f "${HOOKS_DIR}/discord_notify/$module" ]; then
+            log_error "Hook runtime module not found: discord_notify/$module"
+            ((errors++))
+        fi
+    done
+    
     # Check commands
     for cmd in setup.md start.md stop.md status.md remove.md; do
         if [ ! -f "${COMMANDS_DIR}/discord/$cmd" ]; then
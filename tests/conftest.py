@@ -0,0 +1,28 @@
+"""
+Shared test setup
+Puts the hooks' discord_notify package on sys.path and points HOME at a
+throwaway directory before anything imports it, so the state files the
+modules share through ~/.claude (rate limiter, circuit breaker, outbox,
+log) never touch the real ones. Each test starts with an empty ~/.claude.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+HOOKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'hooks')
+sys.path.insert(0, HOOKS_DIR)
+
+os.environ['HOME'] = tempfile.mkdtemp(prefix='discord-notify-tests-')
+os.environ['DISCORD_NOTIFY_METRICS'] = '0'
+CLAUDE_DIR = os.path.join(os.environ['HOME'], '.claude')
+
+@pytest.fixture(autouse=True)
+def claude_dir():
+    """A fresh ~/.claude for every test."""
+    os.makedirs(CLAUDE_DIR, exist_ok=True)
+    yield CLAUDE_DIR
+    shutil.rmtree(CLAUDE_DIR, ignore_errors=True)
@@ -0,0 +1,74 @@
+"""Circuit breaker: opening after repeated failures, the half-open trial, closing"""
+
+import pytest
+
+from discord_notify import breaker, delivery
+from discord_notify.jsonstate import read_state, write_state
+
+URL = 'https://discord.com/api/webhooks/123/secret-token'
+OTHER_URL = 'https://discord.com/api/webhooks/456/other-token'
+
+def fail(times, url=URL):
+    for _ in range(times):
+        breaker.record_failure(url, 'HTTP 503')
+
+def expire_cool_down(url=URL):
+    """Move the circuit's cool-down into the past."""
+    state = read_state(breaker.STATE_FILE)
+    state[breaker.circuit_key(url)]['opened_until'] = 1
+    write_state(breaker.STATE_FILE, state)
+
+def test_state_is_keyed_without_the_token():
+    fail(1)
+    assert list(read_state(breaker.STATE_FILE)) == ['123']
+
+def test_stays_closed_below_the_threshold():
+    fail(breaker.FAILURE_THRESHOLD - 1)
+    assert breaker.open_for(URL) == 0.0
+
+def test_opens_at_the_threshold():
+    fail(breaker.FAILURE_THRESHOLD)
+    assert breaker.open_for(URL) == pytest.approx(breaker.COOL_DOWN, abs=1)
+    assert breaker.open_for(OTHER_URL) == 0.0
+
+def test_success_resets_the_failure_count():
+    fail(breaker.FAILURE_THRESHOLD - 1)
+    breaker.record_success(URL)
+    fail(breaker.FAILURE_THRESHOLD - 1)
+    assert breaker.open_for(URL) == 0.0
+
+def test_half_open_lets_one_trial_through():
+    fail(breaker.FAILURE_THRESHOLD)
+    expire_cool_down()
+    assert breaker.open_for(URL) == 0.0
+    assert breaker.open_for(URL) == pytest.approx(breaker.TRIAL_TIMEOUT, abs=1)
+
+def test_successful_trial_closes_the_circuit():
+    fail(breaker.FAILURE_THRESHOLD)
+    expire_cool_down()
+    breaker.open_for(URL)
+    breaker.record_success(URL)
+    assert read_state(breaker.STATE_FILE) == {}
+    assert breaker.open_for(URL) == 0.0
+
+def test_failed_trial_reopens_for_twice_as_long():
+    fail(breaker.FAILURE_THRESHOLD)
+    expire_cool_down()
+    breaker.open_for(URL)
+    fail(1)
+    assert breaker.open_for(URL) == pytest.approx(2 * breaker.COOL_DOWN, abs=1)
+
+def test_cool_down_is_capped():
+    fail(breaker.FAILURE_THRESHOLD)
+    for _ in range(12):
+        expire_cool_down()
+        breaker.open_for(URL)
+        fail(1)
+    assert breaker.open_for(URL) == pytest.approx(breaker.MAX_COOL_DOWN, abs=1)
+
+def test_open_circuit_short_circuits_sends():
+    fail(breaker.FAILURE_THRESHOLD)
+    with pytest.raises(delivery.CircuitOpen) as raised:
+        delivery.post(URL, {'content': 'x'}, sender=None)
+    assert isinstance(raised.value, delivery.Deferred)
+    assert raised.value.wait == pytest.approx(breaker.COOL_DOWN, abs=1)
@@ -0,0 +1,83 @@
+"""Streaming hook input reader: same result as json.loads, minus what the hooks never read"""
+
+import io
+import json
+import random
+
+import pytest
+
+from discord_notify import hookinput
+from discord_notify.hookinput import MAX_STRING_BYTES, read_hook_input
+
+def parse(document, chunk_size=None, monkeypatch=None):
+    if chunk_size:
+        monkeypatch.setattr(hookinput, 'CHUNK_SIZE', chunk_size)
+    data = document if isinstance(document, bytes) else document.encode('utf-8')
+    return read_hook_input(io.BytesIO(data))
+
+DOCUMENTS = [
+    '{}',
+    '{"session_id": "abc", "hook_event_name": "Stop", "stop_hook_active": false}',
+    '  {\n  "a" : [ 1 , -2.5e3 , true , null , { } , [ ] ] ,\t"b": {"c": {"d": "e"}} }  \n',
+    '{"quote": "say \\"hi\\"", "slash": "a\\\\", "both": "\\\\\\"", "tail": "\\\\"}',
+    '{"unicode": "caf\\u00e9 \\ud83d\\ude80 ü漢", "controls": "\\n\\t\\r\\b\\f\\/"}',
+    '{"tricky": "\\", \\"x\\": 1, \\"", "brace": "}]", "colon": "\\":"}',
+    '{"tool_name": "Bash", "tool_input": {"command": "echo \\"}\\" , ok"}, "n": 12345678901234567890}',
+]
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+@pytest.mark.parametrize('chunk_size', [None, 1, 2, 3, 7])
+def test_matches_json_loads(document, chunk_size, monkeypatch):
+    hook_input, total = parse(document, chunk_size, monkeypatch)
+    assert hook_input == json.loads(document)
+    assert total == len(document.encode('utf-8'))
+
+def test_random_documents_match_json_loads(monkeypatch):
+    rng = random.Random(7)
+    alphabet = ['a', ' ', '"', '\\', '}', ']', ',', ':', '\n', 'é', '🚀', ' ']
+
+    def value(depth):
+        kind = rng.randrange(6 if depth < 4 else 3)
+        if kind == 0:
+            return ''.join(rng.choice(alphabet) for _ in range(rng.randrange(12)))
+        if kind == 1:
+            return rng.choice([0, -1, 3.25, 1e-7, True, False, None])
+        if kind == 2:
+            return rng.randrange(10 ** 6)
+        if kind == 3:
+            return [value(depth + 1) for _ in range(rng.randrange(4))]
+        return {f"k{i}": value(depth + 1) for i in range(rng.randrange(4))}
+
+    for _ in range(200):
+        document = {f"key{i}": value(0) for i in range(rng.randrange(1, 5))}
+        text = json.dumps(document, ensure_ascii=rng.random() < 0.5)
+        assert parse(text, rng.choice([1, 2, 5, 64]), monkeypatch)[0] == document
+
+def test_tool_response_is_left_out():
+    document = {'tool_name': 'Write', 'tool_response': {'content': 'x' * 100000, 'nested': ['"}]']},
+                'tool_input': {'file_path': '/tmp/a.py'}}
+    hook_input, _ = parse(json.dumps(document))
+    assert hook_input == {'tool_name': 'Write', 'tool_input': {'file_path': '/tmp/a.py'}}
+
+def test_nested_tool_response_is_kept():
+    document = {'tool_input': {'tool_response': 'kept'}}
+    assert parse(json.dumps(document))[0] == document
+
+@pytest.mark.parametrize('text', ['x' * 10000, 'é' * 5000, '🚀' * 3000, '\\"' * 4000, 'ab\n' * 3000])
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+def test_long_strings_are_cut_to_a_prefix(text, ensure_ascii, monkeypatch):
+    document = json.dumps({'tool_input': {'content': text}, 'after': 1}, ensure_ascii=ensure_ascii)
+    hook_input, _ = parse(document, 4096, monkeypatch)
+    content = hook_input['tool_input']['content']
+    assert text.startswith(content)
+    assert len(content.encode('utf-8')) <= MAX_STRING_BYTES
+    assert len(content) >= MAX_STRING_BYTES // 12
+    assert hook_input['after'] == 1
+
+@pytest.mark.parametrize('document', ['', '{', '{"a": }', '{"a": "unterminated', '[1, 2]', '"text"', 'nul'])
+def test_malformed_input_reads_as_empty(document):
+    assert parse(document)[0] == {}
+
+def test_stream_is_drained_after_a_parse_error():
+    document = b'{"a": ]' + b' ' * 300000
+    assert read_hook_input(io.BytesIO(document)) == ({}, len(document))
@@ -0,0 +1,114 @@
+"""Outbox batches: coalescing spooled entries into as few messages as possible"""
+
+import json
+import os
+
+from discord_notify import batching, outbox
+from discord_notify.transport import WebhookResponse
+
+URL = 'https://discord.com/api/webhooks/123/secret-token'
+
+def embed(title, description='did something'):
+    return {'title': title, 'description': description, 'fields': [{'name': 'Session', 'value': '`abcd1234`'}]}
+
+def spool(payloads, batch_mode='embeds', batch_key='progress'):
+    """Write entries the way enqueue does, without starting a worker."""
+    outbox._make_dir()
+    batch = []
+    for i, payload in enumerate(payloads):
+        entry = {'url': URL, 'payload': payload, 'label': 'Work progress', 'target': 'channel',
+                 'session_id': 'abcd1234-session', 'project': 'demo', 'attempts': 0, 'next_attempt_at': 0,
+                 'batch_key': batch_key, 'batch_mode': batch_mode}
+        path = os.path.join(outbox.OUTBOX_DIR, f"{i:020d}-1.json")
+        outbox._write_entry(path, entry)
+        batch.append((path, entry))
+    return batch
+
+def on_disk():
+    return [outbox.read_entry(path) for path in outbox.pending_entries()]
+
+def test_embeds_are_packed_into_the_oldest_entry():
+    batch = spool([{'embeds': [embed(f"Edit {i}")]} for i in range(3)])
+    merged = outbox.coalesce(batch)
+
+    assert [path for path, _ in merged] == [batch[0][0]]
+    entries = on_disk()
+    assert len(entries) == 1
+    assert [e['title'] for e in entries[0]['payload']['embeds']] == ['Edit 0', 'Edit 1', 'Edit 2']
+    assert entries[0]['batch_key'] is None
+
+def test_more_than_ten_embeds_split_in_order():
+    batch = spool([{'embeds': [embed(f"Edit {i}")]} for i in range(batching.MAX_EMBEDS + 3)])
+    merged = outbox.coalesce(batch)
+
+    assert [path for path, _ in merged] == [batch[0][0], batch[1][0]]
+    sizes = [len(entry['payload']['embeds']) for entry in on_disk()]
+    assert sizes == [batching.MAX_EMBEDS, 3]
+
+def test_messages_stay_within_discords_size_limit():
+    big = 'x' * 2500
+    batch = spool([{'embeds': [embed(f"Edit {i}", big)]} for i in range(4)])
+    outbox.coalesce(batch)
+    for entry in on_disk():
+        assert sum(batching.embed_size(e) for e in entry['payload']['embeds']) <= batching.MAX_EMBED_CHARS
+
+def test_summary_mode_sends_one_embed():
+    batch = spool([{'embeds': [embed(f"Edit {i}")]} for i in range(4)], batch_mode='summary')
+    outbox.coalesce(batch)
+    entries = on_disk()
+    assert len(entries) == 1
+    assert len(entries[0]['payload']['embeds']) == 1
+
+def test_digest_mode_folds_the_batch_into_a_digest():
+    batch = spool([{'embeds': [embed('⚡ Work in Progress')]}, {'embeds': [embed('✅ Session Complete')]}],
+                  batch_mode='digest', batch_key='digest')
+    outbox.coalesce(batch)
+    entries = on_disk()
+    assert len(entries) == 1
+    assert entries[0]['label'] == 'Activity digest'
+    assert entries[0]['session_id'] is None
+    assert len(entries[0]['payload']['embeds']) == 1
+
+def test_batch_without_embeds_is_sent_unmerged():
+    batch = spool([{'content': 'first'}, {'content': 'second'}])
+    merged = outbox.coalesce(batch)
+
+    assert [entry['payload'] for _, entry in merged] == [{'content': 'first'}, {'content': 'second'}]
+    assert [entry['payload'] for entry in on_disk()] == [{'content': 'first'}, {'content': 'second'}]
+    assert all(entry['batch_key'] is None for entry in on_disk())
+
+class RecordingSender:
+    """Stands in for WebhookSender and accepts every message"""
+
+    def __init__(self):
+        self.sent = []
+        self.last_payload_bytes = None
+
+    def set_timeouts(self, connect=None, read=None):
+        pass
+
+    def request(self, method, url, payload):
+        self.sent.append(payload)
+        self.last_payload_bytes = len(json.dumps(payload))
+        return WebhookResponse(204, {}, b'')
+
+def drain(sender):
+    for _ in range(10):
+        if not outbox.pending_entries():
+            return
+        outbox.drain_pass(sender)
+
+def test_drain_sends_a_coalesced_batch_as_one_message():
+    spool([{'embeds': [embed(f"Edit {i}")]} for i in range(3)])
+    sender = RecordingSender()
+    drain(sender)
+    assert len(sender.sent) == 1
+    assert len(sender.sent[0]['embeds']) == 3
+    assert outbox.pending_entries() == []
+
+def test_drain_survives_a_batch_without_embeds():
+    spool([{'content': 'first'}, {'content': 'second'}])
+    sender = RecordingSender()
+    drain(sender)
+    assert sender.sent == [{'content': 'first'}, {'content': 'second'}]
+    assert outbox.pending_entries() == []
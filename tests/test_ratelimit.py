@@ -0,0 +1,88 @@
+"""Shared per-webhook token bucket: acquire, release and Discord's headers"""
+
+import time
+
+import pytest
+
+from discord_notify import delivery, ratelimit
+from discord_notify.jsonstate import read_state
+
+URL = 'https://discord.com/api/webhooks/123/secret-token'
+OTHER_URL = 'https://discord.com/api/webhooks/456/other-token'
+
+def tokens(url=URL):
+    state = read_state(ratelimit.STATE_FILE)
+    key = ratelimit.webhook_key(url)
+    return state['buckets'][state.get('webhooks', {}).get(key, key)]['tokens']
+
+def test_webhook_key_leaves_out_the_token():
+    assert ratelimit.webhook_key(URL) == '123'
+    assert ratelimit.webhook_key(f"{URL}?thread_id=9&wait=true") == '123'
+    assert ratelimit.webhook_key(f"{URL}/messages/42") == '123/messages'
+
+def test_burst_is_free_then_paced():
+    waits = [ratelimit.acquire(URL) for _ in range(ratelimit.DEFAULT_LIMIT)]
+    assert waits == [0.0] * ratelimit.DEFAULT_LIMIT
+
+    step = ratelimit.DEFAULT_PERIOD / ratelimit.DEFAULT_LIMIT
+    assert ratelimit.acquire(URL) == pytest.approx(step, abs=0.05)
+    assert ratelimit.acquire(URL) == pytest.approx(2 * step, abs=0.05)
+
+def test_webhooks_are_paced_separately():
+    for _ in range(ratelimit.DEFAULT_LIMIT + 2):
+        ratelimit.acquire(URL)
+    assert ratelimit.acquire(OTHER_URL) == 0.0
+
+def test_release_gives_the_slot_back():
+    for _ in range(ratelimit.DEFAULT_LIMIT):
+        ratelimit.acquire(URL)
+    first = ratelimit.acquire(URL)
+    ratelimit.release(URL)
+    assert ratelimit.acquire(URL) == pytest.approx(first, abs=0.05)
+
+def test_release_never_exceeds_the_limit():
+    ratelimit.acquire(URL)
+    for _ in range(3):
+        ratelimit.release(URL)
+    assert tokens() <= ratelimit.DEFAULT_LIMIT
+
+def test_exhausted_window_blocks_until_reset():
+    ratelimit.acquire(URL)
+    ratelimit.record(URL, 204, {'X-RateLimit-Limit': '5', 'X-RateLimit-Remaining': '0',
+                                'X-RateLimit-Reset-After': '1.5'})
+    assert ratelimit.blocked_for(URL) == pytest.approx(1.5, abs=0.1)
+    assert ratelimit.acquire(URL) >= 1.4
+
+def test_429_blocks_for_retry_after():
+    ratelimit.record(URL, 429, {}, retry_after=3.0)
+    assert ratelimit.blocked_for(URL) == pytest.approx(3.0, abs=0.1)
+    assert ratelimit.blocked_for(OTHER_URL) == 0.0
+
+def test_webhooks_in_one_discord_bucket_share_a_budget():
+    headers = {'X-RateLimit-Bucket': 'shared', 'X-RateLimit-Limit': '5', 'X-RateLimit-Remaining': '0',
+               'X-RateLimit-Reset-After': '2'}
+    ratelimit.record(URL, 204, headers)
+    ratelimit.record(OTHER_URL, 204, headers)
+    assert ratelimit.blocked_for(OTHER_URL) == pytest.approx(2.0, abs=0.1)
+    assert ratelimit.acquire(OTHER_URL) >= 1.9
+
+def test_deferred_send_returns_its_slot(monkeypatch):
+    # The limiter grants a short wait, then Discord blocks the webhook while
+    # the sender sleeps: the send is deferred and the reserved slot released
+    for _ in range(ratelimit.DEFAULT_LIMIT):
+        ratelimit.acquire(URL)
+    before = tokens()
+    monkeypatch.setattr(time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(ratelimit, 'blocked_for', lambda url: 5.0)
+
+    with pytest.raises(delivery.Deferred):
+        delivery.post(URL, {'content': 'x'}, sender=None, max_wait=1.0)
+    assert tokens() == pytest.approx(before, abs=0.1)
+
+def test_long_wait_is_deferred_without_spending_a_slot():
+    for _ in range(ratelimit.DEFAULT_LIMIT + 5):
+        ratelimit.acquire(URL)
+    before = tokens()
+    with pytest.raises(delivery.Deferred):
+        delivery.post(URL, {'content': 'x'}, sender=None, max_wait=0.25)
+    assert tokens() == pytest.approx(before, abs=0.1)
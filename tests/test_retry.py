@@ -0,0 +1,78 @@
+"""Retry policy: backoff, Retry-After and when to give up"""
+
+import json
+import time
+
+import pytest
+
+from discord_notify import outbox, retry
+
+POLICY = retry.get_policy()
+
+def test_policy_overrides_only_known_numeric_settings():
+    policy = retry.get_policy({'max_attempts': 3, 'base_delay': 'soon', 'unknown': 1})
+    assert policy['max_attempts'] == 3
+    assert policy['base_delay'] == retry.DEFAULT_POLICY['base_delay']
+    assert 'unknown' not in policy
+    assert retry.get_policy(None) == retry.DEFAULT_POLICY
+
+@pytest.mark.parametrize('status, retryable', [
+    (None, True), (429, True), (500, True), (503, True),
+    (400, False), (401, False), (404, False)
+])
+def test_retryable_statuses(status, retryable):
+    assert retry.is_retryable(status) is retryable
+
+def test_success_statuses():
+    assert retry.is_success(200) and retry.is_success(204)
+    assert not retry.is_success(None) and not retry.is_success(429)
+
+def test_retry_after_prefers_the_json_body():
+    body = json.dumps({'retry_after': 1.234}).encode()
+    assert retry.parse_retry_after({'Retry-After': '2'}, body) == 1.234
+
+def test_retry_after_falls_back_to_headers():
+    assert retry.parse_retry_after({'Retry-After': '3'}, b'not json') == 3.0
+    assert retry.parse_retry_after({'X-RateLimit-Reset-After': '0.5'}, b'') == 0.5
+    assert retry.parse_retry_after({'Retry-After': 'soon'}, None) is None
+    assert retry.parse_retry_after(None, None) is None
+
+def test_retry_after_is_never_negative():
+    assert retry.parse_retry_after(None, b'{"retry_after": -4}') == 0.0
+
+def test_backoff_doubles_with_jitter_up_to_the_ceiling():
+    for attempts in range(1, 12):
+        ceiling = min(POLICY['max_delay'], POLICY['base_delay'] * 2 ** (attempts - 1))
+        for _ in range(20):
+            assert ceiling / 2 <= retry.backoff_delay(attempts, POLICY) <= ceiling
+    assert retry.backoff_delay(30, POLICY) <= POLICY['max_delay']
+
+def test_next_attempt_drops_permanent_failures():
+    assert retry.next_attempt_delay(1, time.time(), POLICY, 400) is None
+
+def test_next_attempt_honours_retry_after_on_429():
+    delay = retry.next_attempt_delay(1, time.time(), POLICY, 429, {'Retry-After': '7'}, b'')
+    assert delay == 7.0
+
+def test_next_attempt_gives_up_after_max_attempts():
+    policy = retry.get_policy({'max_attempts': 3})
+    assert retry.next_attempt_delay(2, time.time(), policy, 500) is not None
+    assert retry.next_attempt_delay(3, time.time(), policy, 500) is None
+
+def test_next_attempt_gives_up_on_old_messages():
+    policy = retry.get_policy({'max_age': 60})
+    assert retry.next_attempt_delay(1, time.time() - 59.9, policy, 429, {'Retry-After': '1'}) is None
+    assert retry.next_attempt_delay(1, time.time(), policy, 429, {'Retry-After': '1'}) == 1.0
+
+def test_retry_later_spools_only_retryable_failures(monkeypatch):
+    spooled = []
+    monkeypatch.setattr(outbox, 'enqueue', lambda *args, **kwargs: spooled.append(kwargs))
+
+    assert not retry.retry_later('https://discord.com/api/webhooks/1/t', {}, 'Input needed', 'channel', 's', status=400)
+    assert spooled == []
+
+    before = time.time()
+    assert retry.retry_later('https://discord.com/api/webhooks/1/t', {}, 'Input needed', 'channel', 's',
+                             status=429, headers={'Retry-After': '5'})
+    assert spooled[0]['attempts'] == 1
+    assert spooled[0]['next_attempt_at'] >= before + 5
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+"""
+Hook cold-start benchmark
+Runs each hook under `python -X importtime` in a throwaway HOME and project
+and reports how many modules it imports, their total import time and the
+wall-clock time of a whole run. Nothing reaches Discord: the send scenario
+posts to the mock Discord server.
+
+Save a baseline with --save and check later runs against it with --compare;
+the run fails if any scenario's import time regresses by more than
+--tolerance percent.
+
+Usage: python3 tools/bench_startup.py [--hooks-dir DIR] [--runs N] [--save FILE] [--compare FILE]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from mock_discord import MockDiscord
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a hook should only need once it actually sends
+HEAVY_MODULES = ['ssl', 'http.client', 'urllib.request', 'email.parser', 'subprocess', 'datetime', 'pathlib']
+
+# `-X importtime` runs per scenario
+IMPORTTIME_RUNS = 5
+
+# Legacy per-event scripts, present in every version of the hooks
+EVENT_SCRIPTS = {
+    'Stop': 'stop-discord.py',
+    'Notification': 'notification-discord.py',
+    'PostToolUse': 'posttooluse-discord.py'
+}
+
+# (name, event, project config or None, hook input)
+SCENARIOS = [
+    ('not-configured', 'Stop', None,
+     {'session_id': 'bench-session'}),
+    ('inactive', 'PostToolUse', {'active': False},
+     {'session_id': 'bench-session', 'tool_name': 'Edit', 'tool_input': {'file_path': '/tmp/x.py'}}),
+    ('minor-tool', 'PostToolUse', {'active': True, 'dedup_window': 0},
+     {'session_id': 'bench-session', 'tool_name': 'Read', 'tool_input': {'file_path': '/tmp/x.py'}}),
+    ('stop-loop', 'Stop', {'active': True, 'dedup_window': 0},
+     {'session_id': 'bench-session', 'stop_hook_active': True}),
+    ('send', 'Notification', {'active': True, 'dedup_window': 0},
+     {'session_id': 'bench-session', 'message': 'Benchmark'}),
+]
+
+def parse_importtime(stderr):
+    """Return {module: self time in us} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, _, name = line[len('import time:'):].split('|')
+            modules[name.strip()] = int(self_us)
+        except ValueError:
+            continue
+    return modules
+
+def run_hook(script, payload, cwd, env, importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [script]
+    start = time.perf_counter()
+    result = subprocess.run(command, input=payload, cwd=cwd, env=env,
+                            capture_output=True, text=True, timeout=30)
+    return time.perf_counter() - start, result.stderr
+
+def bench_interpreter(runs):
+    """Wall-clock time of a bare interpreter start, the floor for any hook."""
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        walls.append(time.perf_counter() - start)
+    return round(statistics.median(walls) * 1000, 2)
+
+def bench(hooks_dir, runs, webhook_url):
+    """Run every scenario and return {name: results}."""
+    home = tempfile.mkdtemp(prefix='discord-bench-')
+    results = {}
+    try:
+        env = dict(os.environ, HOME=home)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        for name, event, config, hook_input in SCENARIOS:
+            project = os.path.join(home, name)
+            os.makedirs(os.path.join(project, '.claude'))
+            if config is not None:
+                with open(os.path.join(project, '.claude', 'discord-state.json'), 'w') as f:
+                    json.dump(dict(config, webhook_url=webhook_url), f)
+
+            script = os.path.join(hooks_dir, EVENT_SCRIPTS[event])
+            payload = json.dumps(dict(hook_input, hook_event_name=event))
+
+            # Warm-up run so bytecode caches exist, as they would after install
+            run_hook(script, payload, project, env)
+
+            # Import times are noisy - keep the median of a few runs
+            samples = [parse_importtime(run_hook(script, payload, project, env, importtime=True)[1])
+                       for _ in range(IMPORTTIME_RUNS)]
+            modules = samples[0]
+            walls = [run_hook(script, payload, project, env)[0] for _ in range(runs)]
+
+            results[name] = {
+                'modules': len(modules),
+                'import_ms': round(statistics.median(sum(m.values()) for m in samples) / 1000, 2),
+                'wall_ms': round(statistics.median(walls) * 1000, 2),
+                'heavy': [m for m in HEAVY_MODULES if m in modules]
+            }
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline. Returns False on an import-time regression."""
+    ok = True
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        change = (result['import_ms'] - before['import_ms']) / max(before['import_ms'], 0.01) * 100
+        regressed = change > tolerance
+        ok = ok and not regressed
+        print(f"  {name:<16} import {before['import_ms']:>7.2f} -> {result['import_ms']:>7.2f} ms "
+              f"({change:+.0f}%)  wall {before['wall_ms']:>7.2f} -> {result['wall_ms']:>7.2f} ms"
+              f"{'  REGRESSION' if regressed else ''}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--hooks-dir', default=os.path.join(REPO_ROOT, 'hooks'))
+    parser.add_argument('--runs', type=int, default=10, help='wall-clock runs per scenario')
+    parser.add_argument('--save', help='write results to this JSON baseline')
+    parser.add_argument('--compare', help='compare against this JSON baseline')
+    parser.add_argument('--tolerance', type=float, default=20.0, help='allowed import-time growth in percent')
+    args = parser.parse_args()
+
+    # No rate limit: every run's send should go straight through
+    server = MockDiscord(limit=10 ** 9)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    webhook_url = server.webhook_url(token='bench')
+
+    try:
+        results = bench(os.path.abspath(args.hooks_dir), args.runs, webhook_url)
+    finally:
+        server.shutdown()
+
+    print(f"{'scenario':<16} {'modules':>7} {'import ms':>10} {'wall ms':>9}  heavy imports")
+    print(f"{'(bare python)':<16} {'':>7} {'':>10} {bench_interpreter(args.runs):>9.2f}")
+    for name, result in results.items():
+        print(f"{name:<16} {result['modules']:>7} {result['import_ms']:>10.2f} {result['wall_ms']:>9.2f}  "
+              f"{', '.join(result['heavy']) or '-'}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nAgainst {args.compare}:")
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
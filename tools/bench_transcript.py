@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+"""
+Transcript and embed benchmark
+Generates synthetic Claude Code transcripts (user prompts, assistant text
+with tool_use blocks, tool results of realistic sizes) from 1 MB to 1 GB and
+times the Stop hook path on them: parse_transcript with an empty index
+(first Stop of a session), parse_transcript on the lines added since the
+last Stop, and create_stop_embed; create_progress_embed is timed once, as
+it does not depend on the transcript. Each case runs in a fresh process and
+reports the median wall time, peak RSS and peak traced allocations.
+
+Transcripts are generated from a fixed seed and cached in --data-dir, so
+runs are reproducible and only the first one pays for generation.
+--compare checks a run against a baseline - by default the one committed
+next to this script, bench_transcript_baseline.json - and fails if any
+case's wall time or memory grows by more than --tolerance percent. Timings
+depend on the machine: on another one, --save a baseline of your own
+before the change and compare against that.
+
+Usage: python3 tools/bench_transcript.py [--sizes 1M,10M,100M,1G] [--runs N] [--save FILE] [--compare [FILE]]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_transcript_baseline.json')
+
+# Bump when the generator's output changes so cached transcripts are rebuilt
+GENERATOR_VERSION = 1
+
+# Bytes appended per turn for the incremental parse case - a few turns' worth
+DELTA_BYTES = 256 * 1024
+
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+TRANSCRIPT_CASES = ['parse-cold', 'parse-incremental', 'stop-embed']
+
+# Iterations of create_progress_embed per timed run
+PROGRESS_CALLS = 10000
+
+# Changes smaller than this are noise, whatever the percentage
+NOISE_FLOOR = {'wall_ms': 1.0, 'peak_rss_mb': 1.0, 'alloc_peak_kb': 64.0}
+
+WORDS = ('the function returns config value when file path is missing update test handler '
+         'retry webhook session parse error build message result check import module').split()
+
+def parse_size(text):
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+class TranscriptWriter:
+    """Writes plausible transcript entries from a seeded random source"""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.files = [f"/work/project/src/module_{i:03d}.py" for i in range(200)]
+        self.counter = 0
+
+    def text(self, words):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(words))
+
+    def entry(self, kind, message):
+        self.counter += 1
+        return {
+            'parentUuid': f"00000000-0000-4000-8000-{self.counter - 1:012d}",
+            'isSidechain': False,
+            'userType': 'external',
+            'cwd': '/work/project',
+            'sessionId': 'bench-session',
+            'version': '1.0.0',
+            'type': kind,
+            'message': message,
+            'uuid': f"00000000-0000-4000-8000-{self.counter:012d}",
+            'timestamp': '2025-07-09T12:00:00.000Z'
+        }
+
+    def tool_use(self):
+        name = self.rng.choices(['Read', 'Edit', 'Bash', 'Grep', 'Write', 'MultiEdit', 'TodoWrite'],
+                                [30, 25, 20, 10, 6, 4, 5])[0]
+        path = self.rng.choice(self.files)
+        if name == 'Bash':
+            tool_input = {'command': f"python -m pytest -q tests/test_{self.rng.randrange(50)}.py"}
+        elif name == 'Grep':
+            tool_input = {'pattern': self.rng.choice(WORDS), 'path': '/work/project/src'}
+        elif name == 'Edit':
+            tool_input = {'file_path': path, 'old_string': self.text(20), 'new_string': self.text(25)}
+        elif name == 'MultiEdit':
+            tool_input = {'file_path': path, 'edits': [{'old_string': self.text(10), 'new_string': self.text(12)}
+                                                       for _ in range(3)]}
+        elif name == 'Write':
+            tool_input = {'file_path': path, 'content': self.text(self.rng.randrange(100, 1500))}
+        elif name == 'TodoWrite':
+            tool_input = {'todos': [{'content': self.text(8), 'status': 'pending', 'id': str(i)} for i in range(4)]}
+        else:
+            tool_input = {'file_path': path}
+        self.counter += 1
+        return {'type': 'tool_use', 'id': f"toolu_{self.counter:020d}", 'name': name, 'input': tool_input}
+
+    def tool_result_size(self):
+        # Mostly short outputs with a long tail of whole-file reads
+        return min(200000, int(self.rng.lognormvariate(7.5, 1.3)))
+
+    def turn(self):
+        """Yield the entries of one prompt: the prompt, tool calls and their results, a reply."""
+        yield self.entry('user', {'role': 'user', 'content': self.text(self.rng.randrange(5, 60))})
+        for _ in range(self.rng.randrange(1, 8)):
+            calls = [self.tool_use() for _ in range(self.rng.choice([1, 1, 1, 2, 3]))]
+            yield self.entry('assistant', {
+                'role': 'assistant', 'model': 'bench-model', 'type': 'message',
+                'content': [{'type': 'text', 'text': self.text(self.rng.randrange(10, 80))}] + calls,
+                'usage': {'input_tokens': self.rng.randrange(1000, 90000), 'output_tokens': self.rng.randrange(50, 2000)}
+            })
+            for call in calls:
+                output = self.text(self.tool_result_size() // 6)
+                yield self.entry('user', {'role': 'user', 'content': [
+                    {'type': 'tool_result', 'tool_use_id': call['id'], 'content': output}]})
+        yield self.entry('assistant', {'role': 'assistant', 'content': [{'type': 'text', 'text': self.text(60)}]})
+
+    def write(self, f, size):
+        """Write whole turns until at least `size` bytes are written."""
+        written = 0
+        while written < size:
+            for entry in self.turn():
+                line = (json.dumps(entry) + "\n").encode('utf-8')
+                f.write(line)
+                written += len(line)
+        return written
+
+def transcript_files(data_dir, size, seed):
+    """Return (transcript, delta) paths, generating them on first use."""
+    name = f"transcript-v{GENERATOR_VERSION}-s{seed}-{size}"
+    path = os.path.join(data_dir, f"{name}.jsonl")
+    delta = os.path.join(data_dir, f"{name}.delta.jsonl")
+    if not (os.path.exists(path) and os.path.exists(delta)):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Generating {size / SIZE_UNITS['M']:.0f} MB transcript in {data_dir}...", file=sys.stderr)
+        writer = TranscriptWriter(seed)
+        for target, count in ((path, size), (delta, DELTA_BYTES)):
+            with open(f"{target}.tmp", 'wb') as f:
+                writer.write(f, count)
+            os.replace(f"{target}.tmp", target)
+    return path, delta
+
+def run_case(case, transcript, delta, hooks_dir, runs, trace):
+    """Run one case in this process and return its measurements (used by --child)."""
+    import resource
+    import time
+    import tracemalloc
+
+    sys.path.insert(0, hooks_dir)
+    from discord_notify import posttooluse, stop, transcript as transcript_module
+
+    index_file = transcript_module.INDEX_FILE
+    config = {'webhook_url': 'http://127.0.0.1/api/webhooks/1/bench'}
+    hook_input = {'session_id': 'bench-session', 'transcript_path': transcript}
+
+    def reset_index():
+        try:
+            os.unlink(index_file)
+        except FileNotFoundError:
+            pass
+
+    if case == 'parse-cold':
+        setup, call, teardown = reset_index, lambda: stop.parse_transcript(transcript), None
+    elif case == 'stop-embed':
+        setup, call, teardown = reset_index, lambda: stop.create_stop_embed(hook_input, config), None
+    elif case == 'parse-incremental':
+        # Index the transcript once, then time parsing an appended chunk;
+        # the transcript and its index are put back after every run
+        reset_index()
+        stop.parse_transcript(transcript)
+        size = os.path.getsize(transcript)
+        with open(index_file, 'rb') as f:
+            checkpoint = f.read()
+        with open(delta, 'rb') as f:
+            chunk = f.read()
+
+        def setup():
+            with open(index_file, 'wb') as f:
+                f.write(checkpoint)
+            with open(transcript, 'ab') as f:
+                f.write(chunk)
+
+        def teardown():
+            os.truncate(transcript, size)
+        call = lambda: stop.parse_transcript(transcript)
+    elif case == 'progress-embed':
+        tool_input = {'file_path': '/work/project/src/module_001.py'}
+
+        def call():
+            for _ in range(PROGRESS_CALLS):
+                description = posttooluse.get_tool_description('Edit', tool_input)
+                posttooluse.create_progress_embed('Edit', tool_input, 'bench-session', description)
+        setup = teardown = None
+    else:
+        raise SystemExit(f"unknown case {case}")
+
+    def once():
+        if setup:
+            setup()
+        try:
+            start = time.perf_counter()
+            call()
+            return time.perf_counter() - start
+        finally:
+            if teardown:
+                teardown()
+
+    if trace:
+        # Allocation tracing slows everything down - measured in its own process
+        tracemalloc.start()
+        once()
+        return {'alloc_peak_kb': round(tracemalloc.get_traced_memory()[1] / 1024, 1)}
+
+    walls = [once() for _ in range(runs)]
+    return {
+        'wall_ms': round(statistics.median(walls) * 1000, 3),
+        # ru_maxrss is in KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+
+def measure(case, transcript, delta, hooks_dir, runs):
+    """Run a case in fresh processes (timing, then allocation tracing) and merge the results."""
+    home = tempfile.mkdtemp(prefix='discord-bench-')
+    try:
+        os.makedirs(os.path.join(home, '.claude'))
+        env = dict(os.environ, HOME=home)
+        result = {}
+        for trace in (False, True):
+            command = [sys.executable, os.path.abspath(__file__), '--child', case,
+                       '--hooks-dir', hooks_dir, '--runs', str(runs), transcript or '-', delta or '-']
+            if trace:
+                command.append('--trace')
+            output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+            result.update(json.loads(output))
+        return result
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline. Returns False on a regression."""
+    ok = True
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        changes = []
+        for key, floor in NOISE_FLOOR.items():
+            change = (result[key] - before[key]) / max(before[key], 0.01) * 100
+            regressed = change > tolerance and result[key] - before[key] > floor
+            ok = ok and not regressed
+            changes.append(f"{key} {before[key]:g} -> {result[key]:g} ({change:+.0f}%){' REGRESSION' if regressed else ''}")
+        print(f"  {name:<24} " + '  '.join(changes))
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--hooks-dir', default=os.path.join(REPO_ROOT, 'hooks'))
+    parser.add_argument('--sizes', default='1M,10M,100M,1G', help='transcript sizes, e.g. 1M,10M')
+    parser.add_argument('--runs', type=int, default=5, help='timed runs per case')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'discord-bench-transcripts'),
+                        help='where generated transcripts are cached')
+    parser.add_argument('--save', help='write results to this JSON baseline')
+    parser.add_argument('--compare', nargs='?', const=BASELINE_FILE,
+                        help='compare against this JSON baseline (default: the committed one)')
+    parser.add_argument('--tolerance', type=float, default=25.0, help='allowed growth in percent')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--trace', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('paths', nargs='*', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    hooks_dir = os.path.abspath(args.hooks_dir)
+
+    if args.child:
+        transcript, delta = args.paths
+        print(json.dumps(run_case(args.child, transcript, delta, hooks_dir, args.runs, args.trace)))
+        return
+
+    results = {'progress-embed': measure('progress-embed', None, None, hooks_dir, args.runs)}
+    for size_text in args.sizes.split(','):
+        size = parse_size(size_text)
+        transcript, delta = transcript_files(args.data_dir, size, args.seed)
+        for case in TRANSCRIPT_CASES:
+            results[f"{size_text.strip()}/{case}"] = measure(case, transcript, delta, hooks_dir, args.runs)
+
+    print(f"{'case':<24} {'wall ms':>10} {'peak RSS MB':>12} {'alloc peak KB':>14}")
+    for name, result in results.items():
+        print(f"{name:<24} {result['wall_ms']:>10.3f} {result['peak_rss_mb']:>12.1f} {result['alloc_peak_kb']:>14.1f}")
+    print(f"(progress-embed is {PROGRESS_CALLS} calls)")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nAgainst {args.compare}:")
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
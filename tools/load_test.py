@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+
+"""
+End-to-end load test for the Discord hooks
+Replays a synthetic stream of Stop, Notification and PostToolUse events
+through the real hook scripts, in a throwaway HOME and project, against the
+local mock Discord server (tools/mock_discord.py). Each simulated session
+runs its events in order; --concurrency sessions run side by side, and
+--rate paces how fast events start (0 = one burst).
+
+Every event carries a unique tag that ends up in its Discord message, so
+once the hooks and any background workers have finished the run reports
+hook latency, delivered-message throughput and which events never arrived.
+
+Usage: python3 tools/load_test.py [--events N] [--concurrency N] [--rate R]
+                                  [--mix Stop=1,Notification=1,PostToolUse=8]
+                                  [--config JSON] [--daemon] [--url URL] [--json]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from mock_discord import MockDiscord
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TAG = re.compile(r'lt-\d+')
+
+# Tools that always produce a PostToolUse message
+TOOLS = ['Edit', 'Write', 'Bash']
+
+# Embed title of each event's message
+TITLES = {
+    'Stop': '✅ Session Complete',
+    'Notification': '🔔 Input Needed',
+    'PostToolUse': '⚡ Work in Progress'
+}
+
+def parse_mix(text):
+    """Parse 'Stop=1,Notification=1,PostToolUse=8' into event weights."""
+    mix = {}
+    for part in text.split(','):
+        event, _, weight = part.partition('=')
+        mix[event.strip()] = float(weight or 1)
+    return mix
+
+def build_events(count, sessions, mix, seed):
+    """Return per-session lists of (tag, event, hook input)."""
+    rng = random.Random(seed)
+    events, weights = zip(*mix.items())
+    streams = [[] for _ in range(sessions)]
+    for i in range(count):
+        tag = f"lt-{i}"
+        event = rng.choices(events, weights)[0]
+        session_id = f"loadtest-session-{i % sessions:04d}"
+        hook_input = {'session_id': session_id, 'hook_event_name': event}
+        if event == 'Notification':
+            hook_input['message'] = f"{tag} needs your input"
+        elif event == 'PostToolUse':
+            tool = TOOLS[i % len(TOOLS)]
+            hook_input['tool_name'] = tool
+            hook_input['tool_input'] = ({'command': f"echo {tag}"} if tool == 'Bash'
+                                        else {'file_path': f"/tmp/{tag}.py"})
+        streams[i % sessions].append((tag, event, hook_input))
+    return streams
+
+def append_transcript(path, tag, event, hook_input):
+    """Grow a session transcript the way Claude Code would before the hook fires."""
+    with open(path, 'a', encoding='utf-8') as f:
+        if event == 'Stop':
+            f.write(json.dumps({'type': 'user', 'message': {'role': 'user', 'content': f"{tag} task"}}) + "\n")
+        elif event == 'PostToolUse':
+            f.write(json.dumps({'type': 'assistant', 'message': {'role': 'assistant', 'content': [
+                {'type': 'tool_use', 'name': hook_input['tool_name'], 'input': hook_input['tool_input']}]}}) + "\n")
+
+class Pacer:
+    """Spaces event starts across all sessions to a target rate."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.next_start = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            start = self.next_start
+            self.next_start = max(start, time.perf_counter()) + self.interval
+        delay = start - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+def run_session(stream, hook, project, env, transcript, pacer, results):
+    for tag, event, hook_input in stream:
+        append_transcript(transcript, tag, event, hook_input)
+        hook_input = dict(hook_input, transcript_path=transcript)
+        pacer.wait()
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, hook], input=json.dumps(hook_input), cwd=project,
+                                env=env, capture_output=True, text=True, timeout=120)
+        results.append({'tag': tag, 'event': event, 'started': start,
+                        'latency': time.perf_counter() - start, 'ok': result.returncode == 0})
+
+def fetch_json(url):
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+def pending_outbox(home):
+    outbox = os.path.join(home, '.claude', 'discord-outbox')
+    try:
+        return [name for name in os.listdir(outbox) if name.endswith('.json') and not name.startswith('.')]
+    except FileNotFoundError:
+        return []
+
+def wait_for_delivery(base_url, home, expected, timeout, settle):
+    """Wait until every tag arrived, or the spool is empty and nothing new came in for `settle` seconds."""
+    deadline = time.time() + timeout
+    last_count, last_change = -1, time.time()
+    while True:
+        messages = fetch_json(f"{base_url}/_mock/messages")
+        if len(messages) != last_count:
+            last_count, last_change = len(messages), time.time()
+        seen = {tag for m in messages for tag in TAG.findall(json.dumps(m['payload']))}
+        if expected <= seen:
+            return messages
+        if not pending_outbox(home) and time.time() - last_change >= settle:
+            return messages
+        if time.time() >= deadline:
+            return messages
+        time.sleep(0.2)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def summarize(results, messages, stats, duration_start):
+    expected = {r['tag']: r['event'] for r in results}
+    seen = {tag for m in messages for tag in TAG.findall(json.dumps(m['payload']))}
+    latencies = [r['latency'] * 1000 for r in results]
+    creates = [m for m in messages if m['method'] == 'POST']
+    elapsed = (max(m['time'] for m in messages) - duration_start) if messages else 0
+
+    by_event = {}
+    for tag, event in expected.items():
+        counts = by_event.setdefault(event, {'sent': 0, 'delivered': 0, 'embeds': 0})
+        counts['sent'] += 1
+        counts['delivered'] += tag in seen
+
+    # Embeds per event type: a message can arrive without its tag when it was
+    # built after later activity (e.g. a queued Stop reading a newer prompt)
+    titles = {title: event for event, title in TITLES.items()}
+    for message in creates:
+        for embed in message['payload'].get('embeds', []):
+            event = titles.get(embed.get('title'))
+            if event in by_event:
+                by_event[event]['embeds'] += 1
+
+    return {
+        'events': len(results),
+        'hook_failures': sum(not r['ok'] for r in results),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.5), 2),
+            'p95': round(percentile(latencies, 0.95), 2),
+            'p99': round(percentile(latencies, 0.99), 2),
+            'max': round(max(latencies), 2),
+            'mean': round(statistics.mean(latencies), 2)
+        },
+        'delivered': len(seen & set(expected)),
+        'lost': sorted(set(expected) - seen, key=lambda tag: int(tag[3:])),
+        'by_event': by_event,
+        'messages': len(creates),
+        'edits': len(messages) - len(creates),
+        'seconds': round(elapsed, 3),
+        'messages_per_second': round(len(creates) / elapsed, 2) if elapsed > 0 else 0.0,
+        'server': stats
+    }
+
+def print_report(summary):
+    events = summary['events']
+    latency = summary['latency_ms']
+    by_event = sorted(summary['by_event'].items())
+    sent = ', '.join(f"{event} {counts['sent']}" for event, counts in by_event)
+    lost = ', '.join(f"{event} {counts['sent'] - counts['delivered']}" for event, counts in by_event)
+    embeds = ', '.join(f"{event} {counts['embeds']}" for event, counts in by_event)
+    print(f"events        {events} ({sent})")
+    print(f"hook latency  p50 {latency['p50']:.1f} ms  p95 {latency['p95']:.1f} ms  "
+          f"p99 {latency['p99']:.1f} ms  max {latency['max']:.1f} ms")
+    print(f"delivered     {summary['delivered']}/{events} events "
+          f"({summary['delivered'] / max(events, 1) * 100:.1f}%) in {summary['messages']} messages "
+          f"+ {summary['edits']} edits, {summary['seconds']:.2f}s -> {summary['messages_per_second']:.1f} msg/s")
+    print(f"lost          {lost}")
+    print(f"embeds        {embeds}")
+    server = summary['server']
+    print(f"server        {server['requests']} requests, {server['rate_limited']} rate limited, "
+          f"{server['errors']} errors, {server['resets']} resets, {server['rejected']} rejected")
+    print(f"hook failures {summary['hook_failures']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--hooks-dir', default=os.path.join(REPO_ROOT, 'hooks'))
+    parser.add_argument('--events', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8, help='sessions replayed side by side')
+    parser.add_argument('--rate', type=float, default=0.0, help='event starts per second across all sessions (0 = burst)')
+    parser.add_argument('--mix', default='Stop=1,Notification=1,PostToolUse=8', help='relative event weights')
+    parser.add_argument('--config', default='{}', help='extra discord-state.json settings, e.g. \'{"outbox": true}\'')
+    parser.add_argument('--daemon', action='store_true', help='run the notification daemon during the test')
+    parser.add_argument('--url', help='webhook URL of an already running mock server')
+    parser.add_argument('--latency', type=float, default=0.0, help='mock server latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--reset-rate', type=float, default=0.0)
+    parser.add_argument('--limit', type=int, default=5, help='mock rate limit per window')
+    parser.add_argument('--window', type=float, default=2.0)
+    parser.add_argument('--drain-timeout', type=float, default=120.0, help='seconds to wait for queued messages')
+    parser.add_argument('--settle', type=float, default=3.0, help='quiet seconds that end the wait')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        webhook_url = args.url
+        base_url = webhook_url.split('/api/')[0]
+        urllib.request.urlopen(urllib.request.Request(f"{base_url}/_mock/reset", method='POST'), timeout=10)
+    else:
+        server = MockDiscord(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             reset_rate=args.reset_rate, limit=args.limit, window=args.window, seed=args.seed)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        webhook_url, base_url = server.webhook_url(), server.base_url
+
+    home = tempfile.mkdtemp(prefix='discord-load-')
+    hooks_dir = os.path.abspath(args.hooks_dir)
+    env = dict(os.environ, HOME=home)
+    daemon = [sys.executable, os.path.join(hooks_dir, 'discord-daemon.py')]
+    try:
+        project = os.path.join(home, 'project')
+        os.makedirs(os.path.join(project, '.claude'))
+        os.makedirs(os.path.join(home, 'transcripts'))
+        os.makedirs(os.path.join(home, '.claude'))
+        with open(os.path.join(project, '.claude', 'discord-state.json'), 'w') as f:
+            json.dump(dict(json.loads(args.config), active=True, webhook_url=webhook_url), f)
+
+        if args.daemon:
+            subprocess.run(daemon + ['start'], env=env, cwd=project, check=True, capture_output=True)
+
+        streams = build_events(args.events, args.concurrency, parse_mix(args.mix), args.seed)
+        hook = os.path.join(hooks_dir, 'discord-hook.py')
+        pacer = Pacer(args.rate)
+        results = []
+        started = time.time()
+        threads = [threading.Thread(target=run_session, args=(
+            stream, hook, project, env, os.path.join(home, 'transcripts', f"session-{i}.jsonl"), pacer, results))
+            for i, stream in enumerate(streams)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = {r['tag'] for r in results}
+        messages = wait_for_delivery(base_url, home, expected, args.drain_timeout, args.settle)
+        stats = fetch_json(f"{base_url}/_mock/stats")
+    finally:
+        if args.daemon:
+            subprocess.run(daemon + ['stop'], env=env, capture_output=True)
+        if server:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(home, ignore_errors=True)
+
+    summary = summarize(results, messages, stats, started)
+    print_report(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+"""
+Local stand-in for the Discord webhook API
+Accepts the calls the hooks make - POST /api/webhooks/{id}/{token} (with
+?wait=true returning a message object, and ?thread_id=) and PATCH
+.../messages/{message_id} - and answers with Discord's status codes, bodies
+and X-RateLimit-* headers. Webhooks post to a text channel, or with
+--forum to a forum channel: there a thread_name creates a post (the
+message's channel_id is the new thread) and a message needs a thread_name
+or an existing thread_id; a text channel refuses thread_name. Each webhook
+gets a fixed-window rate limit; requests over it get 429 with Retry-After.
+Latency, 5xx errors and connection resets can be injected to exercise
+retries, the outbox and the circuit breaker without touching discord.com.
+
+GET /_mock/stats and GET /_mock/messages report what was received;
+POST /_mock/reset clears it.
+
+Usage: python3 tools/mock_discord.py [--port 8765] [--latency S] [--jitter S]
+                                     [--error-rate P] [--reset-rate P] [--limit N] [--window S] [--forum]
+"""
+
+import argparse
+import http.server
+import json
+import random
+import re
+import socket
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+WEBHOOK_PATH = re.compile(r'^/api/webhooks/(\d+)/([^/]+)(?:/messages/(\d+))?$')
+
+# Discord refuses messages with more embeds than this
+MAX_EMBEDS = 10
+
+class MockDiscord(http.server.ThreadingHTTPServer):
+    """Webhook server with per-webhook rate limits and fault injection"""
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), latency=0.0, jitter=0.0, error_rate=0.0,
+                 reset_rate=0.0, limit=5, window=2.0, seed=None, forum=False):
+        super().__init__(address, MockWebhookHandler)
+        self.forum = forum
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.limit = limit
+        self.window = window
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def webhook_url(self, webhook_id=1, token='mock'):
+        return f"{self.base_url}/api/webhooks/{webhook_id}/{token}"
+
+    def reset(self):
+        """Forget all messages, counters and rate-limit windows."""
+        with self.lock:
+            self.messages = {}
+            self.accepted = []  # (time, method, payload) of every accepted create or edit
+            self.windows = {}
+            self.channels = {}  # webhook ID -> its channel's ID
+            self.threads = {}  # thread ID -> (webhook ID, name)
+            self.next_id = 1000
+            self.stats = {'requests': 0, 'created': 0, 'edited': 0, 'threads': 0, 'rate_limited': 0,
+                          'errors': 0, 'resets': 0, 'rejected': 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def take_slot(self, webhook_id):
+        """Count a request against the webhook's window. Returns (allowed, remaining, reset_after)."""
+        now = time.time()
+        with self.lock:
+            started, used = self.windows.get(webhook_id, (now, 0))
+            if now - started >= self.window:
+                started, used = now, 0
+            reset_after = max(0.0, started + self.window - now)
+            if used >= self.limit:
+                return False, 0, reset_after
+            self.windows[webhook_id] = (started, used + 1)
+            return True, self.limit - used - 1, reset_after
+
+    def _new_id(self):
+        self.next_id += 1
+        return str(self.next_id)
+
+    def channel_of(self, webhook_id):
+        """The ID of the channel a webhook posts to."""
+        with self.lock:
+            if webhook_id not in self.channels:
+                self.channels[webhook_id] = self._new_id()
+            return self.channels[webhook_id]
+
+    def create_thread(self, webhook_id, name):
+        """Open a forum post. Returns its thread ID."""
+        with self.lock:
+            thread_id = self._new_id()
+            self.threads[thread_id] = (webhook_id, name)
+            self.stats['threads'] += 1
+            return thread_id
+
+    def has_thread(self, webhook_id, thread_id):
+        with self.lock:
+            return self.threads.get(thread_id, (None,))[0] == webhook_id
+
+    def create_message(self, webhook_id, channel_id, payload):
+        with self.lock:
+            self.next_id += 1
+            message = {
+                'id': str(self.next_id),
+                'type': 0,
+                'channel_id': channel_id,
+                'webhook_id': webhook_id,
+                'content': payload.get('content', ''),
+                'embeds': payload.get('embeds', []),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime())
+            }
+            self.messages[message['id']] = message
+            self.accepted.append((time.time(), 'POST', payload))
+            self.stats['created'] += 1
+            return message
+
+    def edit_message(self, message_id, payload):
+        with self.lock:
+            message = self.messages.get(message_id)
+            if message is None:
+                return None
+            for key in ('content', 'embeds'):
+                if key in payload:
+                    message[key] = payload[key]
+            self.accepted.append((time.time(), 'PATCH', payload))
+            self.stats['edited'] += 1
+            return dict(message)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.stats), list(self.accepted)
+
+class MockWebhookHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def reset_connection(self):
+        """Drop the connection with a TCP RST instead of answering."""
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        self.connection.close()
+        self.close_connection = True
+
+    def do_GET(self):
+        server = self.server
+        if self.path == '/_mock/stats':
+            stats, _ = server.snapshot()
+            self.send_json(200, stats)
+        elif self.path == '/_mock/messages':
+            _, accepted = server.snapshot()
+            self.send_json(200, [{'time': t, 'method': method, 'payload': payload}
+                                 for t, method, payload in accepted])
+        else:
+            self.send_json(404, {'message': '404: Not Found', 'code': 0})
+
+    def do_POST(self):
+        if self.path == '/_mock/reset':
+            self.server.reset()
+            self.send_json(204, None)
+            return
+        self.handle_webhook('POST')
+
+    def do_PATCH(self):
+        self.handle_webhook('PATCH')
+
+    def handle_webhook(self, method):
+        server = self.server
+        server.count('requests')
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        parts = urlsplit(self.path)
+        match = WEBHOOK_PATH.match(parts.path)
+        if not match or (method == 'PATCH') != bool(match.group(3)):
+            self.send_json(404, {'message': '404: Not Found', 'code': 0})
+            return
+        webhook_id, _, message_id = match.groups()
+        query = parse_qs(parts.query)
+
+        delay = server.latency + (server.random.uniform(0, server.jitter) if server.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if server.random.random() < server.reset_rate:
+            server.count('resets')
+            self.reset_connection()
+            return
+        if server.random.random() < server.error_rate:
+            server.count('errors')
+            self.send_json(500, {'message': '500: Internal Server Error', 'code': 0})
+            return
+
+        allowed, remaining, reset_after = server.take_slot(webhook_id)
+        headers = {
+            'X-RateLimit-Limit': str(server.limit),
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Reset': f"{time.time() + reset_after:.3f}",
+            'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+            'X-RateLimit-Bucket': f"mock-{webhook_id}"
+        }
+        if not allowed:
+            server.count('rate_limited')
+            headers['Retry-After'] = str(max(1, round(reset_after)))
+            headers['X-RateLimit-Scope'] = 'user'
+            self.send_json(429, {'message': 'You are being rate limited.',
+                                 'retry_after': round(reset_after, 3), 'global': False}, headers)
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            server.count('rejected')
+            self.send_json(400, {'message': 'The request body contains invalid JSON.', 'code': 50109}, headers)
+            return
+        if not payload.get('content') and not payload.get('embeds'):
+            server.count('rejected')
+            self.send_json(400, {'message': 'Cannot send an empty message', 'code': 50006}, headers)
+            return
+        if len(payload.get('embeds') or []) > MAX_EMBEDS:
+            server.count('rejected')
+            self.send_json(400, {'message': 'Invalid Form Body', 'code': 50035}, headers)
+            return
+
+        if method == 'PATCH':
+            message = server.edit_message(message_id, payload)
+            if message is None:
+                self.send_json(404, {'message': 'Unknown Message', 'code': 10008}, headers)
+            else:
+                self.send_json(200, message, headers)
+            return
+
+        thread_id = query.get('thread_id', [None])[0]
+        thread_name = payload.get('thread_name')
+        if thread_name and not server.forum:
+            server.count('rejected')
+            self.send_json(400, {'message': 'Webhooks can only create threads in forum channels', 'code': 220003}, headers)
+            return
+        if thread_id and not thread_name:
+            if server.forum and not server.has_thread(webhook_id, thread_id):
+                server.count('rejected')
+                self.send_json(400, {'message': 'Unknown Channel', 'code': 10003}, headers)
+                return
+            channel_id = thread_id
+        elif thread_name:
+            channel_id = server.create_thread(webhook_id, thread_name)
+        elif server.forum:
+            server.count('rejected')
+            self.send_json(400, {'message': 'Webhooks posted to forum channels must have a thread_name or thread_id',
+                                 'code': 220001}, headers)
+            return
+        else:
+            channel_id = server.channel_of(webhook_id)
+        message = server.create_message(webhook_id, channel_id, payload)
+        if query.get('wait', ['false'])[0].lower() == 'true':
+            self.send_json(200, message, headers)
+        else:
+            self.send_json(204, None, headers)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every webhook call')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls answered with 500')
+    parser.add_argument('--reset-rate', type=float, default=0.0, help='fraction of calls dropped with a connection reset')
+    parser.add_argument('--limit', type=int, default=5, help='requests per webhook per window')
+    parser.add_argument('--window', type=float, default=2.0, help='rate-limit window in seconds')
+    parser.add_argument('--seed', type=int, help='seed for fault injection')
+    parser.add_argument('--forum', action='store_true', help='webhooks post to a forum channel')
+    args = parser.parse_args()
+
+    server = MockDiscord((args.host, args.port), args.latency, args.jitter, args.error_rate,
+                         args.reset_rate, args.limit, args.window, args.seed, args.forum)
+    print(f"Mock Discord listening - use webhook URL {server.webhook_url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.snapshot()[0], indent=2))
+
+if __name__ == "__main__":
+    main()
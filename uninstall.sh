@@ -78,6 +78,8 @@ check_installation() {
     [ -f "${HOOKS_DIR}/stop-discord.py" ] && found_components+=("stop-discord.py")
     [ -f "${HOOKS_DIR}/posttooluse-discord.py" ] && found_components+=("posttooluse-discord.py")
     [ -f "${HOOKS_DIR}/notification-discord.py" ] && found_components+=("notification-discord.py")
+    [ -f "${HOOKS_DIR}/discord-hook.py" ] && found_components+=("discord-hook.py")
+    [ -d "${HOOKS_DIR}/discord_notify" ] && found_components+=("discord_notify package")
     
     # Check for commands
     [ -d "${COMMANDS_DIR}/discord" ] && found_components+=("discord commands")
@@ -103,6 +105,9 @@ create_backup() {
     [ -f "${HOOKS_DIR}/stop-discord.py" ] && cp "${HOOKS_DIR}/stop-discord.py" "$backup_dir/"
     [ -f "${HOOKS_DIR}/posttooluse-discord.py" ] && cp "${HOOKS_DIR}/posttooluse-discord.py" "$backup_dir/"
     [ -f "${HOOKS_DIR}/notification-discord.py" ] && cp "${HOOKS_DIR}/notification-discord.py" "$backup_dir/"
+    [ -f "${HOOKS_DIR}/discord-hook.py" ] && cp "${HOOKS_DIR}/discord-hook.py" "$backup_dir/"
+    [ -f "${HOOKS_DIR}/discord-daemon.py" ] && cp "${HOOKS_DIR}/discord-daemon.py" "$backup_dir/"
+    [ -d "${HOOKS_DIR}/discord_notify" ] && cp -r "${HOOKS_DIR}/discord_notify" "$backup_dir/"
     
     # Backup commands
     [ -d "${COMMANDS_DIR}/discord" ] && cp -r "${COMMANDS_DIR}/discord" "$backup_dir/"
@@ -116,7 +121,12 @@ remove_hooks() {
     
     local removed=0
     
-    for script in stop-discord.py posttooluse-discord.py notification-discord.py; do
+    # Stop the notification daemon before removing its code
+    if [ -f "${HOOKS_DIR}/discord-daemon.py" ]; then
+        python3 "${HOOKS_DIR}/discord-daemon.py" stop > /dev/null 2>&1 || true
+    fi
+    
+    for script in discord-hook.py stop-discord.py posttooluse-discord.py notification-discord.py discord-daemon.py; do
         if [ -f "${HOOKS_DIR}/$script" ]; then
             rm -f "${HOOKS_DIR}/$script"
             log_success "Removed $script"
@@ -124,6 +134,12 @@ remove_hooks() {
         fi
     done
     
+    if [ -d "${HOOKS_DIR}/discord_notify" ]; then
+        rm -rf "${HOOKS_DIR}/discord_notify"
+        log_success "Removed discord_notify runtime package"
+        ((removed++))
+    fi
+    
     if [ $removed -gt 0 ]; then
         log_success "Removed $removed hook scripts"
     else
@@ -153,6 +169,9 @@ verify_removal() {
     [ -f "${HOOKS_DIR}/stop-discord.py" ] && remaining+=("stop-discord.py")
     [ -f "${HOOKS_DIR}/posttooluse-discord.py" ] && remaining+=("posttooluse-discord.py")
     [ -f "${HOOKS_DIR}/notification-discord.py" ] && remaining+=("notification-discord.py")
+    [ -f "${HOOKS_DIR}/discord-hook.py" ] && remaining+=("discord-hook.py")
+    [ -f "${HOOKS_DIR}/discord-daemon.py" ] && remaining+=("discord-daemon.py")
+    [ -d "${HOOKS_DIR}/discord_notify" ] && remaining+=("discord_notify package")
     [ -d "${COMMANDS_DIR}/discord" ] && remaining+=("discord commands")
     
     if [ ${#remaining[@]} -eq 0 ]; then